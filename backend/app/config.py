@@ -6,6 +6,15 @@ class AppSettings(BaseSettings):
     ApiPort: int = Field(default=8000, alias="API_PORT")
     WebOrigin: str = Field(default="http://localhost:5173", alias="WEB_ORIGIN")
     DatabaseFile: str = Field(default="./.data/portionnote.sqlite", alias="DATABASE_FILE")
+    DatabasePoolSize: int = Field(default=8, alias="DATABASE_POOL_SIZE")
+    DatabasePoolTimeout: float = Field(default=30.0, alias="DATABASE_POOL_TIMEOUT")
+    DatabaseHealthCheckSeconds: float = Field(default=60.0, alias="DATABASE_HEALTH_CHECK_SECONDS")
+    DatabaseJournalMode: str = Field(default="WAL", alias="DATABASE_JOURNAL_MODE")
+    DatabaseSynchronous: str = Field(default="NORMAL", alias="DATABASE_SYNCHRONOUS")
+    DatabaseCacheSize: int = Field(default=-20000, alias="DATABASE_CACHE_SIZE")
+    DatabaseMmapSize: int = Field(default=268435456, alias="DATABASE_MMAP_SIZE")
+    DatabaseTempStore: str = Field(default="MEMORY", alias="DATABASE_TEMP_STORE")
+    DatabaseBusyTimeoutMs: int = Field(default=5000, alias="DATABASE_BUSY_TIMEOUT_MS")
     Environment: str = Field(default="development", alias="ENVIRONMENT")
 
     AdminEmail: str = Field(default="admin@portionnote.local", alias="ADMIN_EMAIL")
@@ -36,6 +45,42 @@ class AppSettings(BaseSettings):
         default="https://api.openai.com/v1/chat/completions",
         alias="OPENAI_BASE_URL"
     )
+    OpenAiTimeoutSeconds: float = Field(default=30.0, alias="OPENAI_TIMEOUT_SECONDS")
+    OpenAiConnectTimeoutSeconds: float = Field(default=5.0, alias="OPENAI_CONNECT_TIMEOUT_SECONDS")
+    OpenAiMaxConnections: int = Field(default=20, alias="OPENAI_MAX_CONNECTIONS")
+    OpenAiMaxKeepaliveConnections: int = Field(default=10, alias="OPENAI_MAX_KEEPALIVE_CONNECTIONS")
+    OpenAiKeepaliveExpirySeconds: float = Field(default=60.0, alias="OPENAI_KEEPALIVE_EXPIRY_SECONDS")
+    OpenAiHttp2: bool = Field(default=True, alias="OPENAI_HTTP2")
+    OpenFoodFactsTimeoutSeconds: float = Field(default=10.0, alias="OPENFOODFACTS_TIMEOUT_SECONDS")
+    OpenFoodFactsConnectTimeoutSeconds: float = Field(default=5.0, alias="OPENFOODFACTS_CONNECT_TIMEOUT_SECONDS")
+    OpenFoodFactsMaxConnections: int = Field(default=10, alias="OPENFOODFACTS_MAX_CONNECTIONS")
+    OpenFoodFactsMaxKeepaliveConnections: int = Field(default=5, alias="OPENFOODFACTS_MAX_KEEPALIVE_CONNECTIONS")
+    OpenFoodFactsKeepaliveExpirySeconds: float = Field(default=30.0, alias="OPENFOODFACTS_KEEPALIVE_EXPIRY_SECONDS")
+    OpenFoodFactsHttp2: bool = Field(default=True, alias="OPENFOODFACTS_HTTP2")
+    OpenFoodFactsLocalIndex: bool = Field(default=True, alias="OPENFOODFACTS_LOCAL_INDEX")
+    FoodLookupCacheBackend: str = Field(default="memory", alias="FOOD_LOOKUP_CACHE_BACKEND")
+    FoodLookupCacheTtlSeconds: int = Field(default=86400, alias="FOOD_LOOKUP_CACHE_TTL_SECONDS")
+    FoodLookupCacheMaxEntries: int = Field(default=5000, alias="FOOD_LOOKUP_CACHE_MAX_ENTRIES")
+    FoodLookupCacheMaxBytes: int = Field(default=16_000_000, alias="FOOD_LOOKUP_CACHE_MAX_BYTES")
+    FoodLookupCacheSweepSeconds: int = Field(default=300, alias="FOOD_LOOKUP_CACHE_SWEEP_SECONDS")
+    FoodLookupNegativeTtlSeconds: int = Field(default=3600, alias="FOOD_LOOKUP_NEGATIVE_TTL_SECONDS")
+    FoodLookupStaleSeconds: int = Field(default=604800, alias="FOOD_LOOKUP_STALE_SECONDS")
+    AiLookupCacheEnabled: bool = Field(default=True, alias="AI_LOOKUP_CACHE_ENABLED")
+    AiLookupCacheTtlSeconds: int = Field(default=2_592_000, alias="AI_LOOKUP_CACHE_TTL_SECONDS")
+    AiLookupCacheMaxEntries: int = Field(default=20000, alias="AI_LOOKUP_CACHE_MAX_ENTRIES")
+    AiLookupCacheMaxBytes: int = Field(default=32_000_000, alias="AI_LOOKUP_CACHE_MAX_BYTES")
+    ImageUploadMaxBytes: int = Field(default=10_000_000, alias="IMAGE_UPLOAD_MAX_BYTES")
+    ImageLookupMaxEdge: int = Field(default=1024, alias="IMAGE_LOOKUP_MAX_EDGE")
+    ImageLookupJpegQuality: int = Field(default=85, alias="IMAGE_LOOKUP_JPEG_QUALITY")
+    ImageProcessWorkers: int = Field(default=2, alias="IMAGE_PROCESS_WORKERS")
+    ImageLookupCacheTtlSeconds: int = Field(default=604_800, alias="IMAGE_LOOKUP_CACHE_TTL_SECONDS")
+    ImageLookupCacheMaxEntries: int = Field(default=2000, alias="IMAGE_LOOKUP_CACHE_MAX_ENTRIES")
+    ImageLookupCacheMaxBytes: int = Field(default=16_000_000, alias="IMAGE_LOOKUP_CACHE_MAX_BYTES")
+    ImageLookupMaxHashDistance: int = Field(default=6, alias="IMAGE_LOOKUP_MAX_HASH_DISTANCE")
+    ImageLookupSimilarScanLimit: int = Field(default=256, alias="IMAGE_LOOKUP_SIMILAR_SCAN_LIMIT")
+    FoodSuggestionsIndexTtlSeconds: int = Field(default=300, alias="FOOD_SUGGESTIONS_INDEX_TTL_SECONDS")
+    FoodSuggestionsLocalMinResults: int = Field(default=3, alias="FOOD_SUGGESTIONS_LOCAL_MIN_RESULTS")
+    FoodSuggestionsRecentLookupMax: int = Field(default=5000, alias="FOOD_SUGGESTIONS_RECENT_LOOKUP_MAX")
 
     model_config = SettingsConfigDict(
         env_file=".env",
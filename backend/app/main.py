@@ -24,7 +24,11 @@ from app.routes import (
     SettingsRouter,
     SummaryRouter
 )
-from app.utils.database import GetConnection
+from app.services.image_processing_service import CloseImageProcessPool
+from app.services.openai_client import CloseOpenAiClient, OpenOpenAiClient
+from app.services.multi_source_lookup_service import MultiSourceFoodLookupService
+from app.services.openfoodfacts_service import OpenFoodFactsService
+from app.utils.database import ClosePool, GetPragmaProfile
 from app.utils.logger import GetLogger
 from app.utils.migrations import RunMigrations
 from app.utils.seed import SeedDatabase
@@ -38,8 +42,16 @@ async def Lifespan(app: FastAPI):
     try:
         RunMigrations()
         Logger.info("Migrations completed")
+        Profile = GetPragmaProfile()
+        Logger.info(
+            "Database PRAGMA profile: "
+            + ", ".join(f"{Name}={Value}" for Name, Value in Profile.items())
+        )
         SeedDatabase()
         Logger.info("Database seeded")
+        OpenFoodFactsService.OpenClient()
+        OpenOpenAiClient()
+        MultiSourceFoodLookupService.StartCacheSweeper()
         Logger.info("Application ready")
         yield
     except Exception as Error:
@@ -47,8 +59,11 @@ async def Lifespan(app: FastAPI):
         raise
     finally:
         Logger.info("Shutting down...")
-        Connection = GetConnection()
-        Connection.close()
+        await MultiSourceFoodLookupService.StopCacheSweeper()
+        await OpenFoodFactsService.CloseClient()
+        await CloseOpenAiClient()
+        CloseImageProcessPool()
+        ClosePool()
         Logger.info("Shutdown complete")
 
 
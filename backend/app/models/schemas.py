@@ -195,6 +195,27 @@ class WeeklySummary(BaseModel):
     Averages: dict
 
 
+class SummaryBucketSize(str, Enum):
+    Day = "day"
+    Week = "week"
+    Month = "month"
+
+
+class SummaryBucket(BaseModel):
+    BucketStart: str
+    BucketEnd: str
+    DayCount: int
+    Totals: dict
+    Averages: dict
+
+
+class RangeSummary(BaseModel):
+    StartDate: str
+    EndDate: str
+    Bucket: SummaryBucketSize
+    Buckets: list[SummaryBucket]
+
+
 class User(BaseModel):
     UserId: str
     Email: str
@@ -10,6 +10,9 @@ from app.models.schemas import (
     User
 )
 from app.services.admin_users_service import CreateLocalUser, ListUsers, UpdateUserAdmin
+from app.services.ai_lookup_cache_service import GetAiLookupCacheStats, PurgeAiLookupCache
+from app.services.daily_totals_service import RebuildDailyTotals
+from app.utils.database import RunDatabaseCall
 from app.utils.seed import EnsureSettingsForUser, SeedFoodsForUser
 
 AdminUserRouter = APIRouter()
@@ -19,24 +22,33 @@ class AdminUserResponse(BaseModel):
     User: AdminUserSummary
 
 
+class DailyTotalsRebuildResponse(BaseModel):
+    RebuiltCount: int
+
+
+class AiLookupCachePurgeResponse(BaseModel):
+    RemovedCount: int
+
+
 @AdminUserRouter.get("/users", response_model=AdminUserListResponse, tags=["AdminUsers"])
 async def ListAdminUsers(AdminUser: User = Depends(RequireAdmin)):
-    Users = ListUsers()
+    Users = await RunDatabaseCall(ListUsers)
     return AdminUserListResponse(Users=Users)
 
 
 @AdminUserRouter.post("/users", response_model=AdminUserResponse, status_code=201, tags=["AdminUsers"])
 async def CreateAdminUser(Input: AdminUserCreateInput, AdminUser: User = Depends(RequireAdmin)):
     try:
-        Created = CreateLocalUser(
+        Created = await RunDatabaseCall(
+            CreateLocalUser,
             Email=Input.Email,
             Password=Input.Password,
             FirstName=Input.FirstName,
             LastName=Input.LastName,
             IsAdmin=Input.IsAdmin
         )
-        EnsureSettingsForUser(Created.UserId)
-        SeedFoodsForUser(Created.UserId)
+        await RunDatabaseCall(EnsureSettingsForUser, Created.UserId)
+        await RunDatabaseCall(SeedFoodsForUser, Created.UserId)
         return AdminUserResponse(User=Created)
     except ValueError as ErrorValue:
         raise HTTPException(status_code=400, detail=str(ErrorValue)) from ErrorValue
@@ -45,7 +57,24 @@ async def CreateAdminUser(Input: AdminUserCreateInput, AdminUser: User = Depends
 @AdminUserRouter.patch("/users/{UserId}", response_model=AdminUserResponse, tags=["AdminUsers"])
 async def UpdateAdminUser(UserId: str, Input: AdminUserUpdateInput, AdminUser: User = Depends(RequireAdmin)):
     try:
-        Updated = UpdateUserAdmin(UserId, Input.IsAdmin)
+        Updated = await RunDatabaseCall(UpdateUserAdmin, UserId, Input.IsAdmin)
         return AdminUserResponse(User=Updated)
     except ValueError as ErrorValue:
         raise HTTPException(status_code=400, detail=str(ErrorValue)) from ErrorValue
+
+
+@AdminUserRouter.post("/daily-totals/rebuild", response_model=DailyTotalsRebuildResponse, tags=["AdminUsers"])
+async def RebuildDailyTotalsRoute(UserId: str | None = None, AdminUser: User = Depends(RequireAdmin)):
+    RebuiltCount = await RunDatabaseCall(RebuildDailyTotals, UserId)
+    return DailyTotalsRebuildResponse(RebuiltCount=RebuiltCount)
+
+
+@AdminUserRouter.get("/ai-lookup-cache/stats", tags=["AdminUsers"])
+async def GetAiLookupCacheStatsRoute(AdminUser: User = Depends(RequireAdmin)):
+    return await RunDatabaseCall(GetAiLookupCacheStats)
+
+
+@AdminUserRouter.post("/ai-lookup-cache/purge", response_model=AiLookupCachePurgeResponse, tags=["AdminUsers"])
+async def PurgeAiLookupCacheRoute(All: bool = False, AdminUser: User = Depends(RequireAdmin)):
+    RemovedCount = await RunDatabaseCall(PurgeAiLookupCache, All)
+    return AiLookupCachePurgeResponse(RemovedCount=RemovedCount)
@@ -22,6 +22,7 @@ from app.services.auth_service import (
     RegisterGoogleUser,
     RegisterLocalUser
 )
+from app.utils.database import RunDatabaseCall, UseConnection
 from app.utils.seed import EnsureSettingsForUser, SeedFoodsForUser
 
 AuthRouter = APIRouter()
@@ -49,7 +50,7 @@ def EnsureGoogleConfigured() -> None:
 
 @AuthRouter.get("/me", response_model=UserResponse, tags=["Auth"])
 async def GetCurrentUser(RequestValue: Request):
-    UserItem = GetUserFromRequest(RequestValue)
+    UserItem = await RunDatabaseCall(GetUserFromRequest, RequestValue)
     if UserItem is None:
         raise HTTPException(status_code=401, detail="Not authenticated.")
     return UserResponse(User=UserItem)
@@ -58,7 +59,8 @@ async def GetCurrentUser(RequestValue: Request):
 @AuthRouter.post("/register", response_model=UserResponse, status_code=201, tags=["Auth"])
 async def Register(Input: RegisterUserInput, RequestValue: Request):
     try:
-        UserItem, Created = RegisterLocalUser(
+        UserItem, Created = await RunDatabaseCall(
+            RegisterLocalUser,
             Email=Input.Email,
             Password=Input.Password,
             FirstName=Input.FirstName,
@@ -66,8 +68,8 @@ async def Register(Input: RegisterUserInput, RequestValue: Request):
             InviteCode=Input.InviteCode
         )
         if Created:
-            EnsureSettingsForUser(UserItem.UserId)
-            SeedFoodsForUser(UserItem.UserId)
+            await RunDatabaseCall(EnsureSettingsForUser, UserItem.UserId)
+            await RunDatabaseCall(SeedFoodsForUser, UserItem.UserId)
         RequestValue.session["UserId"] = UserItem.UserId
         return UserResponse(User=UserItem)
     except ValueError as ErrorValue:
@@ -77,7 +79,7 @@ async def Register(Input: RegisterUserInput, RequestValue: Request):
 @AuthRouter.post("/login", response_model=UserResponse, tags=["Auth"])
 async def Login(Input: LoginInput, RequestValue: Request):
     try:
-        UserItem = AuthenticateUser(Input.Email, Input.Password)
+        UserItem = await RunDatabaseCall(AuthenticateUser, Input.Email, Input.Password)
         RequestValue.session["UserId"] = UserItem.UserId
         return UserResponse(User=UserItem)
     except ValueError as ErrorValue:
@@ -97,7 +99,7 @@ async def CreateInvite(
     AdminUser: User = Depends(RequireAdmin)
 ):
     try:
-        InviteRow = CreateInviteForEmail(Input.Email, AdminUser.UserId)
+        InviteRow = await RunDatabaseCall(CreateInviteForEmail, Input.Email, AdminUser.UserId)
         BaseUrl = str(RequestValue.base_url).rstrip("/")
         InviteUrl = f"{BaseUrl}/api/auth/google/login?InviteCode={InviteRow['InviteCode']}"
         return InviteResponse(
@@ -131,7 +133,8 @@ async def GoogleComplete(Input: InviteCompleteInput, RequestValue: Request):
         raise HTTPException(status_code=400, detail="Google session expired.")
 
     try:
-        UserItem, Created = RegisterGoogleUser(
+        UserItem, Created = await RunDatabaseCall(
+            RegisterGoogleUser,
             Email=Pending["Email"],
             FirstName=Pending.get("FirstName"),
             LastName=Pending.get("LastName"),
@@ -139,8 +142,8 @@ async def GoogleComplete(Input: InviteCompleteInput, RequestValue: Request):
             InviteCode=Input.InviteCode
         )
         if Created:
-            EnsureSettingsForUser(UserItem.UserId)
-            SeedFoodsForUser(UserItem.UserId)
+            await RunDatabaseCall(EnsureSettingsForUser, UserItem.UserId)
+            await RunDatabaseCall(SeedFoodsForUser, UserItem.UserId)
         RequestValue.session["UserId"] = UserItem.UserId
         RequestValue.session.pop("PendingGoogle", None)
         RequestValue.session.pop("PendingGoogleError", None)
@@ -186,7 +189,8 @@ async def GoogleCallback(RequestValue: Request):
     InviteCode = RequestValue.session.pop("InviteCode", None)
 
     try:
-        UserItem, Created = RegisterGoogleUser(
+        UserItem, Created = await RunDatabaseCall(
+            RegisterGoogleUser,
             Email=Email,
             FirstName=UserInfo.get("given_name") if UserInfo else None,
             LastName=UserInfo.get("family_name") if UserInfo else None,
@@ -194,8 +198,8 @@ async def GoogleCallback(RequestValue: Request):
             InviteCode=InviteCode
         )
         if Created:
-            EnsureSettingsForUser(UserItem.UserId)
-            SeedFoodsForUser(UserItem.UserId)
+            await RunDatabaseCall(EnsureSettingsForUser, UserItem.UserId)
+            await RunDatabaseCall(SeedFoodsForUser, UserItem.UserId)
         RequestValue.session["UserId"] = UserItem.UserId
         RequestValue.session.pop("PendingGoogle", None)
         RequestValue.session.pop("PendingGoogleError", None)
@@ -220,15 +224,44 @@ async def GoogleCallback(RequestValue: Request):
     return RedirectResponse(url=Target)
 
 
+def _ApplyProfileUpdate(Query: str, Params: dict, UserId: str) -> User | None:
+    with UseConnection() as Db:
+        Cursor = Db.cursor()
+        try:
+            Cursor.execute(Query, Params)
+            Db.commit()
+
+            # Fetch updated user
+            Row = Cursor.execute(
+                "SELECT UserId, Email, FirstName, LastName, BirthDate, HeightCm, WeightKg, ActivityLevel, IsAdmin FROM Users WHERE UserId = ?",
+                [UserId]
+            ).fetchone()
+        finally:
+            Cursor.close()
+
+    if not Row:
+        return None
+
+    return User(
+        UserId=Row[0],
+        Email=Row[1],
+        FirstName=Row[2],
+        LastName=Row[3],
+        BirthDate=Row[4],
+        HeightCm=Row[5],
+        WeightKg=Row[6],
+        ActivityLevel=Row[7],
+        IsAdmin=bool(Row[8])
+    )
+
+
 @AuthRouter.patch("/profile", response_model=UserResponse, tags=["Auth"])
 async def UpdateProfile(Input: UpdateProfileInput, RequestValue: Request):
     """Update user profile information (name, birthdate, height, weight)."""
-    UserItem = GetUserFromRequest(RequestValue)
+    UserItem = await RunDatabaseCall(GetUserFromRequest, RequestValue)
     if UserItem is None:
         raise HTTPException(status_code=401, detail="Not authenticated.")
-    
-    from app.utils.database import GetConnection
-    
+
     UpdateFields = []
     Params: dict = {"UserId": UserItem.UserId}
     
@@ -255,35 +288,10 @@ async def UpdateProfile(Input: UpdateProfileInput, RequestValue: Request):
         return UserResponse(User=UserItem)
     
     Query = f"UPDATE Users SET {', '.join(UpdateFields)} WHERE UserId = :UserId"
-    
-    Db = GetConnection()
-    Cursor = Db.cursor()
-    try:
-        Cursor.execute(Query, Params)
-        Db.commit()
-        
-        # Fetch updated user
-        Row = Cursor.execute(
-            "SELECT UserId, Email, FirstName, LastName, BirthDate, HeightCm, WeightKg, ActivityLevel, IsAdmin FROM Users WHERE UserId = ?",
-            [UserItem.UserId]
-        ).fetchone()
-        
-        if not Row:
-            raise HTTPException(status_code=404, detail="User not found after update.")
-        
-        UpdatedUser = User(
-            UserId=Row[0],
-            Email=Row[1],
-            FirstName=Row[2],
-            LastName=Row[3],
-            BirthDate=Row[4],
-            HeightCm=Row[5],
-            WeightKg=Row[6],
-            ActivityLevel=Row[7],
-            IsAdmin=bool(Row[8])
-        )
-        
-        return UserResponse(User=UpdatedUser)
-    finally:
-        Cursor.close()
+
+    UpdatedUser = await RunDatabaseCall(_ApplyProfileUpdate, Query, Params, UserItem.UserId)
+    if UpdatedUser is None:
+        raise HTTPException(status_code=404, detail="User not found after update.")
+
+    return UserResponse(User=UpdatedUser)
 
@@ -16,7 +16,12 @@ from app.models.schemas import (
     Targets,
     User
 )
-from app.services.calculations_service import BuildDailySummary, CalculateDailyTotals
+from app.services.calculations_service import (
+    BuildDailySummary,
+    BuildDailyTotals,
+    CalculateDailyTotals,
+    SumEntryNutrients
+)
 from app.services.daily_logs_service import (
     CreateMealEntry,
     DeleteMealEntry,
@@ -24,8 +29,12 @@ from app.services.daily_logs_service import (
     GetEntriesForLog,
     GetSettings,
     UpdateSteps,
-    UpsertDailyLog
+    UpsertDailyLog,
+    ValidateMealEntryInput
 )
+from app.services.daily_totals_service import GetDailyNutrientTotals
+from app.services.serving_conversion_service import LearnUnitConversions
+from app.utils.database import RunDatabaseCall
 
 DailyLogRouter = APIRouter()
 
@@ -49,7 +58,7 @@ class MealEntryResponse(BaseModel):
 @DailyLogRouter.post("/", response_model=DailyLogCreateResponse, status_code=201, tags=["DailyLogs"])
 async def CreateDailyLogRoute(Input: CreateDailyLogInput, CurrentUser: User = Depends(RequireUser)):
     try:
-        DailyLogItem = UpsertDailyLog(CurrentUser.UserId, Input)
+        DailyLogItem = await RunDatabaseCall(UpsertDailyLog, CurrentUser.UserId, Input)
         return DailyLogCreateResponse(DailyLog=DailyLogItem)
     except Exception as ErrorValue:
         raise HTTPException(status_code=400, detail="Failed to create daily log.") from ErrorValue
@@ -57,8 +66,8 @@ async def CreateDailyLogRoute(Input: CreateDailyLogInput, CurrentUser: User = De
 
 @DailyLogRouter.get("/{LogDate}", response_model=DailyLogResponse, tags=["DailyLogs"])
 async def GetDailyLog(LogDate: str, CurrentUser: User = Depends(RequireUser)):
-    DailyLogItem = GetDailyLogByDate(CurrentUser.UserId, LogDate)
-    Settings = GetSettings(CurrentUser.UserId)
+    DailyLogItem = await RunDatabaseCall(GetDailyLogByDate, CurrentUser.UserId, LogDate)
+    Settings = await RunDatabaseCall(GetSettings, CurrentUser.UserId)
     
     if DailyLogItem is None:
         # Return 200 with empty data - no log exists yet for this date
@@ -72,15 +81,19 @@ async def GetDailyLog(LogDate: str, CurrentUser: User = Depends(RequireUser)):
             Targets=Settings
         )
 
-    Entries = GetEntriesForLog(CurrentUser.UserId, DailyLogItem.DailyLogId)
+    Entries = await RunDatabaseCall(GetEntriesForLog, CurrentUser.UserId, DailyLogItem.DailyLogId)
     StepFactor = (
         DailyLogItem.StepKcalFactorOverride
         if DailyLogItem.StepKcalFactorOverride is not None
         else Settings.StepKcalFactor
     )
 
-    Totals = CalculateDailyTotals(
-        Entries,
+    Nutrients = await RunDatabaseCall(GetDailyNutrientTotals, DailyLogItem.DailyLogId)
+    if Nutrients is None:
+        Nutrients = SumEntryNutrients(Entries)
+
+    Totals = BuildDailyTotals(
+        Nutrients,
         DailyLogItem.Steps,
         StepFactor,
         Settings
@@ -100,7 +113,8 @@ async def GetDailyLog(LogDate: str, CurrentUser: User = Depends(RequireUser)):
 @DailyLogRouter.patch("/{LogDate}/steps", response_model=DailyLogCreateResponse, tags=["DailyLogs"])
 async def UpdateStepsRoute(LogDate: str, Input: StepUpdateInput, CurrentUser: User = Depends(RequireUser)):
     try:
-        DailyLogItem = UpdateSteps(
+        DailyLogItem = await RunDatabaseCall(
+            UpdateSteps,
             CurrentUser.UserId,
             LogDate,
             Input.Steps,
@@ -115,7 +129,10 @@ async def UpdateStepsRoute(LogDate: str, Input: StepUpdateInput, CurrentUser: Us
 @DailyLogRouter.post("/meal-entries", response_model=MealEntryResponse, status_code=201, tags=["DailyLogs"])
 async def CreateMealEntryRoute(Input: CreateMealEntryInput, CurrentUser: User = Depends(RequireUser)):
     try:
-        MealEntryItem = CreateMealEntry(CurrentUser.UserId, Input)
+        # Reject bad input before asking the AI for any unit conversion
+        await RunDatabaseCall(ValidateMealEntryInput, CurrentUser.UserId, Input)
+        await LearnUnitConversions([(Input.FoodId, Input.EntryQuantity, Input.EntryUnit)])
+        MealEntryItem = await RunDatabaseCall(CreateMealEntry, CurrentUser.UserId, Input)
         return MealEntryResponse(MealEntry=MealEntryItem)
     except Exception as ErrorValue:
         raise HTTPException(status_code=400, detail="Failed to create meal entry.") from ErrorValue
@@ -124,7 +141,7 @@ async def CreateMealEntryRoute(Input: CreateMealEntryInput, CurrentUser: User =
 @DailyLogRouter.delete("/meal-entries/{MealEntryId}", status_code=204, tags=["DailyLogs"])
 async def DeleteMealEntryRoute(MealEntryId: str, CurrentUser: User = Depends(RequireUser)):
     try:
-        DeleteMealEntry(CurrentUser.UserId, MealEntryId, IsAdmin=CurrentUser.IsAdmin)
+        await RunDatabaseCall(DeleteMealEntry, CurrentUser.UserId, MealEntryId, IsAdmin=CurrentUser.IsAdmin)
         return Response(status_code=204)
     except Exception as ErrorValue:
         raise HTTPException(status_code=400, detail="Failed to delete meal entry.") from ErrorValue
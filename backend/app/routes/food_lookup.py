@@ -1,20 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from pydantic import BaseModel
-from typing import List
+from starlette.datastructures import UploadFile
+from starlette.types import Message
+from typing import AsyncIterator, List
 
+from app.config import Settings
 from app.dependencies import RequireUser
 from app.models.schemas import User, FoodInfo
 from app.services.food_lookup_service import (
     LookupFoodByBarcode,
     LookupFoodByImage,
+    LookupFoodByImageFile,
     LookupFoodByText,
-    LookupFoodByTextOptions,
-    SearchAustralianFoodSuggestions
+    LookupFoodByTextOptions
 )
+from app.services.food_suggestions_service import RecordLookupNames, SuggestFoodNames
 from app.services.multi_source_lookup_service import MultiSourceFoodLookupService
 from app.services.rate_limiter import OpenFoodFactsRateLimiter
+from app.utils.database import RunDatabaseCall
 
 FoodLookupRouter = APIRouter()
+# Allowance for multipart boundaries and part headers on top of the image cap
+UploadOverheadBytes = 64 * 1024
 
 
 class TextLookupInput(BaseModel):
@@ -68,7 +76,8 @@ async def LookupByText(Input: TextLookupInput, CurrentUser: User = Depends(Requi
     Example: "weet-bix", "banana", "chicken breast"
     """
     try:
-        Result = LookupFoodByText(Input.Query)
+        Result = await LookupFoodByText(Input.Query)
+        RecordLookupNames([Result.FoodName])
         return TextLookupResponse(
             Result=FoodLookupResponse(**Result.ToDict())
         )
@@ -85,7 +94,8 @@ async def LookupByTextOptions(Input: TextLookupInput, CurrentUser: User = Depend
     Returns multiple size options when available.
     """
     try:
-        Results = LookupFoodByTextOptions(Input.Query)
+        Results = await LookupFoodByTextOptions(Input.Query)
+        RecordLookupNames(Result.FoodName for Result in Results)
         return TextLookupOptionsResponse(
             Results=[FoodLookupResponse(**Result.ToDict()) for Result in Results]
         )
@@ -102,7 +112,7 @@ async def LookupByImage(Input: ImageLookupInput, CurrentUser: User = Depends(Req
     Expects base64-encoded image string (without data:image prefix).
     """
     try:
-        Results = LookupFoodByImage(Input.ImageBase64)
+        Results = await LookupFoodByImage(Input.ImageBase64)
         return ImageLookupResponse(
             Results=[FoodLookupResponse(**R.ToDict()) for R in Results]
         )
@@ -112,16 +122,70 @@ async def LookupByImage(Input: ImageLookupInput, CurrentUser: User = Depends(Req
         raise HTTPException(status_code=500, detail="Failed to analyze image.") from ErrorValue
 
 
+@asynccontextmanager
+async def OpenImageUpload(RequestValue: Request, MaxBytes: int) -> AsyncIterator[UploadFile]:
+    """Stream the multipart "Image" part into a spooled temp file, rejecting bodies over the cap.
+
+    The upload stays open (and on disk past 1 MB) until the block exits.
+    """
+    CapBytes = MaxBytes + UploadOverheadBytes
+    ContentLength = RequestValue.headers.get("content-length", "")
+    if ContentLength.isdigit() and int(ContentLength) > CapBytes:
+        raise HTTPException(status_code=413, detail="Image is too large.")
+
+    ReceivedBytes = 0
+
+    async def ReceiveWithCap() -> Message:
+        nonlocal ReceivedBytes
+        MessageValue = await RequestValue.receive()
+        if MessageValue["type"] == "http.request":
+            ReceivedBytes += len(MessageValue.get("body", b""))
+            if ReceivedBytes > CapBytes:
+                raise HTTPException(status_code=413, detail="Image is too large.")
+        return MessageValue
+
+    CappedRequest = Request(RequestValue.scope, ReceiveWithCap)
+    async with CappedRequest.form(max_files=1, max_fields=0) as Form:
+        Upload = Form.get("Image")
+        if not isinstance(Upload, UploadFile):
+            raise HTTPException(status_code=400, detail="Image file is required.")
+        if Upload.content_type and not Upload.content_type.startswith("image/"):
+            raise HTTPException(status_code=400, detail="Upload must be an image.")
+        if Upload.size is not None and Upload.size > MaxBytes:
+            raise HTTPException(status_code=413, detail="Image is too large.")
+        await Upload.seek(0)
+        yield Upload
+
+
+@FoodLookupRouter.post("/image/upload", response_model=ImageLookupResponse, tags=["Food Lookup"])
+async def LookupByImageUpload(RequestValue: Request, CurrentUser: User = Depends(RequireUser)):
+    """
+    Analyze a food/meal photo sent as multipart/form-data in an "Image" file field.
+    Avoids the base64 inflation of /image; uploads over IMAGE_UPLOAD_MAX_BYTES are rejected with 413.
+    """
+    async with OpenImageUpload(RequestValue, Settings.ImageUploadMaxBytes) as Upload:
+        try:
+            Results = await LookupFoodByImageFile(Upload.file, Upload.size or 0)
+            return ImageLookupResponse(
+                Results=[FoodLookupResponse(**R.ToDict()) for R in Results]
+            )
+        except ValueError as ErrorValue:
+            raise HTTPException(status_code=400, detail=str(ErrorValue)) from ErrorValue
+        except Exception as ErrorValue:
+            raise HTTPException(status_code=500, detail="Failed to analyze image.") from ErrorValue
+
+
 @FoodLookupRouter.post("/barcode", response_model=BarcodeLookupResponse, tags=["Food Lookup"])
 async def LookupByBarcode(Input: BarcodeLookupInput, CurrentUser: User = Depends(RequireUser)):
     """
-    Look up food by barcode using Open Food Facts API (free).
+    Look up food by barcode using the local index, lookup cache and Open Food Facts API.
     Returns None if product not found.
     """
     try:
-        Result = LookupFoodByBarcode(Input.Barcode)
+        Result = await LookupFoodByBarcode(Input.Barcode)
         if Result is None:
             return BarcodeLookupResponse(Result=None)
+        RecordLookupNames([Result.FoodName])
         return BarcodeLookupResponse(
             Result=FoodLookupResponse(**Result.ToDict())
         )
@@ -140,11 +204,11 @@ async def GetFoodSuggestions(
     CurrentUser: User = Depends(RequireUser)
 ):
     """
-    Get food name autocomplete suggestions prioritizing Australian brands and products.
-    Requires minimum 2-3 characters to start returning suggestions.
+    Get food name autocomplete suggestions from the user's foods, templates and recent lookups.
+    Falls back to AI suggestions prioritizing Australian brands when few local names match.
     """
     try:
-        Suggestions = SearchAustralianFoodSuggestions(Q, Limit)
+        Suggestions = await SuggestFoodNames(CurrentUser.UserId, Q, Limit)
         return FoodSuggestionsResponse(Suggestions=Suggestions)
     except Exception as ErrorValue:
         raise HTTPException(status_code=500, detail="Failed to get suggestions.") from ErrorValue
@@ -167,7 +231,7 @@ async def MultiSourceSearch(Input: MultiSourceSearchInput, CurrentUser: User = D
     """
     try:
         Results = await MultiSourceFoodLookupService.Search(Input.Query)
-        
+        RecordLookupNames(Item.FoodName for Item in Results.get("openfoodfacts", []))
         return MultiSourceSearchResponse(
             Openfoodfacts=Results.get("openfoodfacts", []),
             AiFallbackAvailable=Results.get("ai_fallback_available", True)
@@ -180,7 +244,7 @@ async def MultiSourceSearch(Input: MultiSourceSearchInput, CurrentUser: User = D
 async def GetCacheStats(CurrentUser: User = Depends(RequireUser)):
     """Get cache statistics for debugging and monitoring."""
     try:
-        Stats = MultiSourceFoodLookupService.GetCacheStats()
+        Stats = await RunDatabaseCall(MultiSourceFoodLookupService.GetCacheStats)
         return Stats
     except Exception as ErrorValue:
         raise HTTPException(status_code=500, detail=f"Failed to get cache stats: {str(ErrorValue)}") from ErrorValue
@@ -1,15 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from pydantic import BaseModel
 
 from app.dependencies import RequireUser
 from app.models.schemas import CreateFoodInput, Food, UpdateFoodInput, User
-from app.services.foods_service import DeleteFood, GetFoods, UpdateFood, UpsertFood
+from app.services.food_suggestions_service import InvalidateFoodSuggestions
+from app.services.foods_service import (
+    DefaultFoodPageSize,
+    DeleteFood,
+    EncodeFoodCursor,
+    GetFoodsPage,
+    SearchFoods,
+    UpdateFood,
+    UpsertFood
+)
+from app.utils.database import RunDatabaseCall
 
 FoodRouter = APIRouter()
 
 
 class FoodListResponse(BaseModel):
     Foods: list[Food]
+    NextCursor: str | None = None
 
 
 class FoodResponse(BaseModel):
@@ -17,18 +28,55 @@ class FoodResponse(BaseModel):
 
 
 @FoodRouter.get("/", response_model=FoodListResponse, tags=["Foods"])
-async def ListFoods(CurrentUser: User = Depends(RequireUser)):
+async def ListFoods(
+    Response: Response,
+    After: str | None = None,
+    Limit: int = DefaultFoodPageSize,
+    Mine: bool = False,
+    Favourites: bool = False,
+    DataSource: str | None = None,
+    CurrentUser: User = Depends(RequireUser)
+):
     try:
-        Foods = GetFoods(CurrentUser.UserId)
-        return FoodListResponse(Foods=Foods)
+        Foods, TotalCount = await RunDatabaseCall(
+            GetFoodsPage,
+            CurrentUser.UserId,
+            Limit=Limit,
+            After=After,
+            MineOnly=Mine,
+            FavouritesOnly=Favourites,
+            DataSource=DataSource
+        )
+    except ValueError as ErrorValue:
+        raise HTTPException(status_code=400, detail=str(ErrorValue)) from ErrorValue
     except Exception as ErrorValue:
         raise HTTPException(status_code=500, detail="Failed to load foods.") from ErrorValue
 
+    # Counted on the first page only, so walking the cursor does not re-count the catalogue
+    if TotalCount is not None:
+        Response.headers["X-Total-Count"] = str(TotalCount)
+    NextCursor = EncodeFoodCursor(Foods[-1]) if len(Foods) == Limit else None
+    return FoodListResponse(Foods=Foods, NextCursor=NextCursor)
+
+
+@FoodRouter.get("/search", response_model=FoodListResponse, tags=["Foods"])
+async def SearchFoodsRoute(
+    Q: str = Query(..., min_length=1, description="Food name or prefix to match"),
+    Limit: int = Query(20, ge=1, le=100),
+    CurrentUser: User = Depends(RequireUser)
+):
+    try:
+        Foods = await RunDatabaseCall(SearchFoods, Q, Limit)
+        return FoodListResponse(Foods=Foods)
+    except Exception as ErrorValue:
+        raise HTTPException(status_code=500, detail="Failed to search foods.") from ErrorValue
+
 
 @FoodRouter.post("/", response_model=FoodResponse, status_code=201, tags=["Foods"])
 async def CreateFood(Input: CreateFoodInput, CurrentUser: User = Depends(RequireUser)):
     try:
-        FoodItem = UpsertFood(CurrentUser.UserId, Input)
+        FoodItem = await RunDatabaseCall(UpsertFood, CurrentUser.UserId, Input)
+        InvalidateFoodSuggestions(CurrentUser.UserId)
         return FoodResponse(Food=FoodItem)
     except Exception as ErrorValue:
         raise HTTPException(status_code=400, detail="Failed to create food.") from ErrorValue
@@ -37,7 +85,9 @@ async def CreateFood(Input: CreateFoodInput, CurrentUser: User = Depends(Require
 @FoodRouter.patch("/{FoodId}", response_model=FoodResponse, tags=["Foods"])
 async def EditFood(FoodId: str, Input: UpdateFoodInput, CurrentUser: User = Depends(RequireUser)):
     try:
-        FoodItem = UpdateFood(CurrentUser.UserId, FoodId, Input, IsAdmin=CurrentUser.IsAdmin)
+        FoodItem = await RunDatabaseCall(UpdateFood, CurrentUser.UserId, FoodId, Input, IsAdmin=CurrentUser.IsAdmin)
+        # Renames show up in the index of every user who has logged the food.
+        InvalidateFoodSuggestions()
         return FoodResponse(Food=FoodItem)
     except ValueError as ErrorValue:
         raise HTTPException(status_code=404, detail=str(ErrorValue)) from ErrorValue
@@ -48,7 +98,9 @@ async def EditFood(FoodId: str, Input: UpdateFoodInput, CurrentUser: User = Depe
 @FoodRouter.delete("/{FoodId}", status_code=204, tags=["Foods"])
 async def RemoveFood(FoodId: str, CurrentUser: User = Depends(RequireUser)):
     try:
-        DeleteFood(CurrentUser.UserId, FoodId, IsAdmin=CurrentUser.IsAdmin)
+        await RunDatabaseCall(DeleteFood, CurrentUser.UserId, FoodId, IsAdmin=CurrentUser.IsAdmin)
+        # Admins can delete other users' foods
+        InvalidateFoodSuggestions(None if CurrentUser.IsAdmin else CurrentUser.UserId)
     except ValueError as ErrorValue:
         Message = str(ErrorValue)
         if Message == "Food not found":
@@ -13,14 +13,19 @@ from app.models.schemas import (
     MealTextParseResponse,
     User
 )
+from app.services.food_suggestions_service import InvalidateFoodSuggestions
 from app.services.meal_templates_service import (
     ApplyMealTemplate,
     CreateMealTemplate,
     DeleteMealTemplate,
     UpdateMealTemplate,
-    GetMealTemplates
+    GetMealTemplates,
+    ValidateMealTemplateCreate,
+    ValidateMealTemplateUpdate
 )
 from app.services.meal_text_parse_service import ParseMealText
+from app.services.serving_conversion_service import LearnUnitConversions
+from app.utils.database import RunDatabaseCall
 
 MealTemplateRouter = APIRouter()
 
@@ -32,14 +37,14 @@ class MealTemplateResponse(BaseModel):
 @MealTemplateRouter.get("", response_model=MealTemplateListResponse, tags=["MealTemplates"])
 @MealTemplateRouter.get("/", response_model=MealTemplateListResponse, tags=["MealTemplates"])
 async def ListMealTemplates(CurrentUser: User = Depends(RequireUser)):
-    Templates = GetMealTemplates(CurrentUser.UserId)
+    Templates = await RunDatabaseCall(GetMealTemplates, CurrentUser.UserId)
     return MealTemplateListResponse(Templates=Templates)
 
 
 @MealTemplateRouter.post("/ai-parse", response_model=MealTextParseResponse, tags=["MealTemplates"])
 async def ParseMealTextRoute(Input: MealTextParseInput, CurrentUser: User = Depends(RequireUser)):
     try:
-        Totals = ParseMealText(Input.Text, Input.KnownFoods)
+        Totals = await ParseMealText(Input.Text, Input.KnownFoods)
         return MealTextParseResponse(**Totals)
     except ValueError as ErrorValue:
         raise HTTPException(status_code=400, detail=str(ErrorValue)) from ErrorValue
@@ -54,7 +59,11 @@ async def CreateMealTemplateRoute(
     CurrentUser: User = Depends(RequireUser)
 ):
     try:
-        Template = CreateMealTemplate(CurrentUser.UserId, Input)
+        # Reject bad input before asking the AI for any unit conversion
+        await RunDatabaseCall(ValidateMealTemplateCreate, CurrentUser.UserId, Input)
+        await LearnUnitConversions((Item.FoodId, Item.EntryQuantity, Item.EntryUnit) for Item in Input.Items)
+        Template = await RunDatabaseCall(CreateMealTemplate, CurrentUser.UserId, Input)
+        InvalidateFoodSuggestions(CurrentUser.UserId)
         return MealTemplateResponse(Template=Template)
     except ValueError as ErrorValue:
         raise HTTPException(status_code=400, detail=str(ErrorValue)) from ErrorValue
@@ -66,7 +75,9 @@ async def DeleteMealTemplateRoute(
     CurrentUser: User = Depends(RequireUser)
 ):
     try:
-        DeleteMealTemplate(CurrentUser.UserId, MealTemplateId, IsAdmin=CurrentUser.IsAdmin)
+        await RunDatabaseCall(DeleteMealTemplate, CurrentUser.UserId, MealTemplateId, IsAdmin=CurrentUser.IsAdmin)
+        # Admins can delete other users' templates
+        InvalidateFoodSuggestions(None if CurrentUser.IsAdmin else CurrentUser.UserId)
         return Response(status_code=204)
     except ValueError as ErrorValue:
         raise HTTPException(status_code=400, detail=str(ErrorValue)) from ErrorValue
@@ -79,7 +90,12 @@ async def UpdateMealTemplateRoute(
     CurrentUser: User = Depends(RequireUser)
 ):
     try:
-        Template = UpdateMealTemplate(CurrentUser.UserId, MealTemplateId, Input, IsAdmin=CurrentUser.IsAdmin)
+        # Reject bad input before asking the AI for any unit conversion
+        await RunDatabaseCall(ValidateMealTemplateUpdate, CurrentUser.UserId, MealTemplateId, Input, IsAdmin=CurrentUser.IsAdmin)
+        await LearnUnitConversions((Item.FoodId, Item.EntryQuantity, Item.EntryUnit) for Item in Input.Items or [])
+        Template = await RunDatabaseCall(UpdateMealTemplate, CurrentUser.UserId, MealTemplateId, Input, IsAdmin=CurrentUser.IsAdmin)
+        if Input.TemplateName is not None:
+            InvalidateFoodSuggestions(None if CurrentUser.IsAdmin else CurrentUser.UserId)
         return MealTemplateResponse(Template=Template)
     except ValueError as ErrorValue:
         raise HTTPException(status_code=400, detail=str(ErrorValue)) from ErrorValue
@@ -92,6 +108,6 @@ async def ApplyMealTemplateRoute(
     CurrentUser: User = Depends(RequireUser)
 ):
     try:
-        return ApplyMealTemplate(CurrentUser.UserId, MealTemplateId, Input.LogDate)
+        return await RunDatabaseCall(ApplyMealTemplate, CurrentUser.UserId, MealTemplateId, Input.LogDate)
     except ValueError as ErrorValue:
         raise HTTPException(status_code=400, detail=str(ErrorValue)) from ErrorValue
@@ -3,13 +3,14 @@ from fastapi import APIRouter, Depends, HTTPException
 from app.dependencies import RequireUser
 from app.models.schemas import ScheduleSlotsResponse, ScheduleSlotsUpdateInput, User
 from app.services.schedule_service import GetScheduleSlots, UpdateScheduleSlots
+from app.utils.database import RunDatabaseCall
 
 ScheduleRouter = APIRouter()
 
 
 @ScheduleRouter.get("/", response_model=ScheduleSlotsResponse, tags=["Schedule"])
 async def ListScheduleSlots(CurrentUser: User = Depends(RequireUser)):
-    Slots = GetScheduleSlots(CurrentUser.UserId)
+    Slots = await RunDatabaseCall(GetScheduleSlots, CurrentUser.UserId)
     return ScheduleSlotsResponse(Slots=Slots)
 
 
@@ -19,7 +20,7 @@ async def UpdateScheduleSlotsRoute(
     CurrentUser: User = Depends(RequireUser)
 ):
     try:
-        Slots = UpdateScheduleSlots(CurrentUser.UserId, Input.Slots)
+        Slots = await RunDatabaseCall(UpdateScheduleSlots, CurrentUser.UserId, Input.Slots)
         return ScheduleSlotsResponse(Slots=Slots)
     except Exception as ErrorValue:
         raise HTTPException(status_code=400, detail="Failed to update schedule.") from ErrorValue
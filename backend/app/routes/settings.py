@@ -17,13 +17,14 @@ from app.services.recommendation_logs_service import (
     SaveRecommendationLog
 )
 from app.services.settings_service import GetUserSettings, UpdateUserSettings
+from app.utils.database import RunDatabaseCall
 
 SettingsRouter = APIRouter()
 
 
 @SettingsRouter.get("/", response_model=UserSettings, tags=["Settings"])
 async def GetSettingsRoute(CurrentUser: User = Depends(RequireUser)):
-    return GetUserSettings(CurrentUser.UserId)
+    return await RunDatabaseCall(GetUserSettings, CurrentUser.UserId)
 
 
 @SettingsRouter.put("/", response_model=UserSettings, tags=["Settings"])
@@ -32,7 +33,7 @@ async def UpdateSettingsRoute(
     CurrentUser: User = Depends(RequireUser)
 ):
     try:
-        return UpdateUserSettings(CurrentUser.UserId, Input)
+        return await RunDatabaseCall(UpdateUserSettings, CurrentUser.UserId, Input)
     except Exception as ErrorValue:
         raise HTTPException(status_code=400, detail="Failed to update settings.") from ErrorValue
 
@@ -52,7 +53,7 @@ async def GetAiRecommendations(CurrentUser: User = Depends(RequireUser)):
     
     try:
         Age = CalculateAge(CurrentUser.BirthDate)
-        Recommendation, ModelUsed = GetAiNutritionRecommendations(
+        Recommendation, ModelUsed = await GetAiNutritionRecommendations(
             Age=Age,
             HeightCm=CurrentUser.HeightCm,
             WeightKg=CurrentUser.WeightKg,
@@ -60,7 +61,8 @@ async def GetAiRecommendations(CurrentUser: User = Depends(RequireUser)):
         )
         
         # Save recommendation to logs
-        SaveRecommendationLog(
+        await RunDatabaseCall(
+            SaveRecommendationLog,
             UserId=CurrentUser.UserId,
             Age=Age,
             HeightCm=CurrentUser.HeightCm,
@@ -82,7 +84,7 @@ async def GetAiRecommendations(CurrentUser: User = Depends(RequireUser)):
 async def GetRecommendationHistory(CurrentUser: User = Depends(RequireUser), Limit: int = 10):
     """Get user's AI recommendation history."""
     try:
-        Logs = GetRecommendationLogsByUser(CurrentUser.UserId, Limit)
+        Logs = await RunDatabaseCall(GetRecommendationLogsByUser, CurrentUser.UserId, Limit)
         return RecommendationLogListResponse(Logs=Logs)
     except Exception as ErrorValue:
         raise HTTPException(status_code=500, detail="Failed to retrieve recommendation history.") from ErrorValue
@@ -2,8 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 
 from app.dependencies import RequireUser
-from app.models.schemas import User, WeeklySummary
-from app.services.summary_service import GetWeeklySummary
+from app.models.schemas import RangeSummary, SummaryBucketSize, User, WeeklySummary
+from app.services.summary_service import GetRangeSummary, GetWeeklySummary
+from app.utils.database import RunDatabaseCall
 
 SummaryRouter = APIRouter()
 
@@ -12,13 +13,35 @@ class WeeklySummaryResponse(BaseModel):
     WeeklySummary: WeeklySummary
 
 
+class RangeSummaryResponse(BaseModel):
+    RangeSummary: RangeSummary
+
+
 @SummaryRouter.get("/weekly", response_model=WeeklySummaryResponse, tags=["Summary"])
 async def GetWeeklySummaryRoute(
     StartDate: str = Query(..., min_length=1),
     CurrentUser: User = Depends(RequireUser)
 ):
     try:
-        Summary = GetWeeklySummary(CurrentUser.UserId, StartDate)
+        Summary = await RunDatabaseCall(GetWeeklySummary, CurrentUser.UserId, StartDate)
         return WeeklySummaryResponse(WeeklySummary=Summary)
+    except ValueError as ErrorValue:
+        raise HTTPException(status_code=400, detail=str(ErrorValue)) from ErrorValue
     except Exception as ErrorValue:
         raise HTTPException(status_code=500, detail="Failed to load weekly summary.") from ErrorValue
+
+
+@SummaryRouter.get("/range", response_model=RangeSummaryResponse, tags=["Summary"])
+async def GetRangeSummaryRoute(
+    Start: str = Query(..., min_length=1),
+    End: str = Query(..., min_length=1),
+    Bucket: SummaryBucketSize = Query(SummaryBucketSize.Day),
+    CurrentUser: User = Depends(RequireUser)
+):
+    try:
+        Summary = await RunDatabaseCall(GetRangeSummary, CurrentUser.UserId, Start, End, Bucket)
+        return RangeSummaryResponse(RangeSummary=Summary)
+    except ValueError as ErrorValue:
+        raise HTTPException(status_code=400, detail=str(ErrorValue)) from ErrorValue
+    except Exception as ErrorValue:
+        raise HTTPException(status_code=500, detail="Failed to load range summary.") from ErrorValue
@@ -0,0 +1,136 @@
+"""
+Persistent cache for AI food text and image lookups.
+
+Keys hash the lookup kind, normalised query, a version derived from the system
+prompt and the configured model, so editing a prompt or switching models
+starts a fresh set of entries without an explicit flush.
+
+Image entries are keyed by the SHA-256 of the uploaded image bytes. They also
+store a 64-bit difference hash of the picture (see app.utils.image_processing),
+so a re-encoded or slightly different photo of the same meal can reuse the
+earlier answer. The perceptual hash needs the optional Pillow package; without
+it only exact matches hit.
+
+Writes do not trim; the lookup cache sweeper calls PurgeAiLookupCache to drop
+expired entries and bring both tables back under their size bounds.
+"""
+
+import hashlib
+import json
+from typing import Any, Optional
+
+from app.config import Settings
+from app.services.lookup_cache import SqliteAiLookupCache, SqliteImageLookupCache
+from app.utils.database import RunDatabaseCall
+from app.utils.image_processing import IsPillowAvailable
+from app.utils.logger import GetLogger
+from app.utils.lookup_keys import NormalizeLookupKey
+
+Logger = GetLogger("ai_lookup_cache_service")
+_Cache: Optional[SqliteAiLookupCache] = None
+_ImageCache: Optional[SqliteImageLookupCache] = None
+
+
+def GetAiLookupCache() -> SqliteAiLookupCache:
+    global _Cache
+    if _Cache is None:
+        _Cache = SqliteAiLookupCache(Settings.AiLookupCacheMaxEntries, Settings.AiLookupCacheMaxBytes)
+    return _Cache
+
+
+def GetImageLookupCache() -> SqliteImageLookupCache:
+    global _ImageCache
+    if _ImageCache is None:
+        _ImageCache = SqliteImageLookupCache(Settings.ImageLookupCacheMaxEntries, Settings.ImageLookupCacheMaxBytes)
+    return _ImageCache
+
+
+def GetPromptVersion(SystemPrompt: str) -> str:
+    return hashlib.sha256(SystemPrompt.encode("utf-8")).hexdigest()[:12]
+
+
+def BuildAiLookupCacheKey(Kind: str, Query: str, SystemPrompt: str, Model: str) -> str:
+    KeyParts = [Kind, NormalizeLookupKey(Query), GetPromptVersion(SystemPrompt), Model]
+    return hashlib.sha256(json.dumps(KeyParts).encode("utf-8")).hexdigest()
+
+
+def BuildImageLookupCacheKey(ContentHash: str, Variant: str) -> str:
+    return hashlib.sha256(json.dumps(["image", ContentHash, Variant]).encode("utf-8")).hexdigest()
+
+
+async def GetCachedAiLookup(Key: str) -> Optional[Any]:
+    if not Settings.AiLookupCacheEnabled:
+        return None
+    try:
+        return await RunDatabaseCall(GetAiLookupCache().Get, Key)
+    except Exception as E:
+        # A cache failure should never block the live lookup.
+        Logger.warning(f"AI lookup cache read failed: {E}")
+        return None
+
+
+async def StoreAiLookup(Key: str, Value: Any) -> None:
+    if not Settings.AiLookupCacheEnabled:
+        return
+    try:
+        await RunDatabaseCall(GetAiLookupCache().Set, Key, Value, Settings.AiLookupCacheTtlSeconds)
+    except Exception as E:
+        Logger.warning(f"AI lookup cache write failed: {E}")
+
+
+def _GetImage(ContentHash: str, PerceptualHash: Optional[str], Variant: str) -> Optional[Any]:
+    return GetImageLookupCache().GetImage(
+        BuildImageLookupCacheKey(ContentHash, Variant),
+        PerceptualHash,
+        Variant,
+        Settings.ImageLookupMaxHashDistance,
+        Settings.ImageLookupSimilarScanLimit
+    )
+
+
+def _StoreImage(ContentHash: str, PerceptualHash: Optional[str], Variant: str, Value: Any) -> None:
+    GetImageLookupCache().SetImage(
+        BuildImageLookupCacheKey(ContentHash, Variant),
+        PerceptualHash,
+        Variant,
+        Value,
+        Settings.ImageLookupCacheTtlSeconds
+    )
+
+
+async def GetCachedImageLookup(ContentHash: str, PerceptualHash: Optional[str], Variant: str) -> Optional[Any]:
+    if not Settings.AiLookupCacheEnabled:
+        return None
+    try:
+        return await RunDatabaseCall(_GetImage, ContentHash, PerceptualHash, Variant)
+    except Exception as E:
+        Logger.warning(f"Image lookup cache read failed: {E}")
+        return None
+
+
+async def StoreImageLookup(ContentHash: str, PerceptualHash: Optional[str], Variant: str, Value: Any) -> None:
+    if not Settings.AiLookupCacheEnabled:
+        return
+    try:
+        await RunDatabaseCall(_StoreImage, ContentHash, PerceptualHash, Variant, Value)
+    except Exception as E:
+        Logger.warning(f"Image lookup cache write failed: {E}")
+
+
+def GetAiLookupCacheStats() -> dict[str, Any]:
+    Stats = GetAiLookupCache().GetStats()
+    Stats["enabled"] = Settings.AiLookupCacheEnabled
+    Stats["ttl_seconds"] = Settings.AiLookupCacheTtlSeconds
+    ImageStats = GetImageLookupCache().GetStats()
+    ImageStats["ttl_seconds"] = Settings.ImageLookupCacheTtlSeconds
+    ImageStats["perceptual_hash_available"] = IsPillowAvailable()
+    Stats["image"] = ImageStats
+    return Stats
+
+
+def PurgeAiLookupCache(All: bool = False) -> int:
+    """Drop expired entries (and trim to size), or every entry when All is set."""
+    Removed = 0
+    for Cache in (GetAiLookupCache(), GetImageLookupCache()):
+        Removed += Cache.Clear() if All else Cache.PurgeExpired()
+    return Removed
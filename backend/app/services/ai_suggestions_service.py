@@ -3,7 +3,8 @@ import json
 from app.config import Settings
 from app.models.schemas import Suggestion
 from app.services.daily_logs_service import GetDailyLogByDate, GetEntriesForLog, GetSettings
-from app.services.openai_client import GetOpenAiContentWithModel
+from app.services.openai_client import GetOpenAiContentWithModelAsync
+from app.utils.database import RunDatabaseCall
 
 
 def BuildAiPrompt(LogDate: str, Steps: int, Entries: list[dict], Targets: dict) -> str:
@@ -54,16 +55,16 @@ def ParseAiSuggestions(Content: str) -> list[Suggestion]:
     return Suggestions
 
 
-def GetAiSuggestions(UserId: str, LogDate: str) -> tuple[list[Suggestion], str]:
+async def GetAiSuggestions(UserId: str, LogDate: str) -> tuple[list[Suggestion], str]:
     if not Settings.OpenAiApiKey:
         raise ValueError("OpenAI API key not configured.")
 
-    LogItem = GetDailyLogByDate(UserId, LogDate)
+    LogItem = await RunDatabaseCall(GetDailyLogByDate, UserId, LogDate)
     if LogItem is None:
         raise ValueError("Daily log not found.")
 
-    Entries = GetEntriesForLog(UserId, LogItem.DailyLogId)
-    Targets = GetSettings(UserId)
+    Entries = await RunDatabaseCall(GetEntriesForLog, UserId, LogItem.DailyLogId)
+    Targets = await RunDatabaseCall(GetSettings, UserId)
 
     PayloadEntries = [
         {
@@ -84,7 +85,7 @@ def GetAiSuggestions(UserId: str, LogDate: str) -> tuple[list[Suggestion], str]:
 
     Prompt = BuildAiPrompt(LogDate, LogItem.Steps, PayloadEntries, TargetsPayload)
 
-    Content, ModelUsed = GetOpenAiContentWithModel(
+    Content, ModelUsed = await GetOpenAiContentWithModelAsync(
         [
             {
                 "role": "system",
@@ -9,20 +9,42 @@ def RoundProtein(Value: float) -> float:
     return round(Value * 10) / 10
 
 
+def SumEntryNutrients(Entries: list[MealEntryWithFood]) -> dict[str, float]:
+    return {
+        "Calories": sum(Entry.CaloriesPerServing * Entry.Quantity for Entry in Entries),
+        "Protein": sum(Entry.ProteinPerServing * Entry.Quantity for Entry in Entries),
+        "Fibre": sum((Entry.FibrePerServing or 0) * Entry.Quantity for Entry in Entries),
+        "Carbs": sum((Entry.CarbsPerServing or 0) * Entry.Quantity for Entry in Entries),
+        "Fat": sum((Entry.FatPerServing or 0) * Entry.Quantity for Entry in Entries),
+        "SaturatedFat": sum((Entry.SaturatedFatPerServing or 0) * Entry.Quantity for Entry in Entries),
+        "Sugar": sum((Entry.SugarPerServing or 0) * Entry.Quantity for Entry in Entries),
+        "Sodium": sum((Entry.SodiumPerServing or 0) * Entry.Quantity for Entry in Entries)
+    }
+
+
 def CalculateDailyTotals(
     Entries: list[MealEntryWithFood],
     Steps: int,
     StepKcalFactor: float,
     Targets: Targets
 ) -> DailyTotals:
-    TotalCaloriesRaw = sum(Entry.CaloriesPerServing * Entry.Quantity for Entry in Entries)
-    TotalProteinRaw = sum(Entry.ProteinPerServing * Entry.Quantity for Entry in Entries)
-    TotalFibreRaw = sum((Entry.FibrePerServing or 0) * Entry.Quantity for Entry in Entries)
-    TotalCarbsRaw = sum((Entry.CarbsPerServing or 0) * Entry.Quantity for Entry in Entries)
-    TotalFatRaw = sum((Entry.FatPerServing or 0) * Entry.Quantity for Entry in Entries)
-    TotalSaturatedFatRaw = sum((Entry.SaturatedFatPerServing or 0) * Entry.Quantity for Entry in Entries)
-    TotalSugarRaw = sum((Entry.SugarPerServing or 0) * Entry.Quantity for Entry in Entries)
-    TotalSodiumRaw = sum((Entry.SodiumPerServing or 0) * Entry.Quantity for Entry in Entries)
+    return BuildDailyTotals(SumEntryNutrients(Entries), Steps, StepKcalFactor, Targets)
+
+
+def BuildDailyTotals(
+    Nutrients: dict[str, float],
+    Steps: int,
+    StepKcalFactor: float,
+    Targets: Targets
+) -> DailyTotals:
+    TotalCaloriesRaw = Nutrients.get("Calories", 0)
+    TotalProteinRaw = Nutrients.get("Protein", 0)
+    TotalFibreRaw = Nutrients.get("Fibre", 0)
+    TotalCarbsRaw = Nutrients.get("Carbs", 0)
+    TotalFatRaw = Nutrients.get("Fat", 0)
+    TotalSaturatedFatRaw = Nutrients.get("SaturatedFat", 0)
+    TotalSugarRaw = Nutrients.get("Sugar", 0)
+    TotalSodiumRaw = Nutrients.get("Sodium", 0)
 
     SafeSteps = max(0, round(Steps))
     CaloriesBurnedRaw = SafeSteps * StepKcalFactor
@@ -8,10 +8,28 @@ from app.models.schemas import (
     MealEntryWithFood,
     Targets
 )
+from app.services.daily_totals_service import RefreshDailyTotals, RefreshDailyTotalsForDate
 from app.services.serving_conversion_service import ConvertEntryToServings
-from app.utils.database import ExecuteQuery, FetchAll, FetchOne
+from app.utils.database import ExecuteMany, ExecuteQuery, FetchAll, FetchOne, Transaction
 from app.utils.defaults import DefaultTargets
 
+MealEntryInsertSql = """
+    INSERT INTO MealEntries (
+        MealEntryId,
+        DailyLogId,
+        MealType,
+        FoodId,
+        MealTemplateId,
+        Quantity,
+        EntryQuantity,
+        EntryUnit,
+        ConversionDetail,
+        EntryNotes,
+        SortOrder,
+        ScheduleSlotId
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+"""
+
 
 def GetSettings(UserId: str) -> Targets:
     Row = FetchOne(
@@ -157,11 +175,20 @@ def GetEntriesForLog(UserId: str, DailyLogId: str) -> list[MealEntryWithFood]:
             Foods.SaturatedFatPerServing AS SaturatedFatPerServing,
             Foods.SugarPerServing AS SugarPerServing,
             Foods.SodiumPerServing AS SodiumPerServing,
-            MealTemplates.TemplateName AS TemplateName
+            MealTemplates.TemplateName AS TemplateName,
+            MealTemplateTotals.Calories AS TotalCalories,
+            MealTemplateTotals.Protein AS TotalProtein,
+            MealTemplateTotals.Fibre AS TotalFibre,
+            MealTemplateTotals.Carbs AS TotalCarbs,
+            MealTemplateTotals.Fat AS TotalFat,
+            MealTemplateTotals.SaturatedFat AS TotalSaturatedFat,
+            MealTemplateTotals.Sugar AS TotalSugar,
+            MealTemplateTotals.Sodium AS TotalSodium
         FROM MealEntries
         INNER JOIN DailyLogs ON DailyLogs.DailyLogId = MealEntries.DailyLogId
         LEFT JOIN Foods ON Foods.FoodId = MealEntries.FoodId
         LEFT JOIN MealTemplates ON MealTemplates.MealTemplateId = MealEntries.MealTemplateId
+        LEFT JOIN MealTemplateTotals ON MealTemplateTotals.MealTemplateId = MealEntries.MealTemplateId
         WHERE MealEntries.DailyLogId = ?
             AND DailyLogs.UserId = ?
         ORDER BY MealEntries.MealType, MealEntries.SortOrder, MealEntries.CreatedAt;
@@ -171,35 +198,17 @@ def GetEntriesForLog(UserId: str, DailyLogId: str) -> list[MealEntryWithFood]:
 
     Entries: list[MealEntryWithFood] = []
     for Row in Rows:
-        # For template entries, calculate totals from template items
+        # For template entries, use the materialized MealTemplateTotals row
         if Row["MealTemplateId"]:
-            TemplateRows = FetchAll(
-                """
-                SELECT
-                    Foods.CaloriesPerServing,
-                    Foods.ProteinPerServing,
-                    Foods.FibrePerServing,
-                    Foods.CarbsPerServing,
-                    Foods.FatPerServing,
-                    Foods.SaturatedFatPerServing,
-                    Foods.SugarPerServing,
-                    Foods.SodiumPerServing,
-                    MealTemplateItems.Quantity
-                FROM MealTemplateItems
-                INNER JOIN Foods ON Foods.FoodId = MealTemplateItems.FoodId
-                WHERE MealTemplateItems.MealTemplateId = ?
-                """,
-                [Row["MealTemplateId"]]
-            )
-            TotalCalories = sum(int(r["CaloriesPerServing"]) * float(r["Quantity"]) for r in TemplateRows)
-            TotalProtein = sum(float(r["ProteinPerServing"]) * float(r["Quantity"]) for r in TemplateRows)
-            TotalFibre = sum((float(r["FibrePerServing"]) if r["FibrePerServing"] else 0) * float(r["Quantity"]) for r in TemplateRows)
-            TotalCarbs = sum((float(r["CarbsPerServing"]) if r["CarbsPerServing"] else 0) * float(r["Quantity"]) for r in TemplateRows)
-            TotalFat = sum((float(r["FatPerServing"]) if r["FatPerServing"] else 0) * float(r["Quantity"]) for r in TemplateRows)
-            TotalSaturatedFat = sum((float(r["SaturatedFatPerServing"]) if r["SaturatedFatPerServing"] else 0) * float(r["Quantity"]) for r in TemplateRows)
-            TotalSugar = sum((float(r["SugarPerServing"]) if r["SugarPerServing"] else 0) * float(r["Quantity"]) for r in TemplateRows)
-            TotalSodium = sum((float(r["SodiumPerServing"]) if r["SodiumPerServing"] else 0) * float(r["Quantity"]) for r in TemplateRows)
-            
+            TotalCalories = Row["TotalCalories"] or 0
+            TotalProtein = Row["TotalProtein"] or 0
+            TotalFibre = Row["TotalFibre"] or 0
+            TotalCarbs = Row["TotalCarbs"] or 0
+            TotalFat = Row["TotalFat"] or 0
+            TotalSaturatedFat = Row["TotalSaturatedFat"] or 0
+            TotalSugar = Row["TotalSugar"] or 0
+            TotalSodium = Row["TotalSodium"] or 0
+
             Entries.append(
                 MealEntryWithFood(
                     MealEntryId=Row["MealEntryId"],
@@ -263,37 +272,39 @@ def GetEntriesForLog(UserId: str, DailyLogId: str) -> list[MealEntryWithFood]:
 def UpsertDailyLog(UserId: str, Input: CreateDailyLogInput) -> DailyLog:
     DailyLogId = str(uuid.uuid4())
 
-    ExecuteQuery(
-        """
-        INSERT INTO DailyLogs (
-            DailyLogId,
-            UserId,
-            LogDate,
-            Steps,
-            StepKcalFactorOverride,
-            WeightKg,
-            Notes
-        ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT (UserId, LogDate)
-        DO UPDATE SET
-            Steps = excluded.Steps,
-            StepKcalFactorOverride = excluded.StepKcalFactorOverride,
-            WeightKg = excluded.WeightKg,
-            Notes = excluded.Notes;
-        """,
-        [
-            DailyLogId,
-            UserId,
-            Input.LogDate,
-            Input.Steps,
-            Input.StepKcalFactorOverride,
-            Input.WeightKg,
-            Input.Notes
-        ]
-    )
+    with Transaction():
+        ExecuteQuery(
+            """
+            INSERT INTO DailyLogs (
+                DailyLogId,
+                UserId,
+                LogDate,
+                Steps,
+                StepKcalFactorOverride,
+                WeightKg,
+                Notes
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (UserId, LogDate)
+            DO UPDATE SET
+                Steps = excluded.Steps,
+                StepKcalFactorOverride = excluded.StepKcalFactorOverride,
+                WeightKg = excluded.WeightKg,
+                Notes = excluded.Notes;
+            """,
+            [
+                DailyLogId,
+                UserId,
+                Input.LogDate,
+                Input.Steps,
+                Input.StepKcalFactorOverride,
+                Input.WeightKg,
+                Input.Notes
+            ]
+        )
 
-    if Input.WeightKg is not None:
-        UpdateUserWeightFromLatestLog(UserId)
+        if Input.WeightKg is not None:
+            UpdateUserWeightFromLatestLog(UserId)
+        RefreshDailyTotalsForDate(UserId, Input.LogDate)
 
     Result = GetDailyLogByDate(UserId, Input.LogDate)
     if Result is None:
@@ -304,27 +315,29 @@ def UpsertDailyLog(UserId: str, Input: CreateDailyLogInput) -> DailyLog:
 def UpdateSteps(UserId: str, LogDate: str, Steps: int, StepKcalFactorOverride: float | None, WeightKg: float | None = None) -> DailyLog:
     DailyLogId = str(uuid.uuid4())
 
-    ExecuteQuery(
-        """
-        INSERT INTO DailyLogs (
-            DailyLogId,
-            UserId,
-            LogDate,
-            Steps,
-            StepKcalFactorOverride,
-            WeightKg
-        ) VALUES (?, ?, ?, ?, ?, ?)
-        ON CONFLICT (UserId, LogDate)
-        DO UPDATE SET
-            Steps = excluded.Steps,
-            StepKcalFactorOverride = excluded.StepKcalFactorOverride,
-            WeightKg = COALESCE(excluded.WeightKg, WeightKg);
-        """,
-        [DailyLogId, UserId, LogDate, Steps, StepKcalFactorOverride, WeightKg]
-    )
+    with Transaction():
+        ExecuteQuery(
+            """
+            INSERT INTO DailyLogs (
+                DailyLogId,
+                UserId,
+                LogDate,
+                Steps,
+                StepKcalFactorOverride,
+                WeightKg
+            ) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (UserId, LogDate)
+            DO UPDATE SET
+                Steps = excluded.Steps,
+                StepKcalFactorOverride = excluded.StepKcalFactorOverride,
+                WeightKg = COALESCE(excluded.WeightKg, WeightKg);
+            """,
+            [DailyLogId, UserId, LogDate, Steps, StepKcalFactorOverride, WeightKg]
+        )
 
-    if WeightKg is not None:
-        UpdateUserWeightFromLatestLog(UserId)
+        if WeightKg is not None:
+            UpdateUserWeightFromLatestLog(UserId)
+        RefreshDailyTotalsForDate(UserId, LogDate)
 
     Result = GetDailyLogByDate(UserId, LogDate)
     if Result is None:
@@ -361,18 +374,20 @@ def EnsureDailyLogForDate(UserId: str, LogDate: str) -> DailyLog:
         return Existing
 
     DailyLogId = str(uuid.uuid4())
-    ExecuteQuery(
-        """
-        INSERT INTO DailyLogs (
-            DailyLogId,
-            UserId,
-            LogDate,
-            Steps,
-            StepKcalFactorOverride
-        ) VALUES (?, ?, ?, ?, ?);
-        """,
-        [DailyLogId, UserId, LogDate, 0, None]
-    )
+    with Transaction():
+        ExecuteQuery(
+            """
+            INSERT INTO DailyLogs (
+                DailyLogId,
+                UserId,
+                LogDate,
+                Steps,
+                StepKcalFactorOverride
+            ) VALUES (?, ?, ?, ?, ?);
+            """,
+            [DailyLogId, UserId, LogDate, 0, None]
+        )
+        RefreshDailyTotals(DailyLogId)
 
     Result = GetDailyLogByDate(UserId, LogDate)
     if Result is None:
@@ -380,7 +395,8 @@ def EnsureDailyLogForDate(UserId: str, LogDate: str) -> DailyLog:
     return Result
 
 
-def CreateMealEntry(UserId: str, Input: CreateMealEntryInput) -> MealEntry:
+def ValidateMealEntryInput(UserId: str, Input: CreateMealEntryInput) -> dict | None:
+    """Check the entry's log, food, template and slot; returns the food row when FoodId is set."""
     LogRow = FetchOne(
         """
         SELECT
@@ -443,22 +459,32 @@ def CreateMealEntry(UserId: str, Input: CreateMealEntryInput) -> MealEntry:
         if SlotRow is None:
             raise ValueError("Schedule slot not found.")
 
+    if Input.FoodId and (Input.EntryQuantity is None) != (Input.EntryUnit is None):
+        raise ValueError("EntryQuantity and EntryUnit must be provided together.")
+
+    return FoodRow
+
+
+def _BuildMealEntryRow(UserId: str, Input: CreateMealEntryInput, ConvertUnits: bool = True) -> list:
+    FoodRow = ValidateMealEntryInput(UserId, Input)
+
     Quantity = Input.Quantity
     EntryQuantity = Input.EntryQuantity
     EntryUnit = Input.EntryUnit
     ConversionDetail = None
 
     if Input.FoodId:
-        if (EntryQuantity is None) != (EntryUnit is None):
-            raise ValueError("EntryQuantity and EntryUnit must be provided together.")
         if EntryQuantity is not None and EntryUnit is not None and FoodRow is not None:
-            Quantity, ConversionDetail, EntryUnit = ConvertEntryToServings(
-                FoodRow["FoodName"],
-                float(FoodRow["ServingQuantity"]) if FoodRow["ServingQuantity"] else 1.0,
-                FoodRow["ServingUnit"] or "serving",
-                EntryQuantity,
-                EntryUnit
-            )
+            # Callers that already resolved Quantity to servings (template items) skip the conversion.
+            if ConvertUnits:
+                Quantity, ConversionDetail, EntryUnit = ConvertEntryToServings(
+                    FoodRow["FoodName"],
+                    float(FoodRow["ServingQuantity"]) if FoodRow["ServingQuantity"] else 1.0,
+                    FoodRow["ServingUnit"] or "serving",
+                    EntryQuantity,
+                    EntryUnit,
+                    FoodId=FoodRow["FoodId"]
+                )
         else:
             EntryQuantity = Input.Quantity
             EntryUnit = "serving"
@@ -466,40 +492,39 @@ def CreateMealEntry(UserId: str, Input: CreateMealEntryInput) -> MealEntry:
     if Quantity <= 0:
         raise ValueError("Quantity must be greater than zero.")
 
-    MealEntryId = str(uuid.uuid4())
+    return [
+        str(uuid.uuid4()),
+        Input.DailyLogId,
+        Input.MealType,
+        Input.FoodId,
+        Input.MealTemplateId,
+        Quantity,
+        EntryQuantity,
+        EntryUnit,
+        ConversionDetail,
+        Input.EntryNotes,
+        Input.SortOrder,
+        Input.ScheduleSlotId
+    ]
+
+
+def CreateMealEntries(UserId: str, Inputs: list[CreateMealEntryInput], ConvertUnits: bool = True) -> int:
+    EntryRows = [_BuildMealEntryRow(UserId, Input, ConvertUnits) for Input in Inputs]
+    if not EntryRows:
+        return 0
+    with Transaction():
+        ExecuteMany(MealEntryInsertSql, EntryRows)
+        for DailyLogId in {EntryRow[1] for EntryRow in EntryRows}:
+            RefreshDailyTotals(DailyLogId)
+    return len(EntryRows)
 
-    ExecuteQuery(
-        """
-        INSERT INTO MealEntries (
-            MealEntryId,
-            DailyLogId,
-            MealType,
-            FoodId,
-            MealTemplateId,
-            Quantity,
-            EntryQuantity,
-            EntryUnit,
-            ConversionDetail,
-            EntryNotes,
-            SortOrder,
-            ScheduleSlotId
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
-        """,
-        [
-            MealEntryId,
-            Input.DailyLogId,
-            Input.MealType,
-            Input.FoodId,
-            Input.MealTemplateId,
-            Quantity,
-            EntryQuantity,
-            EntryUnit,
-            ConversionDetail,
-            Input.EntryNotes,
-            Input.SortOrder,
-            Input.ScheduleSlotId
-        ]
-    )
+
+def CreateMealEntry(UserId: str, Input: CreateMealEntryInput) -> MealEntry:
+    EntryRow = _BuildMealEntryRow(UserId, Input)
+    MealEntryId = EntryRow[0]
+    with Transaction():
+        ExecuteQuery(MealEntryInsertSql, EntryRow)
+        RefreshDailyTotals(Input.DailyLogId)
 
     Row = FetchOne(
         """
@@ -547,7 +572,7 @@ def DeleteMealEntry(UserId: str, MealEntryId: str, IsAdmin: bool = False) -> Non
     if IsAdmin:
         Existing = FetchOne(
             """
-            SELECT MealEntryId AS MealEntryId
+            SELECT MealEntryId AS MealEntryId, DailyLogId AS DailyLogId
             FROM MealEntries
             WHERE MealEntryId = ?;
             """,
@@ -557,7 +582,8 @@ def DeleteMealEntry(UserId: str, MealEntryId: str, IsAdmin: bool = False) -> Non
         Existing = FetchOne(
             """
             SELECT
-                MealEntries.MealEntryId AS MealEntryId
+                MealEntries.MealEntryId AS MealEntryId,
+                MealEntries.DailyLogId AS DailyLogId
             FROM MealEntries
             INNER JOIN DailyLogs
                 ON MealEntries.DailyLogId = DailyLogs.DailyLogId
@@ -569,7 +595,9 @@ def DeleteMealEntry(UserId: str, MealEntryId: str, IsAdmin: bool = False) -> Non
     if Existing is None:
         raise ValueError("Meal entry not found.")
 
-    ExecuteQuery(
-        "DELETE FROM MealEntries WHERE MealEntryId = ?;",
-        [MealEntryId]
-    )
+    with Transaction():
+        ExecuteQuery(
+            "DELETE FROM MealEntries WHERE MealEntryId = ?;",
+            [MealEntryId]
+        )
+        RefreshDailyTotals(Existing["DailyLogId"])
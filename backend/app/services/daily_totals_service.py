@@ -0,0 +1,111 @@
+from app.utils.database import ExecuteQuery, FetchOne, Transaction
+
+NutrientColumns = [
+    ("Calories", "CaloriesPerServing"),
+    ("Protein", "ProteinPerServing"),
+    ("Fibre", "FibrePerServing"),
+    ("Carbs", "CarbsPerServing"),
+    ("Fat", "FatPerServing"),
+    ("SaturatedFat", "SaturatedFatPerServing"),
+    ("Sugar", "SugarPerServing"),
+    ("Sodium", "SodiumPerServing")
+]
+
+
+def _BuildRefreshSql(Filter: str) -> str:
+    # Template entries always count as one serving of the template, matching GetEntriesForLog.
+    SumColumns = "".join(
+        f"""
+        COALESCE(SUM(
+            CASE
+                WHEN MealEntries.MealTemplateId IS NOT NULL THEN COALESCE(MealTemplateTotals.{Name}, 0)
+                ELSE COALESCE(Foods.{FoodColumn}, 0) * MealEntries.Quantity
+            END
+        ), 0),"""
+        for Name, FoodColumn in NutrientColumns
+    )
+    Names = ", ".join(Name for Name, _FoodColumn in NutrientColumns)
+    Updates = ",\n".join(f"        {Name} = excluded.{Name}" for Name, _FoodColumn in NutrientColumns)
+    return f"""
+    INSERT INTO DailyTotals (
+        UserId, LogDate, DailyLogId, {Names}, EntryCount, UpdatedAt
+    )
+    SELECT
+        DailyLogs.UserId,
+        DailyLogs.LogDate,
+        DailyLogs.DailyLogId,{SumColumns}
+        COUNT(MealEntries.MealEntryId),
+        CURRENT_TIMESTAMP
+    FROM DailyLogs
+    LEFT JOIN MealEntries ON MealEntries.DailyLogId = DailyLogs.DailyLogId
+    LEFT JOIN Foods ON Foods.FoodId = MealEntries.FoodId
+    LEFT JOIN MealTemplateTotals ON MealTemplateTotals.MealTemplateId = MealEntries.MealTemplateId
+    WHERE {Filter}
+    GROUP BY DailyLogs.DailyLogId
+    ON CONFLICT (UserId, LogDate) DO UPDATE SET
+        DailyLogId = excluded.DailyLogId,
+{Updates},
+        EntryCount = excluded.EntryCount,
+        UpdatedAt = excluded.UpdatedAt;
+    """
+
+
+def RefreshDailyTotals(DailyLogId: str) -> None:
+    ExecuteQuery(_BuildRefreshSql("DailyLogs.DailyLogId = ?"), [DailyLogId])
+
+
+def RefreshDailyTotalsForDate(UserId: str, LogDate: str) -> None:
+    ExecuteQuery(
+        _BuildRefreshSql("DailyLogs.UserId = ? AND DailyLogs.LogDate = ?"),
+        [UserId, LogDate]
+    )
+
+
+def RefreshDailyTotalsForFood(FoodId: str) -> None:
+    ExecuteQuery(
+        _BuildRefreshSql(
+            """DailyLogs.DailyLogId IN (
+                SELECT DailyLogId FROM MealEntries
+                WHERE FoodId = ?
+                    OR MealTemplateId IN (SELECT MealTemplateId FROM MealTemplateItems WHERE FoodId = ?)
+            )"""
+        ),
+        [FoodId, FoodId]
+    )
+
+
+def RefreshDailyTotalsForTemplate(MealTemplateId: str) -> None:
+    ExecuteQuery(
+        _BuildRefreshSql(
+            "DailyLogs.DailyLogId IN (SELECT DailyLogId FROM MealEntries WHERE MealTemplateId = ?)"
+        ),
+        [MealTemplateId]
+    )
+
+
+def RebuildDailyTotals(UserId: str | None = None) -> int:
+    """Recompute the rollup from scratch, for backfills and repairs."""
+    with Transaction():
+        if UserId is None:
+            ExecuteQuery("DELETE FROM DailyTotals;")
+            ExecuteQuery(_BuildRefreshSql("1 = 1"))
+            Row = FetchOne("SELECT COUNT(1) AS Count FROM DailyTotals;")
+        else:
+            ExecuteQuery("DELETE FROM DailyTotals WHERE UserId = ?;", [UserId])
+            ExecuteQuery(_BuildRefreshSql("DailyLogs.UserId = ?"), [UserId])
+            Row = FetchOne("SELECT COUNT(1) AS Count FROM DailyTotals WHERE UserId = ?;", [UserId])
+    return int(Row["Count"]) if Row else 0
+
+
+def GetDailyNutrientTotals(DailyLogId: str) -> dict[str, float] | None:
+    Row = FetchOne(
+        f"""
+        SELECT {", ".join(Name for Name, _FoodColumn in NutrientColumns)}
+        FROM DailyTotals
+        WHERE DailyLogId = ?;
+        """,
+        [DailyLogId]
+    )
+    if Row is None:
+        return None
+    return {Name: float(Row[Name]) for Name, _FoodColumn in NutrientColumns}
@@ -2,21 +2,35 @@
 Service for looking up food information using AI (text), image recognition, and barcode scanning.
 """
 import base64
+import binascii
 import json
 import re
-from typing import Optional
-
-import httpx
+from typing import BinaryIO, Optional
 
 from app.config import Settings
+from app.models.schemas import FoodInfo
+from app.services.ai_lookup_cache_service import (
+    BuildAiLookupCacheKey,
+    GetCachedAiLookup,
+    GetCachedImageLookup,
+    GetPromptVersion,
+    StoreAiLookup,
+    StoreImageLookup
+)
+from app.services.image_processing_service import PrepareImageForVision
+from app.services.multi_source_lookup_service import MultiSourceFoodLookupService
 from app.services.openai_client import (
-    GetOpenAiContent,
-    GetOpenAiContentForModel,
-    GetOpenAiContentWithModel
+    GetOpenAiContentForModelAsync,
+    GetOpenAiContentWithModelAsync,
+    IsConfiguredModel,
+    OpenOpenAiClient
 )
+from app.utils.image_processing import GetVisionMimeType
 from app.utils.logger import GetLogger
 
 Logger = GetLogger("food_lookup_service")
+# Vision requires gpt-4o or gpt-4-turbo
+VisionModel = "gpt-4o"
 
 
 class FoodLookupResult:
@@ -142,7 +156,7 @@ def NormalizeFoodLookupResult(FoodData: dict, Query: str) -> FoodLookupResult:
     )
 
 
-def LookupFoodByText(Query: str) -> FoodLookupResult:
+async def LookupFoodByText(Query: str) -> FoodLookupResult:
     """
     Look up food nutritional information by text query using OpenAI.
     
@@ -184,7 +198,12 @@ Serving size rules:
 
 Use standard serving sizes. Be precise with nutritional values based on USDA or Australian food databases."""
 
-    Content = GetOpenAiContent(
+    CacheKey = BuildAiLookupCacheKey("text", Query, SystemPrompt, Settings.OpenAiModel)
+    Cached = await GetCachedAiLookup(CacheKey)
+    if Cached:
+        return FoodLookupResult(**Cached[0])
+
+    Content, ModelUsed = await GetOpenAiContentWithModelAsync(
         [
             {"role": "system", "content": SystemPrompt},
             {"role": "user", "content": f"Look up nutritional information for: {Query}"}
@@ -200,10 +219,14 @@ Use standard serving sizes. Be precise with nutritional values based on USDA or
     if not isinstance(FoodData, dict):
         raise ValueError("Invalid AI response format.")
 
-    return NormalizeFoodLookupResult(FoodData, Query)
+    Result = NormalizeFoodLookupResult(FoodData, Query)
+    # The key names OPENAI_MODEL; answers from a fallback model are not cached under it
+    if IsConfiguredModel(ModelUsed):
+        await StoreAiLookup(CacheKey, [Result.ToDict()])
+    return Result
 
 
-def LookupFoodByTextOptions(Query: str) -> list[FoodLookupResult]:
+async def LookupFoodByTextOptions(Query: str) -> list[FoodLookupResult]:
     """
     Look up food nutritional information by text query using OpenAI.
     Returns multiple size options when available.
@@ -239,7 +262,12 @@ Serving size rules:
 
 When size variants exist for menu items or branded meals, include small, medium, and large entries. Otherwise return the most common measurable serving sizes."""
 
-    Content = GetOpenAiContent(
+    CacheKey = BuildAiLookupCacheKey("text-options", Query, SystemPrompt, Settings.OpenAiModel)
+    Cached = await GetCachedAiLookup(CacheKey)
+    if Cached:
+        return [FoodLookupResult(**Item) for Item in Cached]
+
+    Content, ModelUsed = await GetOpenAiContentWithModelAsync(
         [
             {"role": "system", "content": SystemPrompt},
             {"role": "user", "content": f"Look up nutritional information for: {Query}"}
@@ -247,10 +275,11 @@ When size variants exist for menu items or branded meals, include small, medium,
         Temperature=0.3,
         MaxTokens=700
     )
+    ModelsUsed = [ModelUsed]
     try:
         FoodData = ParseLookupJson(Content)
     except ValueError:
-        RetryContent, _RetryModelUsed = GetOpenAiContentWithModel(
+        RetryContent, RetryModelUsed = await GetOpenAiContentWithModelAsync(
             [
                 {
                     "role": "system",
@@ -264,6 +293,7 @@ When size variants exist for menu items or branded meals, include small, medium,
             Temperature=0.1,
             MaxTokens=400
         )
+        ModelsUsed.append(RetryModelUsed)
         FoodData = ParseLookupJson(RetryContent)
     if not isinstance(FoodData, (dict, list)):
         raise ValueError("Invalid AI response format.")
@@ -282,10 +312,12 @@ When size variants exist for menu items or branded meals, include small, medium,
     if not Results:
         raise ValueError("No results returned from AI.")
 
+    if all(IsConfiguredModel(Model) for Model in ModelsUsed):
+        await StoreAiLookup(CacheKey, [Result.ToDict() for Result in Results])
     return Results
 
 
-def LookupFoodByImage(ImageBase64: str) -> list[FoodLookupResult]:
+async def LookupFoodByImage(ImageBase64: str) -> list[FoodLookupResult]:
     """
     Analyze a food/meal image and return nutritional information for each ingredient.
     
@@ -296,11 +328,37 @@ def LookupFoodByImage(ImageBase64: str) -> list[FoodLookupResult]:
         List of FoodLookupResult for each identified ingredient
     
     Raises:
-        ValueError: If OpenAI API key not configured or invalid response
+        ValueError: If OpenAI API key not configured, invalid image data or invalid response
     """
     if not Settings.OpenAiApiKey:
         raise ValueError("OpenAI API key not configured.")
 
+    try:
+        # validate=True rejects stray characters instead of silently dropping them
+        ImageBytes = base64.b64decode("".join(ImageBase64.split()), validate=True)
+    except (binascii.Error, ValueError) as ErrorValue:
+        raise ValueError("Invalid image data.") from ErrorValue
+    return await LookupFoodByImageBytes(ImageBytes)
+
+
+async def LookupFoodByImageBytes(ImageBytes: bytes) -> list[FoodLookupResult]:
+    """Analyze raw image bytes; the image is downscaled and re-encoded before the vision call."""
+    return await _LookupFoodByImage(ImageBytes, len(ImageBytes))
+
+
+async def LookupFoodByImageFile(File: BinaryIO, Size: int) -> list[FoodLookupResult]:
+    """Analyze an uploaded image file in place, without reading it into memory first."""
+    return await _LookupFoodByImage(File, Size)
+
+
+async def _LookupFoodByImage(Image: bytes | BinaryIO, Size: int) -> list[FoodLookupResult]:
+    if not Settings.OpenAiApiKey:
+        raise ValueError("OpenAI API key not configured.")
+    if Size <= 0:
+        raise ValueError("Invalid image data.")
+    if Size > Settings.ImageUploadMaxBytes:
+        raise ValueError("Image is too large.")
+
     SystemPrompt = """You are a nutrition assistant that analyzes food images. Identify all visible foods/ingredients and estimate their quantities and nutritional values.
 
 Return ONLY a JSON array of objects with these exact fields:
@@ -328,8 +386,16 @@ Serving size rules:
 
 Provide reasonable estimates based on portion size visible in the image."""
 
+    VisionBytes, ContentHash, PerceptualHash = await PrepareImageForVision(Image)
+    CacheVariant = f"{GetPromptVersion(SystemPrompt)}:{VisionModel}"
+    Cached = await GetCachedImageLookup(ContentHash, PerceptualHash, CacheVariant)
+    if Cached:
+        return [FoodLookupResult(**Item) for Item in Cached]
+
+    VisionBase64 = base64.b64encode(VisionBytes).decode("ascii")
+    VisionMimeType = GetVisionMimeType(VisionBytes) or "image/jpeg"
     Payload = {
-        "model": "gpt-4o",  # Vision requires gpt-4o or gpt-4-turbo
+        "model": VisionModel,
         "messages": [
             {
                 "role": "user",
@@ -338,7 +404,7 @@ Provide reasonable estimates based on portion size visible in the image."""
                     {
                         "type": "image_url",
                         "image_url": {
-                            "url": f"data:image/jpeg;base64,{ImageBase64}"
+                            "url": f"data:{VisionMimeType};base64,{VisionBase64}"
                         }
                     }
                 ]
@@ -353,7 +419,7 @@ Provide reasonable estimates based on portion size visible in the image."""
         "Content-Type": "application/json"
     }
 
-    Response = httpx.post(
+    Response = await OpenOpenAiClient().post(
         "https://api.openai.com/v1/chat/completions",  # Must use standard endpoint for vision
         headers=Headers,
         json=Payload,
@@ -403,12 +469,43 @@ Provide reasonable estimates based on portion size visible in the image."""
             Confidence=FoodData.get("Confidence", "Medium")
         ))
 
+    await StoreImageLookup(ContentHash, PerceptualHash, CacheVariant, [Result.ToDict() for Result in Results])
     return Results
 
 
-def LookupFoodByBarcode(Barcode: str) -> Optional[FoodLookupResult]:
+def FoodInfoToLookupResult(Info: FoodInfo) -> FoodLookupResult:
+    """Map an OpenFoodFacts FoodInfo onto the lookup result shape."""
+    ServingQuantity, ServingUnit = 1.0, "serving"
+    Metadata = Info.Metadata or {}
+    Match = re.search(r"(\d+\.?\d*)\s*([a-zA-Z]+)", Info.ServingDescription or "")
+    # Nutrients were scaled to serving_quantity, which may differ from the first number in the text
+    if Metadata.get("serving_quantity"):
+        ServingQuantity = float(Metadata["serving_quantity"])
+        ServingUnit = Metadata.get("serving_unit") or "g"
+    elif Match:
+        ServingQuantity = float(Match.group(1))
+        ServingUnit = Match.group(2)
+    ServingQuantity, ServingUnit = NormalizeServingSize(ServingQuantity, ServingUnit)
+    return FoodLookupResult(
+        FoodName=Info.FoodName,
+        ServingQuantity=ServingQuantity,
+        ServingUnit=ServingUnit,
+        CaloriesPerServing=int(Info.CaloriesPerServing or 0),
+        ProteinPerServing=float(Info.ProteinPerServing or 0),
+        FibrePerServing=Info.FiberPerServing,
+        CarbsPerServing=Info.CarbohydratesPerServing,
+        FatPerServing=Info.FatPerServing,
+        SaturatedFatPerServing=Info.SaturatedFatPerServing,
+        SugarPerServing=Info.SugarPerServing,
+        SodiumPerServing=Info.SodiumPerServing,
+        Source="OpenFoodFacts",
+        Confidence="High"
+    )
+
+
+async def LookupFoodByBarcode(Barcode: str) -> Optional[FoodLookupResult]:
     """
-    Look up food by barcode using Open Food Facts API (free).
+    Look up food by barcode through the cached, rate-limited OpenFoodFacts path.
     
     Args:
         Barcode: Product barcode (EAN/UPC)
@@ -416,72 +513,13 @@ def LookupFoodByBarcode(Barcode: str) -> Optional[FoodLookupResult]:
     Returns:
         FoodLookupResult if found, None otherwise
     """
-    # Open Food Facts API - free, no key required
-    Url = f"https://world.openfoodfacts.org/api/v2/product/{Barcode}.json"
-    
-    try:
-        Response = httpx.get(Url, timeout=10.0)
-        Response.raise_for_status()
-        Data = Response.json()
-        
-        if Data.get("status") != 1:
-            return None  # Product not found
-        
-        Product = Data.get("product", {})
-        Nutriments = Product.get("nutriments", {})
-        
-        # Get product name
-        FoodName = Product.get("product_name") or Product.get("generic_name") or f"Product {Barcode}"
-        
-        # Get serving size
-        ServingSize = Product.get("serving_size", "100g")
-        ServingQuantity = 100.0  # Default to 100g
-        ServingUnit = "g"
-        
-        # Parse serving size if it contains numbers
-        try:
-            import re
-            Match = re.search(r'(\d+\.?\d*)\s*([a-zA-Z]+)', ServingSize)
-            if Match:
-                ServingQuantity = float(Match.group(1))
-                ServingUnit = Match.group(2)
-        except:
-            pass
-        
-        # Get nutritional values per 100g (Open Food Facts standard)
-        Calories = int(Nutriments.get("energy-kcal_100g", 0))
-        Protein = float(Nutriments.get("proteins_100g", 0))
-        Fibre = float(Nutriments.get("fiber_100g", 0)) if "fiber_100g" in Nutriments else None
-        Carbs = float(Nutriments.get("carbohydrates_100g", 0)) if "carbohydrates_100g" in Nutriments else None
-        Fat = float(Nutriments.get("fat_100g", 0)) if "fat_100g" in Nutriments else None
-        SaturatedFat = float(Nutriments.get("saturated-fat_100g", 0)) if "saturated-fat_100g" in Nutriments else None
-        Sugar = float(Nutriments.get("sugars_100g", 0)) if "sugars_100g" in Nutriments else None
-        Sodium = float(Nutriments.get("sodium_100g", 0) * 1000) if "sodium_100g" in Nutriments else None  # Convert g to mg
-        
-        # Adjust values to per serving
-        Factor = ServingQuantity / 100.0
-        
-        return FoodLookupResult(
-            FoodName=FoodName,
-            ServingQuantity=ServingQuantity,
-            ServingUnit=ServingUnit,
-            CaloriesPerServing=int(Calories * Factor),
-            ProteinPerServing=round(Protein * Factor, 1),
-            FibrePerServing=round(Fibre * Factor, 1) if Fibre is not None else None,
-            CarbsPerServing=round(Carbs * Factor, 1) if Carbs is not None else None,
-            FatPerServing=round(Fat * Factor, 1) if Fat is not None else None,
-            SaturatedFatPerServing=round(SaturatedFat * Factor, 1) if SaturatedFat is not None else None,
-            SugarPerServing=round(Sugar * Factor, 1) if Sugar is not None else None,
-            SodiumPerServing=round(Sodium * Factor, 1) if Sodium is not None else None,
-            Source="OpenFoodFacts",
-            Confidence="High"
-        )
-    
-    except (httpx.HTTPError, Exception):
+    Info = await MultiSourceFoodLookupService.GetByBarcode(Barcode)
+    if Info is None:
         return None
+    return FoodInfoToLookupResult(Info)
 
 
-def SearchAustralianFoodSuggestions(Query: str, Limit: int = 10) -> list[str]:
+async def SearchAustralianFoodSuggestions(Query: str, Limit: int = 10) -> list[str]:
     """
     Search for Australian food suggestions based on partial query (autocomplete).
     Returns list of food name suggestions prioritizing Australian brands and products.
@@ -546,7 +584,7 @@ No explanations. No extra fields."""
     try:
         AutosuggestModel = Settings.OpenAiAutosuggestModel or "gpt-5-mini"
         try:
-            Content, _ModelUsed = GetOpenAiContentForModel(
+            Content, _ModelUsed = await GetOpenAiContentForModelAsync(
                 AutosuggestModel,
                 [
                     {"role": "system", "content": SystemPrompt},
@@ -556,7 +594,7 @@ No explanations. No extra fields."""
                 MaxTokens=200
             )
         except Exception:
-            Content, _ModelUsed = GetOpenAiContentWithModel(
+            Content, _ModelUsed = await GetOpenAiContentWithModelAsync(
                 [
                     {"role": "system", "content": SystemPrompt},
                     {"role": "user", "content": UserPrompt}
@@ -567,7 +605,7 @@ No explanations. No extra fields."""
 
         Suggestions = TryParseSuggestions(Content)
         if Suggestions is None:
-            RetryContent, _RetryModelUsed = GetOpenAiContentWithModel(
+            RetryContent, _RetryModelUsed = await GetOpenAiContentWithModelAsync(
                 [
                     {
                         "role": "system",
@@ -0,0 +1,237 @@
+"""
+Local food name autocomplete.
+
+Each user gets an in-memory index over their foods, foods they have logged and
+their meal template names. A shared index holds recently looked-up food names.
+Queries match on name and word prefixes first, then on trigram overlap so small
+typos still match. The AI suggestion call is only made when the local indexes
+return too few names.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from time import monotonic
+from typing import Iterable
+
+from app.config import Settings
+from app.services.food_lookup_service import SearchAustralianFoodSuggestions
+from app.utils.database import FetchAll, RunDatabaseCall
+
+_NonWordPattern = re.compile(r"[^0-9a-z]+")
+# Share of the query's trigrams a name must contain to count as a fuzzy match
+MinTrigramSimilarity = 0.6
+# Names the user owns rank above equally good matches from recent lookups
+UserNameBonus = 0.25
+
+
+def NormalizeSuggestionText(Value: str) -> str:
+    return " ".join(_NonWordPattern.sub(" ", Value.lower()).split())
+
+
+def BuildTrigrams(Value: str) -> set[str]:
+    Padded = f"  {Value} "
+    return {Padded[Index:Index + 3] for Index in range(len(Padded) - 2)}
+
+
+class SuggestionIndex:
+    """Prefix and trigram index over a list of names that can grow and shrink in place."""
+
+    def __init__(self, Names: Iterable[str] = ()):
+        self.Names: list[str] = []
+        self._Normalized: list[str] = []
+        self._Words: list[list[str]] = []
+        self._Trigrams: dict[str, list[int]] = {}
+        self._Positions: dict[str, int] = {}
+        self._Removed: set[int] = set()
+        for Name in Names:
+            self.Add(Name)
+
+    def __len__(self) -> int:
+        return len(self._Positions)
+
+    def Add(self, Name: str) -> None:
+        CleanName = " ".join(str(Name or "").split())
+        Normalized = NormalizeSuggestionText(CleanName)
+        if not Normalized or Normalized in self._Positions:
+            return
+        Position = len(self.Names)
+        self._Positions[Normalized] = Position
+        self.Names.append(CleanName)
+        self._Normalized.append(Normalized)
+        self._Words.append(Normalized.split())
+        for Gram in BuildTrigrams(Normalized):
+            self._Trigrams.setdefault(Gram, []).append(Position)
+
+    def Remove(self, Name: str) -> None:
+        Position = self._Positions.pop(NormalizeSuggestionText(Name), None)
+        if Position is None:
+            return
+        self._Removed.add(Position)
+        # Compact once removed slots outnumber live ones so the postings stay short.
+        if len(self._Removed) > len(self._Positions):
+            Live = [self.Names[Index] for Index in sorted(self._Positions.values())]
+            self.__init__(Live)
+
+    def _Score(self, Position: int, Query: str, QueryWords: list[str], Similarity: float) -> float:
+        Name = self._Normalized[Position]
+        if Name.startswith(Query):
+            return 3.0
+        Words = self._Words[Position]
+        if all(any(Word.startswith(QueryWord) for Word in Words) for QueryWord in QueryWords):
+            return 2.0
+        if Query in Name:
+            return 1.5
+        if Similarity >= MinTrigramSimilarity:
+            return Similarity
+        return 0.0
+
+    def Search(self, Query: str, Limit: int) -> list[tuple[float, str]]:
+        """Return up to Limit (Score, Name) pairs, best first."""
+        Normalized = NormalizeSuggestionText(Query)
+        if not Normalized or Limit <= 0:
+            return []
+
+        # Name and word prefixes share the padded leading trigram and substrings of three or
+        # more characters share an inner one; shorter mid-word substrings share none.
+        QueryGrams = BuildTrigrams(Normalized)
+        SharedCounts: dict[int, int] = {}
+        for Gram in QueryGrams:
+            for Position in self._Trigrams.get(Gram, ()):
+                SharedCounts[Position] = SharedCounts.get(Position, 0) + 1
+        if len(Normalized) < 3:
+            for Position in self._Positions.values():
+                if Position not in SharedCounts and Normalized in self._Normalized[Position]:
+                    SharedCounts[Position] = 0
+
+        QueryWords = Normalized.split()
+        Scored: list[tuple[float, int]] = []
+        for Position, SharedCount in SharedCounts.items():
+            if Position in self._Removed:
+                continue
+            Score = self._Score(Position, Normalized, QueryWords, SharedCount / len(QueryGrams))
+            if Score > 0:
+                Scored.append((Score, Position))
+
+        Scored.sort(key=lambda Item: (-Item[0], len(self._Normalized[Item[1]]), self._Normalized[Item[1]]))
+        return [(Score, self.Names[Position]) for Score, Position in Scored[:Limit]]
+
+
+_Lock = threading.Lock()
+_Generation = 0
+_UserIndexes: dict[str, tuple[float, SuggestionIndex]] = {}
+# Recent lookups have their own lock so lookups never wait on user index loads.
+_RecentLock = threading.Lock()
+_RecentLookups: "OrderedDict[str, str]" = OrderedDict()
+_RecentIndex = SuggestionIndex()
+
+def LoadUserSuggestionNames(UserId: str) -> list[str]:
+    TemplateRows = FetchAll(
+        "SELECT TemplateName AS Name FROM MealTemplates WHERE UserId = ? ORDER BY TemplateName;",
+        [UserId]
+    )
+    FoodRows = FetchAll(
+        """
+        SELECT FoodName AS Name FROM Foods WHERE UserId = ?
+        UNION
+        SELECT Foods.FoodName AS Name
+        FROM MealEntries
+        JOIN DailyLogs ON DailyLogs.DailyLogId = MealEntries.DailyLogId
+        JOIN Foods ON Foods.FoodId = MealEntries.FoodId
+        WHERE DailyLogs.UserId = ?
+        ORDER BY Name;
+        """,
+        [UserId, UserId]
+    )
+    return [Row["Name"] for Row in TemplateRows + FoodRows]
+
+
+def GetUserSuggestionIndex(UserId: str) -> SuggestionIndex:
+    Now = monotonic()
+    with _Lock:
+        Cached = _UserIndexes.get(UserId)
+        if Cached is not None and Cached[0] > Now:
+            return Cached[1]
+        Generation = _Generation
+
+    Index = SuggestionIndex(LoadUserSuggestionNames(UserId))
+    with _Lock:
+        # Skip caching if a write invalidated the index while it was loading.
+        if Generation == _Generation:
+            _UserIndexes[UserId] = (Now + max(0, Settings.FoodSuggestionsIndexTtlSeconds), Index)
+    return Index
+
+
+def InvalidateFoodSuggestions(UserId: str | None = None) -> None:
+    """Drop one user's index, or every user's when UserId is None."""
+    global _Generation
+    with _Lock:
+        _Generation += 1
+        if UserId is None:
+            _UserIndexes.clear()
+        else:
+            _UserIndexes.pop(UserId, None)
+
+
+def RecordLookupNames(Names: Iterable[str]) -> None:
+    """Remember food names returned by lookups so later keystrokes can match them."""
+    MaxNames = max(0, Settings.FoodSuggestionsRecentLookupMax)
+    with _RecentLock:
+        for Name in Names:
+            CleanName = " ".join(str(Name or "").split())
+            Key = NormalizeSuggestionText(CleanName)
+            if not Key:
+                continue
+            if Key not in _RecentLookups:
+                _RecentIndex.Add(CleanName)
+            _RecentLookups[Key] = CleanName
+            _RecentLookups.move_to_end(Key)
+        while len(_RecentLookups) > MaxNames:
+            _Key, OldName = _RecentLookups.popitem(last=False)
+            _RecentIndex.Remove(OldName)
+
+
+def SearchRecentLookups(Query: str, Limit: int) -> list[tuple[float, str]]:
+    with _RecentLock:
+        return _RecentIndex.Search(Query, Limit)
+
+
+def ClearFoodSuggestions() -> None:
+    global _RecentIndex
+    InvalidateFoodSuggestions()
+    with _RecentLock:
+        _RecentLookups.clear()
+        _RecentIndex = SuggestionIndex()
+
+
+def MergeSuggestionNames(*NameLists: Iterable[str], Limit: int) -> list[str]:
+    Merged: list[str] = []
+    Seen: set[str] = set()
+    for Names in NameLists:
+        for Name in Names:
+            Key = NormalizeSuggestionText(Name)
+            if not Key or Key in Seen:
+                continue
+            Seen.add(Key)
+            Merged.append(Name)
+            if len(Merged) >= Limit:
+                return Merged
+    return Merged
+
+
+def GetLocalFoodSuggestions(UserId: str, Query: str, Limit: int = 10) -> list[str]:
+    Scored = [
+        (Score + UserNameBonus, Name)
+        for Score, Name in GetUserSuggestionIndex(UserId).Search(Query, Limit)
+    ]
+    Scored.extend(SearchRecentLookups(Query, Limit))
+    Scored.sort(key=lambda Item: -Item[0])
+    return MergeSuggestionNames([Name for _Score, Name in Scored], Limit=Limit)
+
+
+async def SuggestFoodNames(UserId: str, Query: str, Limit: int = 10) -> list[str]:
+    Suggestions = await RunDatabaseCall(GetLocalFoodSuggestions, UserId, Query, Limit)
+    if len(Suggestions) >= min(Limit, max(1, Settings.FoodSuggestionsLocalMinResults)):
+        return Suggestions
+    AiSuggestions = await SearchAustralianFoodSuggestions(Query, Limit)
+    return MergeSuggestionNames(Suggestions, AiSuggestions, Limit=Limit)
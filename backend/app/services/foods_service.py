@@ -1,49 +1,136 @@
 import uuid
 
 from app.models.schemas import CreateFoodInput, Food, UpdateFoodInput
-from app.utils.database import ExecuteQuery, FetchAll, FetchOne
+from app.services.daily_totals_service import RefreshDailyTotalsForFood
+from app.services.meal_template_totals_service import RefreshMealTemplateTotalsForFood
+from app.utils.database import BuildFtsPrefixQuery, ExecuteQuery, FetchAll, FetchOne, Transaction
+
+
+FoodListColumns = """
+    Foods.UserId,
+    Foods.FoodId, Foods.FoodName, Foods.ServingDescription, Foods.ServingQuantity, Foods.ServingUnit,
+    Foods.CaloriesPerServing, Foods.ProteinPerServing,
+    Foods.FibrePerServing, Foods.CarbsPerServing, Foods.FatPerServing,
+    Foods.SaturatedFatPerServing, Foods.SugarPerServing, Foods.SodiumPerServing,
+    Foods.DataSource, Foods.CountryCode, Foods.IsFavourite, Foods.CreatedAt
+"""
+
+
+def _BuildFoodFromRow(Row: dict) -> Food:
+    return Food(
+        FoodId=Row["FoodId"],
+        OwnerUserId=Row["UserId"],
+        FoodName=Row["FoodName"],
+        ServingDescription=Row["ServingDescription"],
+        ServingQuantity=float(Row["ServingQuantity"]) if Row["ServingQuantity"] else 1.0,
+        ServingUnit=Row["ServingUnit"] or "serving",
+        CaloriesPerServing=int(Row["CaloriesPerServing"]),
+        ProteinPerServing=float(Row["ProteinPerServing"]),
+        FibrePerServing=float(Row["FibrePerServing"]) if Row["FibrePerServing"] else None,
+        CarbsPerServing=float(Row["CarbsPerServing"]) if Row["CarbsPerServing"] else None,
+        FatPerServing=float(Row["FatPerServing"]) if Row["FatPerServing"] else None,
+        SaturatedFatPerServing=float(Row["SaturatedFatPerServing"]) if Row["SaturatedFatPerServing"] else None,
+        SugarPerServing=float(Row["SugarPerServing"]) if Row["SugarPerServing"] else None,
+        SodiumPerServing=float(Row["SodiumPerServing"]) if Row["SodiumPerServing"] else None,
+        DataSource=Row["DataSource"] or "manual",
+        CountryCode=Row["CountryCode"] or "AU",
+        IsFavourite=bool(Row["IsFavourite"]),
+        CreatedAt=Row["CreatedAt"]
+    )
 
 
 def GetFoods(UserId: str) -> list[Food]:
     Rows = FetchAll(
-        """
-        SELECT
-            UserId,
-            FoodId, FoodName, ServingDescription, ServingQuantity, ServingUnit,
-            CaloriesPerServing, ProteinPerServing,
-            FibrePerServing, CarbsPerServing, FatPerServing,
-            SaturatedFatPerServing, SugarPerServing, SodiumPerServing,
-            DataSource, CountryCode, IsFavourite, CreatedAt
+        f"""
+        SELECT {FoodListColumns}
         FROM Foods
         ORDER BY FoodName ASC;
         """
     )
+    return [_BuildFoodFromRow(Row) for Row in Rows]
 
-    Foods: list[Food] = []
-    for Row in Rows:
-        Foods.append(
-            Food(
-                FoodId=Row["FoodId"],
-                OwnerUserId=Row["UserId"],
-                FoodName=Row["FoodName"],
-                ServingDescription=Row["ServingDescription"],
-                ServingQuantity=float(Row["ServingQuantity"]) if Row["ServingQuantity"] else 1.0,
-                ServingUnit=Row["ServingUnit"] or "serving",
-                CaloriesPerServing=int(Row["CaloriesPerServing"]),
-                ProteinPerServing=float(Row["ProteinPerServing"]),
-                FibrePerServing=float(Row["FibrePerServing"]) if Row["FibrePerServing"] else None,
-                CarbsPerServing=float(Row["CarbsPerServing"]) if Row["CarbsPerServing"] else None,
-                FatPerServing=float(Row["FatPerServing"]) if Row["FatPerServing"] else None,
-                SaturatedFatPerServing=float(Row["SaturatedFatPerServing"]) if Row["SaturatedFatPerServing"] else None,
-                SugarPerServing=float(Row["SugarPerServing"]) if Row["SugarPerServing"] else None,
-                SodiumPerServing=float(Row["SodiumPerServing"]) if Row["SodiumPerServing"] else None,
-                DataSource=Row["DataSource"] or "manual",
-                CountryCode=Row["CountryCode"] or "AU",
-                IsFavourite=bool(Row["IsFavourite"]),
-                CreatedAt=Row["CreatedAt"]
-            )
-        )
-    return Foods
+
+DefaultFoodPageSize = 50
+MaxFoodPageSize = 500
+
+
+def EncodeFoodCursor(FoodItem: Food) -> str:
+    return f"{FoodItem.FoodName},{FoodItem.FoodId}"
+
+
+def DecodeFoodCursor(After: str) -> tuple[str, str]:
+    # Food names may contain commas; the id never does
+    FoodName, Separator, FoodId = After.rpartition(",")
+    if not Separator or not FoodId:
+        raise ValueError("Invalid cursor.")
+    return FoodName, FoodId
+
+
+def GetFoodsPage(
+    UserId: str,
+    Limit: int = DefaultFoodPageSize,
+    After: str | None = None,
+    MineOnly: bool = False,
+    FavouritesOnly: bool = False,
+    DataSource: str | None = None
+) -> tuple[list[Food], int | None]:
+    """Return one (FoodName, FoodId)-ordered page; the filtered total is only counted for the first page."""
+    if not 1 <= Limit <= MaxFoodPageSize:
+        raise ValueError(f"Limit must be between 1 and {MaxFoodPageSize}.")
+    Filters: list[str] = []
+    Parameters: list = []
+    if MineOnly:
+        Filters.append("Foods.UserId = ?")
+        Parameters.append(UserId)
+    if FavouritesOnly:
+        Filters.append("Foods.IsFavourite = 1")
+    if DataSource:
+        Filters.append("Foods.DataSource = ?")
+        Parameters.append(DataSource)
+
+    TotalCount: int | None = None
+    if not After:
+        FilterSql = " AND ".join(Filters) or "1 = 1"
+        CountRow = FetchOne(f"SELECT COUNT(*) AS TotalCount FROM Foods WHERE {FilterSql};", Parameters)
+        TotalCount = int(CountRow["TotalCount"]) if CountRow else 0
+
+    PageFilters = list(Filters)
+    PageParameters = list(Parameters)
+    if After:
+        AfterName, AfterId = DecodeFoodCursor(After)
+        PageFilters.append("(Foods.FoodName, Foods.FoodId) > (?, ?)")
+        PageParameters.extend([AfterName, AfterId])
+    PageParameters.append(Limit)
+
+    Rows = FetchAll(
+        f"""
+        SELECT {FoodListColumns}
+        FROM Foods
+        WHERE {" AND ".join(PageFilters) or "1 = 1"}
+        ORDER BY Foods.FoodName ASC, Foods.FoodId ASC
+        LIMIT ?;
+        """,
+        PageParameters
+    )
+    return [_BuildFoodFromRow(Row) for Row in Rows], TotalCount
+
+
+def SearchFoods(Query: str, Limit: int = 20) -> list[Food]:
+    MatchQuery = BuildFtsPrefixQuery(Query)
+    if not MatchQuery:
+        return []
+    Rows = FetchAll(
+        f"""
+        SELECT {FoodListColumns}
+        FROM FoodsSearch
+        INNER JOIN Foods ON Foods.FoodId = FoodsSearch.FoodId
+        WHERE FoodsSearch MATCH ?
+        ORDER BY FoodsSearch.rank, Foods.FoodName
+        LIMIT ?;
+        """,
+        [MatchQuery, Limit]
+    )
+    return [_BuildFoodFromRow(Row) for Row in Rows]
 
 
 def UpsertFood(UserId: str, Input: CreateFoodInput) -> Food:
@@ -52,57 +139,61 @@ def UpsertFood(UserId: str, Input: CreateFoodInput) -> Food:
     # Build serving description from quantity + unit for backwards compatibility
     ServingDescription = f"{Input.ServingQuantity} {Input.ServingUnit}"
 
-    ExecuteQuery(
-        """
-        INSERT INTO Foods (
-            FoodId, UserId, FoodName, ServingDescription,
-            ServingQuantity, ServingUnit,
-            CaloriesPerServing, ProteinPerServing,
-            FibrePerServing, CarbsPerServing, FatPerServing,
-            SaturatedFatPerServing, SugarPerServing, SodiumPerServing,
-            DataSource, CountryCode, IsFavourite
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT (UserId, FoodName)
-        DO UPDATE SET
-            ServingDescription = excluded.ServingDescription,
-            ServingQuantity = excluded.ServingQuantity,
-            ServingUnit = excluded.ServingUnit,
-            CaloriesPerServing = excluded.CaloriesPerServing,
-            ProteinPerServing = excluded.ProteinPerServing,
-            FibrePerServing = excluded.FibrePerServing,
-            CarbsPerServing = excluded.CarbsPerServing,
-            FatPerServing = excluded.FatPerServing,
-            SaturatedFatPerServing = excluded.SaturatedFatPerServing,
-            SugarPerServing = excluded.SugarPerServing,
-            SodiumPerServing = excluded.SodiumPerServing,
-            DataSource = excluded.DataSource,
-            CountryCode = excluded.CountryCode,
-            IsFavourite = excluded.IsFavourite;
-        """,
-        [
-            FoodId, UserId, Input.FoodName, ServingDescription,
-            Input.ServingQuantity, Input.ServingUnit,
-            Input.CaloriesPerServing, Input.ProteinPerServing,
-            Input.FibrePerServing, Input.CarbsPerServing, Input.FatPerServing,
-            Input.SaturatedFatPerServing, Input.SugarPerServing, Input.SodiumPerServing,
-            Input.DataSource, Input.CountryCode,
-            1 if Input.IsFavourite else 0
-        ]
-    )
+    with Transaction():
+        ExecuteQuery(
+            """
+            INSERT INTO Foods (
+                FoodId, UserId, FoodName, ServingDescription,
+                ServingQuantity, ServingUnit,
+                CaloriesPerServing, ProteinPerServing,
+                FibrePerServing, CarbsPerServing, FatPerServing,
+                SaturatedFatPerServing, SugarPerServing, SodiumPerServing,
+                DataSource, CountryCode, IsFavourite
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (UserId, FoodName)
+            DO UPDATE SET
+                ServingDescription = excluded.ServingDescription,
+                ServingQuantity = excluded.ServingQuantity,
+                ServingUnit = excluded.ServingUnit,
+                CaloriesPerServing = excluded.CaloriesPerServing,
+                ProteinPerServing = excluded.ProteinPerServing,
+                FibrePerServing = excluded.FibrePerServing,
+                CarbsPerServing = excluded.CarbsPerServing,
+                FatPerServing = excluded.FatPerServing,
+                SaturatedFatPerServing = excluded.SaturatedFatPerServing,
+                SugarPerServing = excluded.SugarPerServing,
+                SodiumPerServing = excluded.SodiumPerServing,
+                DataSource = excluded.DataSource,
+                CountryCode = excluded.CountryCode,
+                IsFavourite = excluded.IsFavourite;
+            """,
+            [
+                FoodId, UserId, Input.FoodName, ServingDescription,
+                Input.ServingQuantity, Input.ServingUnit,
+                Input.CaloriesPerServing, Input.ProteinPerServing,
+                Input.FibrePerServing, Input.CarbsPerServing, Input.FatPerServing,
+                Input.SaturatedFatPerServing, Input.SugarPerServing, Input.SodiumPerServing,
+                Input.DataSource, Input.CountryCode,
+                1 if Input.IsFavourite else 0
+            ]
+        )
 
-    Row = FetchOne(
-        """
-        SELECT
-            FoodId, UserId, FoodName, ServingDescription, ServingQuantity, ServingUnit,
-            CaloriesPerServing, ProteinPerServing,
-            FibrePerServing, CarbsPerServing, FatPerServing,
-            SaturatedFatPerServing, SugarPerServing, SodiumPerServing,
-            DataSource, CountryCode, IsFavourite
-        FROM Foods
-        WHERE FoodName = ? AND UserId = ?;
-        """,
-        [Input.FoodName, UserId]
-    )
+        Row = FetchOne(
+            """
+            SELECT
+                FoodId, UserId, FoodName, ServingDescription, ServingQuantity, ServingUnit,
+                CaloriesPerServing, ProteinPerServing,
+                FibrePerServing, CarbsPerServing, FatPerServing,
+                SaturatedFatPerServing, SugarPerServing, SodiumPerServing,
+                DataSource, CountryCode, IsFavourite
+            FROM Foods
+            WHERE FoodName = ? AND UserId = ?;
+            """,
+            [Input.FoodName, UserId]
+        )
+        if Row is not None:
+            RefreshMealTemplateTotalsForFood(Row["FoodId"])
+            RefreshDailyTotalsForFood(Row["FoodId"])
 
     if Row is None:
         raise ValueError("Failed to load created food.")
@@ -204,10 +295,13 @@ def UpdateFood(UserId: str, FoodId: str, Input: UpdateFoodInput, IsAdmin: bool =
         return GetFoodById(UserId, FoodId)
     
     Values.append(FoodId)
-    ExecuteQuery(
-        f"UPDATE Foods SET {', '.join(UpdateFields)} WHERE FoodId = ?;",
-        Values
-    )
+    with Transaction():
+        ExecuteQuery(
+            f"UPDATE Foods SET {', '.join(UpdateFields)} WHERE FoodId = ?;",
+            Values
+        )
+        RefreshMealTemplateTotalsForFood(FoodId)
+        RefreshDailyTotalsForFood(FoodId)
     
     return GetFoodById(UserId, FoodId)
 
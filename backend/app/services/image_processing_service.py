@@ -0,0 +1,82 @@
+"""
+Image preprocessing for the vision lookup.
+
+Uploaded photos are decoded, rotated upright, scaled to IMAGE_LOOKUP_MAX_EDGE,
+stripped of metadata and re-encoded as JPEG before they are sent to OpenAI.
+The work runs in a process pool of IMAGE_PROCESS_WORKERS so decoding large
+camera images never blocks the event loop or holds the GIL; 0 workers falls
+back to the default thread pool.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Optional
+
+from app.config import Settings
+from app.utils.image_processing import PrepareImageBytes, PrepareImageStream
+
+_Pool: Optional[ProcessPoolExecutor] = None
+_PoolLock = threading.Lock()
+
+
+def GetImageProcessPool() -> Optional[ProcessPoolExecutor]:
+    global _Pool
+    if Settings.ImageProcessWorkers <= 0:
+        return None
+    if _Pool is None:
+        with _PoolLock:
+            if _Pool is None:
+                # Spawned workers do not inherit the DB pool or other threads' locks.
+                _Pool = ProcessPoolExecutor(
+                    max_workers=Settings.ImageProcessWorkers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+    return _Pool
+
+
+def CloseImageProcessPool() -> None:
+    global _Pool
+    with _PoolLock:
+        Pool, _Pool = _Pool, None
+    if Pool is not None:
+        Pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _ReadAll(File: BinaryIO) -> bytes:
+    File.seek(0)
+    return File.read()
+
+
+async def PrepareImageForVision(Image: bytes | BinaryIO) -> tuple[bytes, str, Optional[str]]:
+    """
+    Return (VisionBytes, ContentHash, PerceptualHash); VisionBytes falls back to the original upload.
+
+    Image may be an open upload file. On the thread path it is hashed and decoded
+    straight from the file; a worker process needs its own copy of the bytes.
+    """
+    Loop = asyncio.get_running_loop()
+    Pool = GetImageProcessPool()
+    if not isinstance(Image, bytes) and Pool is not None:
+        Image = await Loop.run_in_executor(None, _ReadAll, Image)
+    if isinstance(Image, bytes):
+        ContentHash, Prepared, PerceptualHash = await Loop.run_in_executor(
+            Pool,
+            PrepareImageBytes,
+            Image,
+            Settings.ImageLookupMaxEdge,
+            Settings.ImageLookupJpegQuality
+        )
+        return Prepared if Prepared is not None else Image, ContentHash, PerceptualHash
+
+    ContentHash, Prepared, PerceptualHash = await Loop.run_in_executor(
+        None,
+        PrepareImageStream,
+        Image,
+        Settings.ImageLookupMaxEdge,
+        Settings.ImageLookupJpegQuality
+    )
+    if Prepared is None:
+        Prepared = await Loop.run_in_executor(None, _ReadAll, Image)
+    return Prepared, ContentHash, PerceptualHash
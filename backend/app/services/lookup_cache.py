@@ -0,0 +1,401 @@
+"""
+Cache backends for food lookups.
+
+- MemoryLookupCache: in-process LRU bounded by entry count and payload bytes
+- SqliteLookupCache: LookupCache table, survives restarts and is shared by workers
+- SqliteAiLookupCache: AiLookupCache table for AI text lookups, trimmed least recently used first
+- SqliteImageLookupCache: ImageLookupCache table, also matched by perceptual hash
+
+Values must be JSON-serialisable. Entries are fresh until FreshUntil and may
+still be served as stale until ExpiresAt, after which they are dropped.
+"""
+
+import json
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from time import time
+from typing import Any, Dict, Optional
+
+from app.config import Settings
+from app.utils.database import ExecuteMany, ExecuteQuery, FetchAll, FetchOne, Transaction
+
+
+class LookupCacheBackend(ABC):
+    """Interface shared by lookup cache backends."""
+
+    Name = "base"
+    # Blocking backends are called through the database executor
+    IsBlocking = False
+
+    def __init__(self, MaxEntries: int, MaxBytes: int):
+        self.MaxEntries = max(1, MaxEntries)
+        self.MaxBytes = max(1, MaxBytes)
+        self.Hits = 0
+        self.StaleHits = 0
+        self.Misses = 0
+        self.Evictions = 0
+
+    @abstractmethod
+    def GetEntry(self, Key: str) -> Optional[tuple[Any, bool]]:
+        """Return (Value, IsStale) for an unexpired entry, else None."""
+
+    def Get(self, Key: str) -> Optional[Any]:
+        Entry = self.GetEntry(Key)
+        if Entry is None or Entry[1]:
+            return None
+        return Entry[0]
+
+    @abstractmethod
+    def Set(self, Key: str, Value: Any, TtlSeconds: float, StaleSeconds: float = 0) -> None:
+        ...
+
+    @abstractmethod
+    def Delete(self, Key: str) -> None:
+        ...
+
+    @abstractmethod
+    def Clear(self) -> int:
+        """Drop every entry; returns rows removed."""
+
+    @abstractmethod
+    def PurgeExpired(self) -> int:
+        """Drop expired entries and trim to the size bounds; returns rows removed."""
+
+    @abstractmethod
+    def GetStats(self) -> Dict[str, Any]:
+        ...
+
+    def _CountLookup(self, IsStale: bool | None) -> None:
+        if IsStale is None:
+            self.Misses += 1
+        elif IsStale:
+            self.StaleHits += 1
+        else:
+            self.Hits += 1
+
+    def _BaseStats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.Name,
+            "max_entries": self.MaxEntries,
+            "max_bytes": self.MaxBytes,
+            "hits": self.Hits,
+            "stale_hits": self.StaleHits,
+            "misses": self.Misses,
+            "evictions": self.Evictions
+        }
+
+
+class MemoryLookupCache(LookupCacheBackend):
+    """LRU cache held in this process."""
+
+    Name = "memory"
+
+    def __init__(self, MaxEntries: int, MaxBytes: int):
+        super().__init__(MaxEntries, MaxBytes)
+        # Key -> (Value, FreshUntil, ExpiresAt, Size)
+        self._Entries: OrderedDict[str, tuple[Any, float, float, int]] = OrderedDict()
+        self._Bytes = 0
+        self._Lock = threading.Lock()
+
+    def _Remove(self, Key: str) -> None:
+        Size = self._Entries.pop(Key)[3]
+        self._Bytes -= Size
+
+    def GetEntry(self, Key: str) -> Optional[tuple[Any, bool]]:
+        Now = time()
+        with self._Lock:
+            Entry = self._Entries.get(Key)
+            if Entry is not None and Entry[2] <= Now:
+                self._Remove(Key)
+                Entry = None
+            if Entry is None:
+                self._CountLookup(None)
+                return None
+            self._Entries.move_to_end(Key)
+            IsStale = Entry[1] <= Now
+            self._CountLookup(IsStale)
+            return Entry[0], IsStale
+
+    def Set(self, Key: str, Value: Any, TtlSeconds: float, StaleSeconds: float = 0) -> None:
+        Size = len(json.dumps(Value, separators=(",", ":")))
+        if Size > self.MaxBytes:
+            return
+        with self._Lock:
+            if Key in self._Entries:
+                self._Remove(Key)
+            FreshUntil = time() + TtlSeconds
+            self._Entries[Key] = (Value, FreshUntil, FreshUntil + max(0, StaleSeconds), Size)
+            self._Bytes += Size
+            while len(self._Entries) > self.MaxEntries or self._Bytes > self.MaxBytes:
+                OldestKey = next(iter(self._Entries))
+                self._Remove(OldestKey)
+                self.Evictions += 1
+
+    def Delete(self, Key: str) -> None:
+        with self._Lock:
+            if Key in self._Entries:
+                self._Remove(Key)
+
+    def Clear(self) -> int:
+        with self._Lock:
+            Removed = len(self._Entries)
+            self._Entries.clear()
+            self._Bytes = 0
+        return Removed
+
+    def PurgeExpired(self) -> int:
+        Now = time()
+        with self._Lock:
+            ExpiredKeys = [Key for Key, Entry in self._Entries.items() if Entry[2] <= Now]
+            for Key in ExpiredKeys:
+                self._Remove(Key)
+        return len(ExpiredKeys)
+
+    def GetStats(self) -> Dict[str, Any]:
+        Now = time()
+        with self._Lock:
+            Total = len(self._Entries)
+            Valid = sum(1 for Entry in self._Entries.values() if Entry[1] > Now)
+            Stale = sum(1 for Entry in self._Entries.values() if Entry[1] <= Now < Entry[2])
+            Stats = self._BaseStats()
+            Stats.update({
+                "total_entries": Total,
+                "valid_entries": Valid,
+                "stale_entries": Stale,
+                "expired_entries": Total - Valid - Stale,
+                "total_bytes": self._Bytes
+            })
+        return Stats
+
+
+class SqliteLookupCache(LookupCacheBackend):
+    """Cache stored in the LookupCache table; oldest rows are trimmed first."""
+
+    Name = "sqlite"
+    IsBlocking = True
+    TableName = "LookupCache"
+    # Expression that orders rows for trimming, newest kept first
+    TrimOrder = "CreatedAt"
+
+    def GetEntry(self, Key: str) -> Optional[tuple[Any, bool]]:
+        Row = FetchOne(
+            f"SELECT Payload, COALESCE(FreshUntil, ExpiresAt) AS FreshUntil, ExpiresAt FROM {self.TableName} WHERE CacheKey = ?;",
+            [Key]
+        )
+        Now = time()
+        if Row is None or Row["ExpiresAt"] <= Now:
+            self._CountLookup(None)
+            return None
+        IsStale = Row["FreshUntil"] <= Now
+        self._CountLookup(IsStale)
+        return json.loads(Row["Payload"]), IsStale
+
+    def Set(self, Key: str, Value: Any, TtlSeconds: float, StaleSeconds: float = 0) -> None:
+        Payload = json.dumps(Value, separators=(",", ":"))
+        if len(Payload) > self.MaxBytes:
+            return
+        Now = time()
+        FreshUntil = Now + TtlSeconds
+        ExecuteQuery(
+            f"""
+            INSERT INTO {self.TableName} (CacheKey, Payload, ByteSize, FreshUntil, ExpiresAt, CreatedAt)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(CacheKey) DO UPDATE SET
+              Payload = excluded.Payload,
+              ByteSize = excluded.ByteSize,
+              FreshUntil = excluded.FreshUntil,
+              ExpiresAt = excluded.ExpiresAt,
+              CreatedAt = excluded.CreatedAt;
+            """,
+            [Key, Payload, len(Payload), FreshUntil, FreshUntil + max(0, StaleSeconds), Now]
+        )
+
+    def Delete(self, Key: str) -> None:
+        ExecuteQuery(f"DELETE FROM {self.TableName} WHERE CacheKey = ?;", [Key])
+
+    def Clear(self) -> int:
+        with Transaction() as Connection:
+            return Connection.execute(f"DELETE FROM {self.TableName};").rowcount
+
+    def PurgeExpired(self) -> int:
+        with Transaction() as Connection:
+            Expired = Connection.execute(
+                f"DELETE FROM {self.TableName} WHERE ExpiresAt <= ?;",
+                [time()]
+            ).rowcount
+            Trimmed = Connection.execute(
+                f"""
+                DELETE FROM {self.TableName}
+                WHERE CacheKey IN (
+                  SELECT CacheKey FROM (
+                    SELECT
+                      CacheKey,
+                      ROW_NUMBER() OVER (ORDER BY {self.TrimOrder} DESC) AS RowNumber,
+                      SUM(ByteSize) OVER (ORDER BY {self.TrimOrder} DESC ROWS UNBOUNDED PRECEDING) AS RunningBytes
+                    FROM {self.TableName}
+                  )
+                  WHERE RowNumber > ? OR RunningBytes > ?
+                );
+                """,
+                [self.MaxEntries, self.MaxBytes]
+            ).rowcount
+        self.Evictions += Trimmed
+        return Expired + Trimmed
+
+    def GetStats(self) -> Dict[str, Any]:
+        Now = time()
+        Row = FetchOne(
+            f"""
+            SELECT
+              COUNT(*) AS TotalEntries,
+              COALESCE(SUM(CASE WHEN COALESCE(FreshUntil, ExpiresAt) > ? THEN 1 ELSE 0 END), 0) AS ValidEntries,
+              COALESCE(SUM(CASE WHEN COALESCE(FreshUntil, ExpiresAt) <= ? AND ExpiresAt > ? THEN 1 ELSE 0 END), 0) AS StaleEntries,
+              COALESCE(SUM(ByteSize), 0) AS TotalBytes
+            FROM {self.TableName};
+            """,
+            [Now, Now, Now]
+        ) or {}
+        Total = int(Row.get("TotalEntries") or 0)
+        Valid = int(Row.get("ValidEntries") or 0)
+        Stale = int(Row.get("StaleEntries") or 0)
+        Stats = self._BaseStats()
+        Stats.update({
+            "total_entries": Total,
+            "valid_entries": Valid,
+            "stale_entries": Stale,
+            "expired_entries": Total - Valid - Stale,
+            "total_bytes": int(Row.get("TotalBytes") or 0)
+        })
+        return Stats
+
+
+class SqliteAiLookupCache(SqliteLookupCache):
+    """AI lookup responses in the AiLookupCache table; least recently used rows are trimmed first."""
+
+    Name = "ai"
+    TableName = "AiLookupCache"
+    TrimOrder = "MAX(CreatedAt, COALESCE(LastUsedAt, CreatedAt))"
+
+    # Pending hit bookkeeping is written in one batch once this many keys are waiting
+    HitFlushSize = 64
+
+    def __init__(self, MaxEntries: int, MaxBytes: int):
+        super().__init__(MaxEntries, MaxBytes)
+        # Key -> (LastUsedAt, HitCount) not yet written, so cache reads stay read-only
+        self._PendingHits: Dict[str, tuple[float, int]] = {}
+        self._HitLock = threading.Lock()
+
+    def GetEntry(self, Key: str) -> Optional[tuple[Any, bool]]:
+        Entry = super().GetEntry(Key)
+        if Entry is not None:
+            with self._HitLock:
+                _LastUsedAt, HitCount = self._PendingHits.get(Key, (0.0, 0))
+                self._PendingHits[Key] = (time(), HitCount + 1)
+                ShouldFlush = len(self._PendingHits) >= self.HitFlushSize
+            if ShouldFlush:
+                self.FlushHits()
+        return Entry
+
+    def FlushHits(self) -> int:
+        """Write pending LastUsedAt and HitCount updates; returns keys written."""
+        with self._HitLock:
+            Pending, self._PendingHits = self._PendingHits, {}
+        if Pending:
+            ExecuteMany(
+                f"""
+                UPDATE {self.TableName}
+                SET LastUsedAt = MAX(COALESCE(LastUsedAt, 0), ?), HitCount = HitCount + ?
+                WHERE CacheKey = ?;
+                """,
+                [[LastUsedAt, HitCount, Key] for Key, (LastUsedAt, HitCount) in Pending.items()]
+            )
+        return len(Pending)
+
+    def PurgeExpired(self) -> int:
+        # Trimming is least recently used first, so record recent use before it runs.
+        self.FlushHits()
+        return super().PurgeExpired()
+
+    def Clear(self) -> int:
+        with self._HitLock:
+            self._PendingHits.clear()
+        return super().Clear()
+
+
+def GetHashDistance(FirstHash: str, SecondHash: str) -> int:
+    return bin(int(FirstHash, 16) ^ int(SecondHash, 16)).count("1")
+
+
+class SqliteImageLookupCache(SqliteAiLookupCache):
+    """AI image lookup responses; near-duplicate photos match by perceptual hash."""
+
+    Name = "image"
+    TableName = "ImageLookupCache"
+
+    def __init__(self, MaxEntries: int, MaxBytes: int):
+        super().__init__(MaxEntries, MaxBytes)
+        self.NearDuplicateHits = 0
+
+    def SetImage(self, Key: str, PerceptualHash: Optional[str], Variant: str, Value: Any, TtlSeconds: float) -> None:
+        with Transaction():
+            self.Set(Key, Value, TtlSeconds)
+            ExecuteQuery(
+                f"UPDATE {self.TableName} SET PerceptualHash = ?, Variant = ? WHERE CacheKey = ?;",
+                [PerceptualHash, Variant, Key]
+            )
+
+    def _FindSimilarKey(self, PerceptualHash: str, Variant: str, MaxDistance: int, ScanLimit: int) -> Optional[str]:
+        # Only the newest rows are compared; retries and re-encodes arrive soon after the original
+        Rows = FetchAll(
+            f"""
+            SELECT CacheKey, PerceptualHash FROM {self.TableName}
+            WHERE Variant = ? AND PerceptualHash IS NOT NULL AND COALESCE(FreshUntil, ExpiresAt) > ?
+            ORDER BY CreatedAt DESC
+            LIMIT ?;
+            """,
+            [Variant, time(), max(0, ScanLimit)]
+        )
+        BestKey: Optional[str] = None
+        BestDistance = MaxDistance + 1
+        for Row in Rows:
+            Distance = GetHashDistance(PerceptualHash, Row["PerceptualHash"])
+            if Distance < BestDistance:
+                BestKey, BestDistance = Row["CacheKey"], Distance
+        return BestKey
+
+    def GetImage(
+        self,
+        Key: str,
+        PerceptualHash: Optional[str],
+        Variant: str,
+        MaxDistance: int,
+        ScanLimit: int
+    ) -> Optional[Any]:
+        """Return the value for Key, else for the closest of the ScanLimit newest fresh images within MaxDistance bits."""
+        MatchKey = Key
+        if PerceptualHash is not None and MaxDistance >= 0:
+            Exact = FetchOne(
+                f"SELECT 1 FROM {self.TableName} WHERE CacheKey = ? AND COALESCE(FreshUntil, ExpiresAt) > ?;",
+                [Key, time()]
+            )
+            if Exact is None:
+                SimilarKey = self._FindSimilarKey(PerceptualHash, Variant, MaxDistance, ScanLimit)
+                if SimilarKey is not None:
+                    MatchKey = SimilarKey
+                    self.NearDuplicateHits += 1
+        return self.Get(MatchKey)
+
+    def GetStats(self) -> Dict[str, Any]:
+        Stats = super().GetStats()
+        Stats["near_duplicate_hits"] = self.NearDuplicateHits
+        return Stats
+
+
+def BuildLookupCache() -> LookupCacheBackend:
+    BackendName = (Settings.FoodLookupCacheBackend or "").strip().lower()
+    if BackendName == MemoryLookupCache.Name:
+        return MemoryLookupCache(Settings.FoodLookupCacheMaxEntries, Settings.FoodLookupCacheMaxBytes)
+    if BackendName == SqliteLookupCache.Name:
+        return SqliteLookupCache(Settings.FoodLookupCacheMaxEntries, Settings.FoodLookupCacheMaxBytes)
+    raise ValueError(f"Unsupported food lookup cache backend: {Settings.FoodLookupCacheBackend}")
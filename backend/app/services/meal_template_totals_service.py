@@ -0,0 +1,58 @@
+from app.utils.database import ExecuteQuery
+
+TotalsUpsertSql = """
+    INSERT INTO MealTemplateTotals (
+        MealTemplateId,
+        Calories,
+        Protein,
+        Fibre,
+        Carbs,
+        Fat,
+        SaturatedFat,
+        Sugar,
+        Sodium,
+        UpdatedAt
+    )
+    SELECT
+        MealTemplates.MealTemplateId,
+        COALESCE(SUM(Foods.CaloriesPerServing * MealTemplateItems.Quantity), 0),
+        COALESCE(SUM(Foods.ProteinPerServing * MealTemplateItems.Quantity), 0),
+        COALESCE(SUM(COALESCE(Foods.FibrePerServing, 0) * MealTemplateItems.Quantity), 0),
+        COALESCE(SUM(COALESCE(Foods.CarbsPerServing, 0) * MealTemplateItems.Quantity), 0),
+        COALESCE(SUM(COALESCE(Foods.FatPerServing, 0) * MealTemplateItems.Quantity), 0),
+        COALESCE(SUM(COALESCE(Foods.SaturatedFatPerServing, 0) * MealTemplateItems.Quantity), 0),
+        COALESCE(SUM(COALESCE(Foods.SugarPerServing, 0) * MealTemplateItems.Quantity), 0),
+        COALESCE(SUM(COALESCE(Foods.SodiumPerServing, 0) * MealTemplateItems.Quantity), 0),
+        CURRENT_TIMESTAMP
+    FROM MealTemplates
+    LEFT JOIN MealTemplateItems ON MealTemplateItems.MealTemplateId = MealTemplates.MealTemplateId
+    LEFT JOIN Foods ON Foods.FoodId = MealTemplateItems.FoodId
+    WHERE {Filter}
+    GROUP BY MealTemplates.MealTemplateId
+    ON CONFLICT (MealTemplateId) DO UPDATE SET
+        Calories = excluded.Calories,
+        Protein = excluded.Protein,
+        Fibre = excluded.Fibre,
+        Carbs = excluded.Carbs,
+        Fat = excluded.Fat,
+        SaturatedFat = excluded.SaturatedFat,
+        Sugar = excluded.Sugar,
+        Sodium = excluded.Sodium,
+        UpdatedAt = excluded.UpdatedAt;
+"""
+
+
+def RefreshMealTemplateTotals(MealTemplateId: str) -> None:
+    ExecuteQuery(
+        TotalsUpsertSql.format(Filter="MealTemplates.MealTemplateId = ?"),
+        [MealTemplateId]
+    )
+
+
+def RefreshMealTemplateTotalsForFood(FoodId: str) -> None:
+    ExecuteQuery(
+        TotalsUpsertSql.format(
+            Filter="MealTemplates.MealTemplateId IN (SELECT MealTemplateId FROM MealTemplateItems WHERE FoodId = ?)"
+        ),
+        [FoodId]
+    )
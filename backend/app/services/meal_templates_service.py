@@ -10,15 +10,14 @@ from app.models.schemas import (
     MealTemplateItemInput,
     MealTemplateWithItems
 )
-from app.services.daily_logs_service import CreateMealEntry, EnsureDailyLogForDate, GetEntriesForLog
+from app.services.daily_logs_service import CreateMealEntries, EnsureDailyLogForDate, GetEntriesForLog
+from app.services.daily_totals_service import RefreshDailyTotalsForTemplate
+from app.services.meal_template_totals_service import RefreshMealTemplateTotals
 from app.services.serving_conversion_service import ConvertEntryToServings
-from app.utils.database import ExecuteQuery, FetchAll, FetchOne
+from app.utils.database import ExecuteMany, ExecuteQuery, FetchAll, FetchOne, Transaction
 
 
 def _ResolveTemplateItemAmount(FoodRow: dict, Item: MealTemplateItemInput) -> tuple[float, float, str]:
-    if (Item.EntryQuantity is None) != (Item.EntryUnit is None):
-        raise ValueError("EntryQuantity and EntryUnit must be provided together.")
-
     EntryQuantity = Item.EntryQuantity if Item.EntryQuantity is not None else Item.Quantity
     EntryUnit = Item.EntryUnit or "serving"
 
@@ -30,12 +29,79 @@ def _ResolveTemplateItemAmount(FoodRow: dict, Item: MealTemplateItemInput) -> tu
         float(FoodRow["ServingQuantity"]) if FoodRow["ServingQuantity"] else 1.0,
         FoodRow["ServingUnit"] or "serving",
         EntryQuantity,
-        EntryUnit
+        EntryUnit,
+        FoodId=FoodRow["FoodId"]
     )
     return Quantity, EntryQuantity, NormalizedUnit
 
 
-def CreateMealTemplate(UserId: str, Input: CreateMealTemplateInput) -> MealTemplateWithItems:
+def _FetchTemplateItemFoods(Items: list[MealTemplateItemInput]) -> list[dict]:
+    FoodRows: list[dict] = []
+    for Item in Items:
+        if (Item.EntryQuantity is None) != (Item.EntryUnit is None):
+            raise ValueError("EntryQuantity and EntryUnit must be provided together.")
+        FoodRow = FetchOne(
+            """
+            SELECT
+                FoodId AS FoodId,
+                FoodName AS FoodName,
+                ServingQuantity AS ServingQuantity,
+                ServingUnit AS ServingUnit
+            FROM Foods
+            WHERE FoodId = ?;
+            """,
+            [Item.FoodId]
+        )
+        if FoodRow is None:
+            raise ValueError("Food not found.")
+        FoodRows.append(FoodRow)
+    return FoodRows
+
+
+def _BuildTemplateItemRows(
+    MealTemplateId: str,
+    Items: list[MealTemplateItemInput],
+    FoodRows: list[dict]
+) -> list[list]:
+    # Resolve unit conversions before any write so a bad item never leaves a partial template.
+    ItemRows: list[list] = []
+    for Item, FoodRow in zip(Items, FoodRows):
+        Quantity, EntryQuantity, EntryUnit = _ResolveTemplateItemAmount(FoodRow, Item)
+        ItemRows.append([
+            str(uuid.uuid4()),
+            MealTemplateId,
+            Item.FoodId,
+            Item.MealType,
+            Quantity,
+            EntryQuantity,
+            EntryUnit,
+            Item.EntryNotes,
+            Item.SortOrder
+        ])
+    return ItemRows
+
+
+def _InsertTemplateItemRows(ItemRows: list[list]) -> None:
+    ExecuteMany(
+        """
+        INSERT INTO MealTemplateItems (
+            MealTemplateItemId,
+            MealTemplateId,
+            FoodId,
+            MealType,
+            Quantity,
+            EntryQuantity,
+            EntryUnit,
+            EntryNotes,
+            SortOrder
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);
+        """,
+        ItemRows
+    )
+
+
+def ValidateMealTemplateCreate(UserId: str, Input: CreateMealTemplateInput) -> tuple[str, list[dict]]:
+    """Check a new template's name and items; returns the trimmed name and each item's food row."""
     TemplateName = Input.TemplateName.strip()
     if not TemplateName:
         raise ValueError("Template name is required.")
@@ -54,63 +120,27 @@ def CreateMealTemplate(UserId: str, Input: CreateMealTemplateInput) -> MealTempl
     if Existing is not None:
         raise ValueError("Template name already exists.")
 
-    MealTemplateId = str(uuid.uuid4())
+    return TemplateName, _FetchTemplateItemFoods(Input.Items)
 
-    ExecuteQuery(
-        """
-        INSERT INTO MealTemplates (
-            MealTemplateId,
-            UserId,
-            TemplateName
-        ) VALUES (?, ?, ?);
-        """,
-        [MealTemplateId, UserId, TemplateName]
-    )
-
-    for Item in Input.Items:
-        FoodRow = FetchOne(
-            """
-            SELECT
-                FoodId AS FoodId,
-                FoodName AS FoodName,
-                ServingQuantity AS ServingQuantity,
-                ServingUnit AS ServingUnit
-            FROM Foods
-            WHERE FoodId = ?;
-            """,
-            [Item.FoodId]
-        )
-        if FoodRow is None:
-            raise ValueError("Food not found.")
 
-        Quantity, EntryQuantity, EntryUnit = _ResolveTemplateItemAmount(FoodRow, Item)
+def CreateMealTemplate(UserId: str, Input: CreateMealTemplateInput) -> MealTemplateWithItems:
+    TemplateName, FoodRows = ValidateMealTemplateCreate(UserId, Input)
+    MealTemplateId = str(uuid.uuid4())
+    ItemRows = _BuildTemplateItemRows(MealTemplateId, Input.Items, FoodRows)
 
+    with Transaction():
         ExecuteQuery(
             """
-            INSERT INTO MealTemplateItems (
-                MealTemplateItemId,
+            INSERT INTO MealTemplates (
                 MealTemplateId,
-                FoodId,
-                MealType,
-                Quantity,
-                EntryQuantity,
-                EntryUnit,
-                EntryNotes,
-                SortOrder
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);
+                UserId,
+                TemplateName
+            ) VALUES (?, ?, ?);
             """,
-            [
-                str(uuid.uuid4()),
-                MealTemplateId,
-                Item.FoodId,
-                Item.MealType,
-                Quantity,
-                EntryQuantity,
-                EntryUnit,
-                Item.EntryNotes,
-                Item.SortOrder
-            ]
+            [MealTemplateId, UserId, TemplateName]
         )
+        _InsertTemplateItemRows(ItemRows)
+        RefreshMealTemplateTotals(MealTemplateId)
 
     return GetMealTemplate(UserId, MealTemplateId)
 
@@ -278,25 +308,31 @@ def _FetchMealTemplateRow(UserId: str, MealTemplateId: str, IsAdmin: bool) -> di
 
 
 def DeleteMealTemplate(UserId: str, MealTemplateId: str, IsAdmin: bool = False) -> None:
-    _FetchMealTemplateRow(UserId, MealTemplateId, IsAdmin)
+    Row = _FetchMealTemplateRow(UserId, MealTemplateId, IsAdmin)
 
-    ExecuteQuery(
-        "DELETE FROM MealTemplates WHERE MealTemplateId = ?;",
-        [MealTemplateId]
-    )
+    with Transaction():
+        ExecuteQuery(
+            "DELETE FROM MealTemplateTotals WHERE MealTemplateId = ?;",
+            [MealTemplateId]
+        )
+        ExecuteQuery(
+            "DELETE FROM MealTemplates WHERE MealTemplateId = ?;",
+            [MealTemplateId]
+        )
 
 
-def UpdateMealTemplate(
+def ValidateMealTemplateUpdate(
     UserId: str,
     MealTemplateId: str,
     Input: UpdateMealTemplateInput,
     IsAdmin: bool = False
-) -> MealTemplateWithItems:
+) -> tuple[str, str | None, list[dict] | None]:
+    """Check ownership, the new name and items; returns the owner, trimmed name and item food rows."""
     # Verify template exists and user owns it
     Row = _FetchMealTemplateRow(UserId, MealTemplateId, IsAdmin)
     OwnerUserId = Row["UserId"]
 
-    # Update template name if provided
+    TemplateName = None
     if Input.TemplateName is not None:
         TemplateName = Input.TemplateName.strip()
         if not TemplateName:
@@ -313,85 +349,61 @@ def UpdateMealTemplate(
         )
         if Existing is not None:
             raise ValueError("Template name already exists.")
-        
-        ExecuteQuery(
-            "UPDATE MealTemplates SET TemplateName = ? WHERE MealTemplateId = ?;",
-            [TemplateName, MealTemplateId]
-        )
 
-    # Update items if provided
+    FoodRows = None
     if Input.Items is not None:
         if not Input.Items:
             raise ValueError("Template items cannot be empty.")
-        
-        # Delete existing items
-        ExecuteQuery(
-            "DELETE FROM MealTemplateItems WHERE MealTemplateId = ?;",
-            [MealTemplateId]
-        )
-        
-        # Insert new items
-        for Item in Input.Items:
-            FoodRow = FetchOne(
-                """
-                SELECT
-                    FoodId AS FoodId,
-                    FoodName AS FoodName,
-                    ServingQuantity AS ServingQuantity,
-                    ServingUnit AS ServingUnit
-                FROM Foods
-                WHERE FoodId = ?;
-                """,
-                [Item.FoodId]
-            )
-            if FoodRow is None:
-                raise ValueError("Food not found.")
+        FoodRows = _FetchTemplateItemFoods(Input.Items)
+
+    return OwnerUserId, TemplateName, FoodRows
+
+
+def UpdateMealTemplate(
+    UserId: str,
+    MealTemplateId: str,
+    Input: UpdateMealTemplateInput,
+    IsAdmin: bool = False
+) -> MealTemplateWithItems:
+    OwnerUserId, TemplateName, FoodRows = ValidateMealTemplateUpdate(UserId, MealTemplateId, Input, IsAdmin)
+    ItemRows = None
+    if FoodRows is not None:
+        ItemRows = _BuildTemplateItemRows(MealTemplateId, Input.Items, FoodRows)
 
-            Quantity, EntryQuantity, EntryUnit = _ResolveTemplateItemAmount(FoodRow, Item)
+    with Transaction():
+        if TemplateName is not None:
+            ExecuteQuery(
+                "UPDATE MealTemplates SET TemplateName = ? WHERE MealTemplateId = ?;",
+                [TemplateName, MealTemplateId]
+            )
 
+        # Replace items wholesale
+        if ItemRows is not None:
             ExecuteQuery(
-                """
-                INSERT INTO MealTemplateItems (
-                    MealTemplateItemId,
-                    MealTemplateId,
-                    FoodId,
-                    MealType,
-                    Quantity,
-                    EntryQuantity,
-                    EntryUnit,
-                    EntryNotes,
-                    SortOrder
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);
-                """,
-                [
-                    str(uuid.uuid4()),
-                    MealTemplateId,
-                    Item.FoodId,
-                    Item.MealType,
-                    Quantity,
-                    EntryQuantity,
-                    EntryUnit,
-                    Item.EntryNotes,
-                    Item.SortOrder
-                ]
+                "DELETE FROM MealTemplateItems WHERE MealTemplateId = ?;",
+                [MealTemplateId]
             )
+            _InsertTemplateItemRows(ItemRows)
+            RefreshMealTemplateTotals(MealTemplateId)
+            RefreshDailyTotalsForTemplate(MealTemplateId)
 
     return GetMealTemplate(OwnerUserId, MealTemplateId)
 
 
 def ApplyMealTemplate(UserId: str, MealTemplateId: str, LogDate: str) -> ApplyMealTemplateResponse:
     Template = GetMealTemplate(UserId, MealTemplateId)
+    if not Template.Items:
+        return ApplyMealTemplateResponse(CreatedCount=0)
+
+    # Template items already store their amount in servings, so applying them needs no
+    # unit conversion; CreateMealEntries only holds the write lock for the inserts.
     DailyLogItem = EnsureDailyLogForDate(UserId, LogDate)
     ExistingEntries = GetEntriesForLog(UserId, DailyLogItem.DailyLogId)
     NextSortOrder = max((Entry.SortOrder for Entry in ExistingEntries), default=-1) + 1
 
-    if not Template.Items:
-        return ApplyMealTemplateResponse(CreatedCount=0)
-
-    CreatedCount = 0
-    for Index, Item in enumerate(Template.Items):
-        CreateMealEntry(
-            UserId,
+    CreatedCount = CreateMealEntries(
+        UserId,
+        [
             CreateMealEntryInput(
                 DailyLogId=DailyLogItem.DailyLogId,
                 MealType=Item.MealType,
@@ -403,7 +415,9 @@ def ApplyMealTemplate(UserId: str, MealTemplateId: str, LogDate: str) -> ApplyMe
                 SortOrder=NextSortOrder + Index,
                 ScheduleSlotId=None
             )
-        )
-        CreatedCount += 1
+            for Index, Item in enumerate(Template.Items)
+        ],
+        ConvertUnits=False
+    )
 
     return ApplyMealTemplateResponse(CreatedCount=CreatedCount)
@@ -2,7 +2,7 @@ import json
 from typing import Any
 
 from app.config import Settings
-from app.services.openai_client import GetOpenAiContentWithModel
+from app.services.openai_client import GetOpenAiContentWithModelAsync
 from app.services.serving_conversion_service import NormalizeUnit
 
 
@@ -46,7 +46,7 @@ def _NormalizeUnitValue(Unit: str) -> str:
     return Normalized or "serving"
 
 
-def ParseMealText(Text: str, KnownFoods: list[str] | None = None) -> dict[str, Any]:
+async def ParseMealText(Text: str, KnownFoods: list[str] | None = None) -> dict[str, Any]:
     if not Settings.OpenAiApiKey:
         raise ValueError("OpenAI API key not configured.")
 
@@ -89,7 +89,7 @@ Rules:
 
     UserPrompt = f"Meal entry:\n{Text.strip()}"
 
-    Content, ModelUsed = GetOpenAiContentWithModel(
+    Content, ModelUsed = await GetOpenAiContentWithModelAsync(
         [
             {"role": "system", "content": SystemPrompt},
             {"role": "user", "content": UserPrompt}
@@ -107,7 +107,7 @@ Rules:
             {"role": "system", "content": RetryPrompt},
             {"role": "user", "content": UserPrompt if not Content else Content}
         ]
-        RetryContent, _RetryModelUsed = GetOpenAiContentWithModel(
+        RetryContent, _RetryModelUsed = await GetOpenAiContentWithModelAsync(
             RetryMessages,
             Temperature=0.1,
             MaxTokens=2000,
@@ -151,7 +151,7 @@ Rules:
             "Return ONLY the JSON object with non-zero CaloriesPerServing or ProteinPerServing. "
             "No extra text."
         )
-        RetryContent, _RetryModelUsed = GetOpenAiContentWithModel(
+        RetryContent, _RetryModelUsed = await GetOpenAiContentWithModelAsync(
             [
                 {"role": "system", "content": RetryPrompt},
                 {"role": "user", "content": UserPrompt}
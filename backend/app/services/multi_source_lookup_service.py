@@ -5,26 +5,108 @@ Sources:
 1. OpenFoodFacts (free, open, comprehensive)
 2. AI fallback (for items not in databases)
 
-Results are cached to minimize repeated calls.
+Results are cached to minimize repeated calls. The cache backend (in-memory
+LRU or shared SQLite table) is chosen by FOOD_LOOKUP_CACHE_BACKEND. When
+OPENFOODFACTS_LOCAL_INDEX is on, the imported product index is consulted
+before the cache and the live API.
 """
 
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+import asyncio
+import sqlite3
+from typing import List, Optional, Dict, Any, Awaitable, Callable
 
+from app.config import Settings
 from app.models.schemas import FoodInfo
+from app.services.ai_lookup_cache_service import PurgeAiLookupCache
+from app.services.lookup_cache import BuildLookupCache, LookupCacheBackend
+from app.services.openfoodfacts_index_service import (
+    GetLocalProductByBarcode,
+    IsConfidentLocalMatch,
+    SearchLocalProducts
+)
 from app.services.openfoodfacts_service import OpenFoodFactsService
+from app.utils.database import RunDatabaseCall
 from app.utils.logger import GetLogger
+from app.utils.lookup_keys import NormalizeLookupKey
 
 
-# Simple in-memory cache (should be Redis in production)
-_CACHE: Dict[str, tuple[Any, datetime]] = {}
-_CACHE_TTL = timedelta(hours=24)
 Logger = GetLogger("multi_source_lookup_service")
+# Cached marker for barcodes OpenFoodFacts does not know
+_NOT_FOUND = {"NotFound": True}
+
+
+def MergeProducts(*ProductLists: List[FoodInfo], Limit: int) -> List[FoodInfo]:
+    """Concatenate product lists in order, dropping repeats by barcode or name."""
+    Merged: List[FoodInfo] = []
+    Seen: set[str] = set()
+    for Products in ProductLists:
+        for Product in Products:
+            Barcode = (Product.Metadata or {}).get("barcode")
+            Key = f"barcode:{Barcode}" if Barcode else f"name:{NormalizeLookupKey(Product.FoodName)}"
+            if Key in Seen:
+                continue
+            Seen.add(Key)
+            Merged.append(Product)
+            if len(Merged) >= Limit:
+                return Merged
+    return Merged
 
 
 class MultiSourceFoodLookupService:
     """Food lookup service for OpenFoodFacts with caching."""
     
+    _Cache: Optional[LookupCacheBackend] = None
+    _SweepTask: Optional[asyncio.Task] = None
+    # Lookups currently fetching upstream, keyed like the cache
+    _InFlight: Dict[str, asyncio.Task] = {}
+    _CoalescedCount = 0
+    
+    @classmethod
+    def GetCache(cls) -> LookupCacheBackend:
+        """Return the configured cache backend, creating it on first use."""
+        if cls._Cache is None:
+            cls._Cache = BuildLookupCache()
+        return cls._Cache
+    
+    @classmethod
+    async def _CallCache(cls, Method: Callable[..., Any], *Args: Any) -> Any:
+        if cls.GetCache().IsBlocking:
+            return await RunDatabaseCall(Method, *Args)
+        return Method(*Args)
+    
+    @classmethod
+    async def _LookupLocal(cls, Function: Callable[..., Any], *Args: Any) -> Any:
+        if not Settings.OpenFoodFactsLocalIndex:
+            return None
+        try:
+            return await RunDatabaseCall(Function, *Args)
+        except sqlite3.Error as E:
+            Logger.warning(f"Local OpenFoodFacts index unavailable: {E}")
+            return None
+    
+    @classmethod
+    def _StartOnce(cls, Key: str, Fetch: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Return the in-flight task for Key, starting Fetch if none is running."""
+        Pending = cls._InFlight.get(Key)
+        if Pending is not None:
+            cls._CoalescedCount += 1
+            return Pending
+        Pending = asyncio.get_running_loop().create_task(Fetch())
+        cls._InFlight[Key] = Pending
+
+        def Release(Done: asyncio.Task) -> None:
+            if cls._InFlight.get(Key) is Done:
+                del cls._InFlight[Key]
+
+        Pending.add_done_callback(Release)
+        return Pending
+    
+    @classmethod
+    async def _RunOnce(cls, Key: str, Fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Run Fetch once per key; concurrent callers await the same task."""
+        # Shield so one caller disconnecting does not cancel the shared fetch
+        return await asyncio.shield(cls._StartOnce(Key, Fetch))
+    
     @classmethod
     async def Search(cls, Query: str) -> Dict[str, List[FoodInfo]]:
         """
@@ -40,19 +122,44 @@ class MultiSourceFoodLookupService:
                 "ai_fallback_available": True/False
             }
         """
+        # Only a whole-word local match skips the live API; weaker local hits are merged in front.
+        LocalResults = await cls._LookupLocal(SearchLocalProducts, Query, 10) or []
+        if LocalResults and IsConfidentLocalMatch(Query, LocalResults[0]):
+            return {
+                "openfoodfacts": LocalResults,
+                "ai_fallback_available": True
+            }
+        
+        Results = await cls._SearchRemote(Query)
+        if LocalResults:
+            Results = {
+                **Results,
+                "openfoodfacts": MergeProducts(LocalResults, Results["openfoodfacts"], Limit=10)
+            }
+        return Results
+    
+    @classmethod
+    async def _SearchRemote(cls, Query: str) -> Dict[str, Any]:
         # Check cache first
-        CacheKey = f"search:{Query}"
-        if CacheKey in _CACHE:
-            CachedResults, CachedTime = _CACHE[CacheKey]
-            if datetime.now() - CachedTime < _CACHE_TTL:
-                return CachedResults
+        Cache = cls.GetCache()
+        CacheKey = f"search:{NormalizeLookupKey(Query)}"
+        Cached = await cls._CallCache(Cache.Get, CacheKey)
+        if Cached is not None:
+            return {
+                "openfoodfacts": [FoodInfo.model_validate(Item) for Item in Cached["openfoodfacts"]],
+                "ai_fallback_available": Cached["ai_fallback_available"]
+            }
         
+        return await cls._RunOnce(CacheKey, lambda: cls._FetchSearch(Query.strip(), CacheKey))
+    
+    @classmethod
+    async def _FetchSearch(cls, Query: str, CacheKey: str) -> Dict[str, List[FoodInfo]]:
+        Cache = cls.GetCache()
         Results = {
             "openfoodfacts": [],
             "ai_fallback_available": True
         }
         
-        # Parallel fetch from OpenFoodFacts (fast)
         try:
             OFFResults = await OpenFoodFactsService.SearchProducts(Query, PageSize=10)
             Results["openfoodfacts"] = OFFResults
@@ -60,35 +167,75 @@ class MultiSourceFoodLookupService:
             Logger.warning(f"OpenFoodFacts search error: {E}", exc_info=True)
         
         # Cache results
-        _CACHE[CacheKey] = (Results, datetime.now())
+        await cls._CallCache(
+            Cache.Set,
+            CacheKey,
+            {
+                "openfoodfacts": [Item.model_dump(mode="json") for Item in Results["openfoodfacts"]],
+                "ai_fallback_available": Results["ai_fallback_available"]
+            },
+            Settings.FoodLookupCacheTtlSeconds
+        )
         
         return Results
     
-    @classmethod
     @classmethod
     async def GetByBarcode(cls, Barcode: str) -> Optional[FoodInfo]:
         """
         Look up product by barcode (OpenFoodFacts only).
         
+        Unknown barcodes are cached for FOOD_LOOKUP_NEGATIVE_TTL_SECONDS. Expired
+        entries inside FOOD_LOOKUP_STALE_SECONDS are returned immediately while a
+        background refresh runs.
+        
         Args:
             Barcode: Product barcode
             
         Returns:
             FoodInfo or None if not found
         """
+        Barcode = "".join(Barcode.split())
+        LocalResult = await cls._LookupLocal(GetLocalProductByBarcode, Barcode)
+        if LocalResult is not None:
+            return LocalResult
+        
         # Check cache
+        Cache = cls.GetCache()
         CacheKey = f"barcode:{Barcode}"
-        if CacheKey in _CACHE:
-            CachedResult, CachedTime = _CACHE[CacheKey]
-            if datetime.now() - CachedTime < _CACHE_TTL:
-                return CachedResult
+        Entry = await cls._CallCache(Cache.GetEntry, CacheKey)
+        if Entry is not None:
+            Cached, IsStale = Entry
+            if IsStale:
+                cls._StartOnce(CacheKey, lambda: cls._FetchBarcode(Barcode, CacheKey))
+            if Cached == _NOT_FOUND:
+                return None
+            return FoodInfo.model_validate(Cached)
         
+        return await cls._RunOnce(CacheKey, lambda: cls._FetchBarcode(Barcode, CacheKey))
+    
+    @classmethod
+    async def _FetchBarcode(cls, Barcode: str, CacheKey: str) -> Optional[FoodInfo]:
+        Cache = cls.GetCache()
         try:
             Result = await OpenFoodFactsService.GetProductByBarcode(Barcode)
             
-            # Cache result
+            # Cache hits and misses; lookup errors leave any stale entry in place
             if Result:
-                _CACHE[CacheKey] = (Result, datetime.now())
+                await cls._CallCache(
+                    Cache.Set,
+                    CacheKey,
+                    Result.model_dump(mode="json"),
+                    Settings.FoodLookupCacheTtlSeconds,
+                    Settings.FoodLookupStaleSeconds
+                )
+            else:
+                await cls._CallCache(
+                    Cache.Set,
+                    CacheKey,
+                    _NOT_FOUND,
+                    Settings.FoodLookupNegativeTtlSeconds,
+                    Settings.FoodLookupStaleSeconds
+                )
             
             return Result
         
@@ -96,22 +243,62 @@ class MultiSourceFoodLookupService:
             Logger.warning(f"Barcode lookup error: {E}", exc_info=True)
             return None
     
-    @classmethod
     @classmethod
     def ClearCache(cls):
         """Clear all cached results."""
-        global _CACHE
-        _CACHE = {}
+        cls.GetCache().Clear()
     
     @classmethod
     def GetCacheStats(cls) -> Dict[str, Any]:
         """Get cache statistics."""
-        Now = datetime.now()
-        ValidEntries = sum(1 for _, (_, CachedTime) in _CACHE.items() if Now - CachedTime < _CACHE_TTL)
-        
-        return {
-            "total_entries": len(_CACHE),
-            "valid_entries": ValidEntries,
-            "expired_entries": len(_CACHE) - ValidEntries,
-            "ttl_hours": _CACHE_TTL.total_seconds() / 3600
-        }
+        Stats = cls.GetCache().GetStats()
+        Stats["ttl_hours"] = Settings.FoodLookupCacheTtlSeconds / 3600
+        Stats["in_flight"] = len(cls._InFlight)
+        Stats["coalesced_requests"] = cls._CoalescedCount
+        return Stats
+    
+    @classmethod
+    async def PurgeExpired(cls) -> int:
+        """Drop expired entries and trim the cache to its size bounds."""
+        Cache = cls.GetCache()
+        return await cls._CallCache(Cache.PurgeExpired)
+    
+    @classmethod
+    async def _RunSweeper(cls, IntervalSeconds: float) -> None:
+        while True:
+            await asyncio.sleep(IntervalSeconds)
+            try:
+                Removed = await cls.PurgeExpired()
+                if Removed:
+                    Logger.info(f"Lookup cache sweep removed {Removed} entries")
+            except Exception as E:
+                Logger.warning(f"Lookup cache sweep failed: {E}", exc_info=True)
+            # AI and image lookup caches are trimmed here rather than on every write
+            try:
+                Removed = await RunDatabaseCall(PurgeAiLookupCache)
+                if Removed:
+                    Logger.info(f"AI lookup cache sweep removed {Removed} entries")
+            except Exception as E:
+                Logger.warning(f"AI lookup cache sweep failed: {E}", exc_info=True)
+    
+    @classmethod
+    def StartCacheSweeper(cls) -> None:
+        """Start background expiry on the running loop (no-op when disabled)."""
+        if Settings.FoodLookupCacheSweepSeconds <= 0:
+            return
+        if cls._SweepTask is not None and not cls._SweepTask.done():
+            return
+        cls._SweepTask = asyncio.get_running_loop().create_task(
+            cls._RunSweeper(Settings.FoodLookupCacheSweepSeconds)
+        )
+    
+    @classmethod
+    async def StopCacheSweeper(cls) -> None:
+        Task, cls._SweepTask = cls._SweepTask, None
+        if Task is None:
+            return
+        Task.cancel()
+        try:
+            await Task
+        except asyncio.CancelledError:
+            pass
@@ -6,7 +6,7 @@ from datetime import datetime
 from typing import Optional
 
 from app.config import Settings
-from app.services.openai_client import GetOpenAiContentWithModel
+from app.services.openai_client import GetOpenAiContentWithModelAsync
 
 
 class NutritionRecommendation:
@@ -87,7 +87,7 @@ def _TryParseRecommendationJson(Content: str) -> Optional[dict]:
     return None
 
 
-def GetAiNutritionRecommendations(
+async def GetAiNutritionRecommendations(
     Age: int,
     HeightCm: int,
     WeightKg: float,
@@ -145,7 +145,7 @@ Base your recommendations on:
 
 Provide personalized daily nutrition targets."""
 
-    Content, ModelUsed = GetOpenAiContentWithModel(
+    Content, ModelUsed = await GetOpenAiContentWithModelAsync(
         [
             {"role": "system", "content": SystemPrompt},
             {"role": "user", "content": UserPrompt}
@@ -155,7 +155,7 @@ Provide personalized daily nutrition targets."""
     )
     
     if not Content:
-        RetryContent, RetryModelUsed = GetOpenAiContentWithModel(
+        RetryContent, RetryModelUsed = await GetOpenAiContentWithModelAsync(
             [
                 {"role": "system", "content": SystemPrompt},
                 {"role": "user", "content": UserPrompt}
@@ -175,7 +175,7 @@ Provide personalized daily nutrition targets."""
             "Do not include extra text. Explanation must not contain double quotes."
         )
         RetryUserPrompt = f"Reformat this into valid JSON only:\n{Content}"
-        RetryContent, RetryModelUsed = GetOpenAiContentWithModel(
+        RetryContent, RetryModelUsed = await GetOpenAiContentWithModelAsync(
             [
                 {"role": "system", "content": RetrySystemPrompt},
                 {"role": "user", "content": RetryUserPrompt}
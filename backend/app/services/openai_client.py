@@ -1,8 +1,13 @@
+import re
 from typing import Any
 
 import httpx
 
 from app.config import Settings
+from app.utils.http_client import BuildAsyncClient
+
+# Application-scoped client so AI calls reuse pooled keep-alive connections
+_AsyncClient: httpx.AsyncClient | None = None
 
 
 def _ShouldUseResponsesEndpoint(Model: str) -> bool:
@@ -113,14 +118,20 @@ def _ParseFallbackModels() -> list[str]:
     return Models
 
 
-def _RequestOpenAiContent(
+def IsConfiguredModel(ModelUsed: str) -> bool:
+    """True when ModelUsed is OPENAI_MODEL or a dated snapshot of it, not a fallback."""
+    Model = Settings.OpenAiModel
+    return ModelUsed == Model or re.fullmatch(re.escape(Model) + r"-\d{4}-\d{2}-\d{2}", ModelUsed) is not None
+
+
+def _BuildOpenAiRequest(
     Model: str,
     Messages: list[dict[str, Any]],
     Temperature: float,
     MaxTokens: int | None,
     ReasoningEffort: str | None,
     TextVerbosity: str | None
-) -> tuple[str, str]:
+) -> tuple[str, dict[str, str], dict[str, Any]]:
     if not Settings.OpenAiApiKey:
         raise ValueError("OpenAI API key not configured.")
 
@@ -156,13 +167,10 @@ def _RequestOpenAiContent(
         "Authorization": f"Bearer {Settings.OpenAiApiKey}",
         "Content-Type": "application/json"
     }
+    return Url, Headers, Payload
 
-    Response = httpx.post(
-        Url,
-        headers=Headers,
-        json=Payload,
-        timeout=30.0
-    )
+
+def _ReadOpenAiResponse(Response: httpx.Response, Url: str, Model: str) -> tuple[str, str]:
     try:
         Response.raise_for_status()
     except httpx.HTTPStatusError as ErrorValue:
@@ -180,6 +188,34 @@ def _RequestOpenAiContent(
     return Content, str(ModelUsed)
 
 
+def _GetModelsToTry() -> list[str]:
+    ModelsToTry = [Settings.OpenAiModel]
+    for Model in _ParseFallbackModels():
+        if Model not in ModelsToTry:
+            ModelsToTry.append(Model)
+    return ModelsToTry
+
+
+def _RequestOpenAiContent(
+    Model: str,
+    Messages: list[dict[str, Any]],
+    Temperature: float,
+    MaxTokens: int | None,
+    ReasoningEffort: str | None,
+    TextVerbosity: str | None
+) -> tuple[str, str]:
+    Url, Headers, Payload = _BuildOpenAiRequest(
+        Model, Messages, Temperature, MaxTokens, ReasoningEffort, TextVerbosity
+    )
+    Response = httpx.post(
+        Url,
+        headers=Headers,
+        json=Payload,
+        timeout=Settings.OpenAiTimeoutSeconds
+    )
+    return _ReadOpenAiResponse(Response, Url, Model)
+
+
 def GetOpenAiContentWithModel(
     Messages: list[dict[str, Any]],
     Temperature: float,
@@ -187,13 +223,8 @@ def GetOpenAiContentWithModel(
     ReasoningEffort: str | None = None,
     TextVerbosity: str | None = None
 ) -> tuple[str, str]:
-    ModelsToTry = [Settings.OpenAiModel]
-    for Model in _ParseFallbackModels():
-        if Model not in ModelsToTry:
-            ModelsToTry.append(Model)
-
     LastError: Exception | None = None
-    for Model in ModelsToTry:
+    for Model in _GetModelsToTry():
         try:
             return _RequestOpenAiContent(Model, Messages, Temperature, MaxTokens, ReasoningEffort, TextVerbosity)
         except ValueError as ErrorValue:
@@ -220,3 +251,83 @@ def GetOpenAiContentForModel(
 def GetOpenAiContent(Messages: list[dict[str, Any]], Temperature: float, MaxTokens: int | None = None) -> str:
     Content, _ModelUsed = GetOpenAiContentWithModel(Messages, Temperature, MaxTokens)
     return Content
+
+
+def OpenOpenAiClient() -> httpx.AsyncClient:
+    """Return the shared async client, creating it on first use."""
+    global _AsyncClient
+    if _AsyncClient is None or _AsyncClient.is_closed:
+        _AsyncClient = BuildAsyncClient(
+            TimeoutSeconds=Settings.OpenAiTimeoutSeconds,
+            ConnectTimeoutSeconds=Settings.OpenAiConnectTimeoutSeconds,
+            MaxConnections=Settings.OpenAiMaxConnections,
+            MaxKeepaliveConnections=Settings.OpenAiMaxKeepaliveConnections,
+            KeepaliveExpirySeconds=Settings.OpenAiKeepaliveExpirySeconds,
+            EnableHttp2=Settings.OpenAiHttp2
+        )
+    return _AsyncClient
+
+
+async def CloseOpenAiClient() -> None:
+    global _AsyncClient
+    Client, _AsyncClient = _AsyncClient, None
+    if Client is not None:
+        await Client.aclose()
+
+
+async def _RequestOpenAiContentAsync(
+    Model: str,
+    Messages: list[dict[str, Any]],
+    Temperature: float,
+    MaxTokens: int | None,
+    ReasoningEffort: str | None,
+    TextVerbosity: str | None
+) -> tuple[str, str]:
+    Url, Headers, Payload = _BuildOpenAiRequest(
+        Model, Messages, Temperature, MaxTokens, ReasoningEffort, TextVerbosity
+    )
+    Response = await OpenOpenAiClient().post(Url, headers=Headers, json=Payload)
+    return _ReadOpenAiResponse(Response, Url, Model)
+
+
+async def GetOpenAiContentWithModelAsync(
+    Messages: list[dict[str, Any]],
+    Temperature: float,
+    MaxTokens: int | None = None,
+    ReasoningEffort: str | None = None,
+    TextVerbosity: str | None = None
+) -> tuple[str, str]:
+    LastError: Exception | None = None
+    for Model in _GetModelsToTry():
+        try:
+            return await _RequestOpenAiContentAsync(
+                Model, Messages, Temperature, MaxTokens, ReasoningEffort, TextVerbosity
+            )
+        except ValueError as ErrorValue:
+            LastError = ErrorValue
+            if str(ErrorValue) != "OpenAI model unavailable.":
+                break
+
+    if LastError is not None:
+        raise LastError
+    raise ValueError("OpenAI request failed.")
+
+
+async def GetOpenAiContentForModelAsync(
+    Model: str,
+    Messages: list[dict[str, Any]],
+    Temperature: float,
+    MaxTokens: int | None = None,
+    ReasoningEffort: str | None = None,
+    TextVerbosity: str | None = None
+) -> tuple[str, str]:
+    return await _RequestOpenAiContentAsync(Model, Messages, Temperature, MaxTokens, ReasoningEffort, TextVerbosity)
+
+
+async def GetOpenAiContentAsync(
+    Messages: list[dict[str, Any]],
+    Temperature: float,
+    MaxTokens: int | None = None
+) -> str:
+    Content, _ModelUsed = await GetOpenAiContentWithModelAsync(Messages, Temperature, MaxTokens)
+    return Content
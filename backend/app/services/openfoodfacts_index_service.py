@@ -0,0 +1,191 @@
+"""
+Local OpenFoodFacts product index.
+
+Streams an OpenFoodFacts export (JSONL or the tab-separated CSV, optionally
+gzipped) into the OpenFoodFactsProducts table, keeping Australian products
+only, so barcode scans and searches can be answered without the live API.
+
+Usage:
+    python -m app.services.openfoodfacts_index_service products.jsonl.gz
+"""
+
+import csv
+import gzip
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.models.schemas import FoodInfo
+from app.services.openfoodfacts_service import OpenFoodFactsService
+from app.utils.database import BuildFtsPrefixQuery, ExecuteMany, FetchAll, FetchOne, Transaction
+from app.utils.logger import GetLogger
+
+Logger = GetLogger("openfoodfacts_index_service")
+
+CountryTag = "en:australia"
+NutrimentFields = [
+    "energy-kcal_100g",
+    "proteins_100g",
+    "fat_100g",
+    "saturated-fat_100g",
+    "carbohydrates_100g",
+    "sugars_100g",
+    "fiber_100g",
+    "sodium_100g"
+]
+ProductUpsertSql = """
+INSERT INTO OpenFoodFactsProducts (Barcode, FoodName, SearchName, Payload, ImportedAt)
+VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+ON CONFLICT(Barcode) DO UPDATE SET
+  FoodName = excluded.FoodName,
+  SearchName = excluded.SearchName,
+  Payload = excluded.Payload,
+  ImportedAt = excluded.ImportedAt;
+"""
+
+# CSV exports carry very long ingredient/tag columns
+csv.field_size_limit(sys.maxsize)
+
+
+def _OpenText(FilePath: Path):
+    if FilePath.suffix == ".gz":
+        return gzip.open(FilePath, "rt", encoding="utf-8", newline="")
+    return FilePath.open("r", encoding="utf-8", newline="")
+
+
+def _IsCsvDump(FilePath: Path) -> bool:
+    Suffixes = [Suffix for Suffix in FilePath.suffixes if Suffix != ".gz"]
+    return bool(Suffixes) and Suffixes[-1] in (".csv", ".tsv")
+
+
+def _ProductFromCsvRow(Row: Dict[str, str]) -> Dict[str, Any]:
+    return {
+        "code": Row.get("code", ""),
+        "product_name": Row.get("product_name", ""),
+        "brands": Row.get("brands", ""),
+        "serving_size": Row.get("serving_size", ""),
+        "serving_quantity": Row.get("serving_quantity") or None,
+        "image_url": Row.get("image_url") or None,
+        "countries_tags": [Tag for Tag in (Row.get("countries_tags") or "").split(",") if Tag],
+        "nutriments": {Field: Row[Field] for Field in NutrimentFields if Row.get(Field)}
+    }
+
+
+def IterDumpProducts(FilePath: str | Path) -> Iterator[Dict[str, Any]]:
+    """Yield raw product dicts from a JSONL or CSV export without loading it into memory."""
+    DumpPath = Path(FilePath)
+    with _OpenText(DumpPath) as Handle:
+        if _IsCsvDump(DumpPath):
+            for Row in csv.DictReader(Handle, delimiter="\t"):
+                yield _ProductFromCsvRow(Row)
+            return
+        for Line in Handle:
+            Line = Line.strip()
+            if not Line:
+                continue
+            try:
+                Product = json.loads(Line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(Product, dict):
+                yield Product
+
+
+def IsAustralianProduct(Product: Dict[str, Any]) -> bool:
+    Tags = Product.get("countries_tags") or []
+    if isinstance(Tags, str):
+        Tags = Tags.split(",")
+    return CountryTag in Tags
+
+
+def NormalizeSearchName(Value: str) -> str:
+    return " ".join(Value.split()).lower()
+
+
+def _BuildProductRow(Product: Dict[str, Any]) -> Optional[list]:
+    Barcode = str(Product.get("code") or "").strip()
+    if not Barcode or not IsAustralianProduct(Product):
+        return None
+    Info = OpenFoodFactsService._ParseProduct(Product)
+    if Info is None:
+        return None
+    return [
+        Barcode,
+        Info.FoodName,
+        NormalizeSearchName(Info.FoodName),
+        Info.model_dump_json()
+    ]
+
+
+def _WriteBatch(Rows: List[list]) -> None:
+    with Transaction():
+        ExecuteMany(ProductUpsertSql, Rows)
+
+
+def ImportOpenFoodFactsDump(FilePath: str | Path, BatchSize: int = 1000) -> Dict[str, int]:
+    """Import Australian products from an export; returns read/imported/skipped counts."""
+    Counts = {"read": 0, "imported": 0, "skipped": 0}
+    Batch: List[list] = []
+    for Product in IterDumpProducts(FilePath):
+        Counts["read"] += 1
+        Row = _BuildProductRow(Product)
+        if Row is None:
+            Counts["skipped"] += 1
+            continue
+        Batch.append(Row)
+        if len(Batch) >= BatchSize:
+            _WriteBatch(Batch)
+            Counts["imported"] += len(Batch)
+            Batch = []
+    if Batch:
+        _WriteBatch(Batch)
+        Counts["imported"] += len(Batch)
+    Logger.info(
+        f"OpenFoodFacts import: {Counts['imported']} imported, "
+        f"{Counts['skipped']} skipped of {Counts['read']} read"
+    )
+    return Counts
+
+
+def GetLocalProductByBarcode(Barcode: str) -> Optional[FoodInfo]:
+    Row = FetchOne("SELECT Payload FROM OpenFoodFactsProducts WHERE Barcode = ?;", [Barcode])
+    if Row is None:
+        return None
+    return FoodInfo.model_validate_json(Row["Payload"])
+
+
+def SearchLocalProducts(Query: str, Limit: int = 10) -> List[FoodInfo]:
+    """Match products with a word starting with each word of the query, best ranked first."""
+    MatchQuery = BuildFtsPrefixQuery(Query)
+    if not MatchQuery:
+        return []
+    Rows = FetchAll(
+        """
+        SELECT OpenFoodFactsProducts.Payload AS Payload
+        FROM OpenFoodFactsProductsSearch
+        INNER JOIN OpenFoodFactsProducts ON OpenFoodFactsProducts.rowid = OpenFoodFactsProductsSearch.rowid
+        WHERE OpenFoodFactsProductsSearch MATCH ?
+        ORDER BY OpenFoodFactsProductsSearch.rank, LENGTH(OpenFoodFactsProducts.SearchName)
+        LIMIT ?;
+        """,
+        [MatchQuery, max(1, Limit)]
+    )
+    return [FoodInfo.model_validate_json(Row["Payload"]) for Row in Rows]
+
+
+def IsConfidentLocalMatch(Query: str, Product: FoodInfo) -> bool:
+    """True when every query word is a whole word of the product name, not just a prefix."""
+    QueryWords = set(re.findall(r"\w+", Query.lower()))
+    NameWords = set(re.findall(r"\w+", Product.FoodName.lower()))
+    return bool(QueryWords) and QueryWords <= NameWords
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        raise SystemExit("Usage: python -m app.services.openfoodfacts_index_service <export.jsonl|export.csv>[.gz]")
+    from app.utils.migrations import RunMigrations
+
+    RunMigrations()
+    print(json.dumps(ImportOpenFoodFactsDump(sys.argv[1])))
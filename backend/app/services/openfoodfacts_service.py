@@ -9,10 +9,13 @@ Rate limits enforced:
 - 10 req/min for search queries
 """
 
+import re
 import httpx
 from typing import Optional, List, Dict, Any
+from app.config import Settings
 from app.models.schemas import FoodInfo
 from app.services.rate_limiter import OpenFoodFactsRateLimiter
+from app.utils.http_client import BuildAsyncClient
 
 
 class OpenFoodFactsService:
@@ -26,6 +29,31 @@ class OpenFoodFactsService:
     # User agent as requested by OpenFoodFacts
     USER_AGENT = "PortionNote/1.0 (https://github.com/yourusername/portionnote)"
     
+    # Application-scoped client so warm lookups reuse pooled keep-alive connections
+    _Client: Optional[httpx.AsyncClient] = None
+    
+    @classmethod
+    def OpenClient(cls) -> httpx.AsyncClient:
+        """Return the shared client, creating it on first use."""
+        if cls._Client is None or cls._Client.is_closed:
+            cls._Client = BuildAsyncClient(
+                TimeoutSeconds=Settings.OpenFoodFactsTimeoutSeconds,
+                ConnectTimeoutSeconds=Settings.OpenFoodFactsConnectTimeoutSeconds,
+                MaxConnections=Settings.OpenFoodFactsMaxConnections,
+                MaxKeepaliveConnections=Settings.OpenFoodFactsMaxKeepaliveConnections,
+                KeepaliveExpirySeconds=Settings.OpenFoodFactsKeepaliveExpirySeconds,
+                EnableHttp2=Settings.OpenFoodFactsHttp2,
+                Headers={"User-Agent": cls.USER_AGENT}
+            )
+        return cls._Client
+    
+    @classmethod
+    async def CloseClient(cls) -> None:
+        """Close the shared client and drop its pooled connections."""
+        Client, cls._Client = cls._Client, None
+        if Client is not None:
+            await Client.aclose()
+    
     @classmethod
     async def SearchProducts(cls, Query: str, PageSize: int = 10) -> List[FoodInfo]:
         """
@@ -55,24 +83,19 @@ class OpenFoodFactsService:
             "fields": "code,product_name,brands,image_url,nutriments,serving_size,serving_quantity,countries_tags"
         }
         
-        Headers = {
-            "User-Agent": cls.USER_AGENT
-        }
+        Response = await cls.OpenClient().get(cls.SEARCH_URL, params=Params)
+        Response.raise_for_status()
+        Data = Response.json()
         
-        async with httpx.AsyncClient(timeout=10.0) as Client:
-            Response = await Client.get(cls.SEARCH_URL, params=Params, headers=Headers)
-            Response.raise_for_status()
-            Data = Response.json()
-            
-            Results = []
-            for Product in Data.get("products", []):
-                FoodInfoObj = cls._ParseProduct(Product)
-                if FoodInfoObj:
-                    Results.append(FoodInfoObj)
-                    if len(Results) >= PageSize:
-                        break
-            
-            return Results
+        Results = []
+        for Product in Data.get("products", []):
+            FoodInfoObj = cls._ParseProduct(Product)
+            if FoodInfoObj:
+                Results.append(FoodInfoObj)
+                if len(Results) >= PageSize:
+                    break
+        
+        return Results
     
     @classmethod
     async def GetProductByBarcode(cls, Barcode: str) -> Optional[FoodInfo]:
@@ -92,23 +115,28 @@ class OpenFoodFactsService:
         
         Url = f"{cls.PRODUCT_URL}/{Barcode}.json"
         
-        Headers = {
-            "User-Agent": cls.USER_AGENT
-        }
+        Response = await cls.OpenClient().get(Url)
         
-        async with httpx.AsyncClient(timeout=10.0) as Client:
-            Response = await Client.get(Url, headers=Headers)
-            
-            if Response.status_code == 404:
-                return None
-            
-            Response.raise_for_status()
-            Data = Response.json()
-            
-            if Data.get("status") != 1:
-                return None
-            
-            return cls._ParseProduct(Data.get("product", {}))
+        if Response.status_code == 404:
+            return None
+        
+        Response.raise_for_status()
+        Data = Response.json()
+        
+        if Data.get("status") != 1:
+            return None
+        
+        return cls._ParseProduct(Data.get("product", {}))
+    
+    @classmethod
+    def _ParseServingSize(cls, ServingSize: str) -> tuple[Optional[float], str]:
+        """Pull the gram or millilitre amount out of text like "2 slices (56 g)"."""
+        Match = re.search(r"(\d+(?:[.,]\d+)?)\s*(g|gr|grams?|ml)\b", ServingSize, re.IGNORECASE)
+        if not Match:
+            return None, "g"
+        Quantity = float(Match.group(1).replace(",", "."))
+        Unit = "mL" if Match.group(2).lower() == "ml" else "g"
+        return (Quantity or None), Unit
     
     @classmethod
     def _ParseProduct(cls, Product: Dict[str, Any]) -> Optional[FoodInfo]:
@@ -160,9 +188,12 @@ class OpenFoodFactsService:
         # Serving size info
         ServingSize = Product.get("serving_size", "")
         ServingQuantity = ToFloat(Product.get("serving_quantity"))  # in grams
+        ServingUnit = "g"
+        if not ServingQuantity and ServingSize:
+            ServingQuantity, ServingUnit = cls._ParseServingSize(ServingSize)
         
-        # Determine serving description
-        if ServingSize:
+        # Determine serving description; without a known quantity the values stay per 100g
+        if ServingQuantity and ServingSize:
             ServingDescription = ServingSize
         elif ServingQuantity:
             ServingDescription = f"{ServingQuantity}g"
@@ -199,6 +230,8 @@ class OpenFoodFactsService:
             "image_url": ImageUrl,
             "url": ProductUrl,
             "serving_size": ServingSize,
+            "serving_quantity": ServingQuantity or None,
+            "serving_unit": ServingUnit if ServingQuantity else None,
             "per_100g": {
                 "calories": CaloriesPer100g,
                 "protein": ProteinPer100g,
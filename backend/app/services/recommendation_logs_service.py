@@ -5,7 +5,7 @@ from typing import Optional
 
 from app.models.schemas import RecommendationLog
 from app.services.nutrition_recommendations_service import NutritionRecommendation
-from app.utils.database import GetConnection
+from app.utils.database import UseConnection
 
 
 def SaveRecommendationLog(
@@ -30,32 +30,32 @@ def SaveRecommendationLog(
     Returns:
         RecommendationLogId of the created log entry
     """
-    Connection = GetConnection()
-    Cursor = Connection.cursor()
-    
-    Cursor.execute("""
-        INSERT INTO RecommendationLogs (
+    with UseConnection() as Connection:
+        Cursor = Connection.cursor()
+
+        Cursor.execute("""
+            INSERT INTO RecommendationLogs (
+                UserId, Age, HeightCm, WeightKg, ActivityLevel,
+                DailyCalorieTarget, ProteinTargetMin, ProteinTargetMax,
+                FibreTarget, CarbsTarget, FatTarget, SaturatedFatTarget,
+                SugarTarget, SodiumTarget, Explanation
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
             UserId, Age, HeightCm, WeightKg, ActivityLevel,
-            DailyCalorieTarget, ProteinTargetMin, ProteinTargetMax,
-            FibreTarget, CarbsTarget, FatTarget, SaturatedFatTarget,
-            SugarTarget, SodiumTarget, Explanation
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        UserId, Age, HeightCm, WeightKg, ActivityLevel,
-        Recommendation.DailyCalorieTarget,
-        Recommendation.ProteinTargetMin,
-        Recommendation.ProteinTargetMax,
-        Recommendation.FibreTarget,
-        Recommendation.CarbsTarget,
-        Recommendation.FatTarget,
-        Recommendation.SaturatedFatTarget,
-        Recommendation.SugarTarget,
-        Recommendation.SodiumTarget,
-        Recommendation.Explanation
-    ))
-    
-    Connection.commit()
-    return Cursor.lastrowid
+            Recommendation.DailyCalorieTarget,
+            Recommendation.ProteinTargetMin,
+            Recommendation.ProteinTargetMax,
+            Recommendation.FibreTarget,
+            Recommendation.CarbsTarget,
+            Recommendation.FatTarget,
+            Recommendation.SaturatedFatTarget,
+            Recommendation.SugarTarget,
+            Recommendation.SodiumTarget,
+            Recommendation.Explanation
+        ))
+
+        Connection.commit()
+        return Cursor.lastrowid
 
 
 def GetRecommendationLogsByUser(UserId: str, Limit: int = 10) -> list[RecommendationLog]:
@@ -69,22 +69,22 @@ def GetRecommendationLogsByUser(UserId: str, Limit: int = 10) -> list[Recommenda
     Returns:
         List of RecommendationLog objects
     """
-    Connection = GetConnection()
-    Cursor = Connection.cursor()
-    
-    Cursor.execute("""
-        SELECT 
-            RecommendationLogId, UserId, CreatedAt, Age, HeightCm, WeightKg, ActivityLevel,
-            DailyCalorieTarget, ProteinTargetMin, ProteinTargetMax,
-            FibreTarget, CarbsTarget, FatTarget, SaturatedFatTarget,
-            SugarTarget, SodiumTarget, Explanation
-        FROM RecommendationLogs
-        WHERE UserId = ?
-        ORDER BY CreatedAt DESC
-        LIMIT ?
-    """, (UserId, Limit))
-    
-    Rows = Cursor.fetchall()
+    with UseConnection() as Connection:
+        Cursor = Connection.cursor()
+
+        Cursor.execute("""
+            SELECT 
+                RecommendationLogId, UserId, CreatedAt, Age, HeightCm, WeightKg, ActivityLevel,
+                DailyCalorieTarget, ProteinTargetMin, ProteinTargetMax,
+                FibreTarget, CarbsTarget, FatTarget, SaturatedFatTarget,
+                SugarTarget, SodiumTarget, Explanation
+            FROM RecommendationLogs
+            WHERE UserId = ?
+            ORDER BY CreatedAt DESC
+            LIMIT ?
+        """, (UserId, Limit))
+
+        Rows = Cursor.fetchall()
     return [BuildRecommendationLogFromRow(Row) for Row in Rows]
 
 
@@ -98,20 +98,20 @@ def GetRecommendationLogById(RecommendationLogId: int) -> Optional[Recommendatio
     Returns:
         RecommendationLog or None if not found
     """
-    Connection = GetConnection()
-    Cursor = Connection.cursor()
-    
-    Cursor.execute("""
-        SELECT 
-            RecommendationLogId, UserId, CreatedAt, Age, HeightCm, WeightKg, ActivityLevel,
-            DailyCalorieTarget, ProteinTargetMin, ProteinTargetMax,
-            FibreTarget, CarbsTarget, FatTarget, SaturatedFatTarget,
-            SugarTarget, SodiumTarget, Explanation
-        FROM RecommendationLogs
-        WHERE RecommendationLogId = ?
-    """, (RecommendationLogId,))
-    
-    Row = Cursor.fetchone()
+    with UseConnection() as Connection:
+        Cursor = Connection.cursor()
+
+        Cursor.execute("""
+            SELECT 
+                RecommendationLogId, UserId, CreatedAt, Age, HeightCm, WeightKg, ActivityLevel,
+                DailyCalorieTarget, ProteinTargetMin, ProteinTargetMax,
+                FibreTarget, CarbsTarget, FatTarget, SaturatedFatTarget,
+                SugarTarget, SodiumTarget, Explanation
+            FROM RecommendationLogs
+            WHERE RecommendationLogId = ?
+        """, (RecommendationLogId,))
+
+        Row = Cursor.fetchone()
     return BuildRecommendationLogFromRow(Row) if Row else None
 
 
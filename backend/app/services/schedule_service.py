@@ -2,7 +2,7 @@ import re
 import uuid
 
 from app.models.schemas import ScheduleSlot, ScheduleSlotInput
-from app.utils.database import ExecuteQuery, FetchAll
+from app.utils.database import ExecuteMany, ExecuteQuery, FetchAll, Transaction
 
 TimePattern = re.compile(r"^([01]\d|2[0-3]):([0-5]\d)$")
 
@@ -51,6 +51,8 @@ def UpdateScheduleSlots(UserId: str, Slots: list[ScheduleSlotInput]) -> list[Sch
     )
     ExistingIds = {Row["ScheduleSlotId"] for Row in ExistingRows}
     KeepIds: list[str] = []
+    UpdateRows: list[list] = []
+    InsertRows: list[list] = []
 
     for Slot in Slots:
         SlotTime = NormalizeSlotTime(Slot.SlotTime)
@@ -59,7 +61,30 @@ def UpdateScheduleSlots(UserId: str, Slots: list[ScheduleSlotInput]) -> list[Sch
             raise ValueError("Slot name required.")
         SortOrder = max(0, int(Slot.SortOrder))
         if Slot.ScheduleSlotId and Slot.ScheduleSlotId in ExistingIds:
-            ExecuteQuery(
+            UpdateRows.append([
+                SlotName,
+                SlotTime,
+                Slot.MealType,
+                SortOrder,
+                Slot.ScheduleSlotId,
+                UserId
+            ])
+            KeepIds.append(Slot.ScheduleSlotId)
+        else:
+            ScheduleSlotId = str(uuid.uuid4())
+            InsertRows.append([
+                ScheduleSlotId,
+                UserId,
+                SlotName,
+                SlotTime,
+                Slot.MealType,
+                SortOrder
+            ])
+            KeepIds.append(ScheduleSlotId)
+
+    with Transaction():
+        if UpdateRows:
+            ExecuteMany(
                 """
                 UPDATE ScheduleSlots
                 SET
@@ -69,19 +94,10 @@ def UpdateScheduleSlots(UserId: str, Slots: list[ScheduleSlotInput]) -> list[Sch
                     SortOrder = ?
                 WHERE ScheduleSlotId = ? AND UserId = ?;
                 """,
-                [
-                    SlotName,
-                    SlotTime,
-                    Slot.MealType,
-                    SortOrder,
-                    Slot.ScheduleSlotId,
-                    UserId
-                ]
+                UpdateRows
             )
-            KeepIds.append(Slot.ScheduleSlotId)
-        else:
-            ScheduleSlotId = str(uuid.uuid4())
-            ExecuteQuery(
+        if InsertRows:
+            ExecuteMany(
                 """
                 INSERT INTO ScheduleSlots (
                     ScheduleSlotId,
@@ -92,37 +108,29 @@ def UpdateScheduleSlots(UserId: str, Slots: list[ScheduleSlotInput]) -> list[Sch
                     SortOrder
                 ) VALUES (?, ?, ?, ?, ?, ?);
                 """,
-                [
-                    ScheduleSlotId,
-                    UserId,
-                    SlotName,
-                    SlotTime,
-                    Slot.MealType,
-                    SortOrder
-                ]
+                InsertRows
             )
-            KeepIds.append(ScheduleSlotId)
 
-    RemovedIds = [SlotId for SlotId in ExistingIds if SlotId not in KeepIds]
-    if RemovedIds:
-        Placeholder = ",".join(["?"] * len(RemovedIds))
-        ExecuteQuery(
-            f"""
-            UPDATE MealEntries
-            SET ScheduleSlotId = NULL
-            WHERE ScheduleSlotId IN ({Placeholder})
-                AND DailyLogId IN (
-                    SELECT DailyLogId FROM DailyLogs WHERE UserId = ?
-                );
-            """,
-            [*RemovedIds, UserId]
-        )
-        ExecuteQuery(
-            f"""
-            DELETE FROM ScheduleSlots
-            WHERE UserId = ? AND ScheduleSlotId IN ({Placeholder});
-            """,
-            [UserId, *RemovedIds]
-        )
+        RemovedIds = [SlotId for SlotId in ExistingIds if SlotId not in KeepIds]
+        if RemovedIds:
+            Placeholder = ",".join(["?"] * len(RemovedIds))
+            ExecuteQuery(
+                f"""
+                UPDATE MealEntries
+                SET ScheduleSlotId = NULL
+                WHERE ScheduleSlotId IN ({Placeholder})
+                    AND DailyLogId IN (
+                        SELECT DailyLogId FROM DailyLogs WHERE UserId = ?
+                    );
+                """,
+                [*RemovedIds, UserId]
+            )
+            ExecuteQuery(
+                f"""
+                DELETE FROM ScheduleSlots
+                WHERE UserId = ? AND ScheduleSlotId IN ({Placeholder});
+                """,
+                [UserId, *RemovedIds]
+            )
 
     return GetScheduleSlots(UserId)
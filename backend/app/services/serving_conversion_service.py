@@ -1,8 +1,9 @@
 import json
-from typing import Optional, Tuple
+from typing import Iterable, Optional, Tuple
 
 from app.config import Settings
-from app.services.openai_client import GetOpenAiContent
+from app.services.openai_client import GetOpenAiContentAsync
+from app.utils.database import ExecuteQuery, FetchOne, RunDatabaseCall
 
 
 _MASS_UNITS = {
@@ -171,6 +172,36 @@ def TryConvertEntryToServings(
     return None
 
 
+def GetLearnedConversionFactor(FoodId: str, FromUnit: str, ToUnit: str) -> Optional[float]:
+    """Return how many ToUnit make one FromUnit for this food, using either stored direction."""
+    Row = FetchOne(
+        """
+        SELECT FromUnit AS FromUnit, Factor AS Factor
+        FROM FoodUnitConversions
+        WHERE FoodId = ? AND ((FromUnit = ? AND ToUnit = ?) OR (FromUnit = ? AND ToUnit = ?))
+        LIMIT 1;
+        """,
+        [FoodId, FromUnit, ToUnit, ToUnit, FromUnit]
+    )
+    if Row is None or not Row["Factor"] or Row["Factor"] <= 0:
+        return None
+    if Row["FromUnit"] == FromUnit:
+        return float(Row["Factor"])
+    return 1 / float(Row["Factor"])
+
+
+def SaveLearnedConversionFactor(FoodId: str, FromUnit: str, ToUnit: str, Factor: float) -> None:
+    ExecuteQuery(
+        """
+        INSERT INTO FoodUnitConversions (FoodId, FromUnit, ToUnit, Factor)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (FoodId, FromUnit, ToUnit)
+        DO UPDATE SET Factor = excluded.Factor, CreatedAt = CURRENT_TIMESTAMP;
+        """,
+        [FoodId, FromUnit, ToUnit, Factor]
+    )
+
+
 def _ParseJsonContent(Content: str) -> dict:
     if not Content:
         raise ValueError("No AI response content.")
@@ -191,13 +222,14 @@ def _ParseJsonContent(Content: str) -> dict:
     return Parsed
 
 
-def ConvertEntryToServings(
+def _ConvertWithoutAi(
     FoodName: str,
     ServingQuantity: float,
     ServingUnit: str,
     EntryQuantity: float,
-    EntryUnit: str
-) -> tuple[float, Optional[str], str]:
+    EntryUnit: str,
+    FoodId: Optional[str]
+) -> Optional[tuple[float, Optional[str], str]]:
     Attempt = TryConvertEntryToServings(
         FoodName,
         ServingQuantity,
@@ -210,9 +242,58 @@ def ConvertEntryToServings(
         DetailValue = Detail if Detail else None
         return Servings, DetailValue, NormalizedEntryUnit
 
+    # Cross-kind conversions (eg grams of a food served by the cup) reuse the factor
+    # learned from the first AI answer for this food, so only that one call hits the network.
+    NormalizedEntryUnit = NormalizeUnit(EntryUnit)
+    NormalizedServingUnit = NormalizeUnit(ServingUnit)
+    EntryBase, FromUnit = ConvertToBase(EntryQuantity, NormalizedEntryUnit)
+    ServingBase, ToUnit = ConvertToBase(ServingQuantity, NormalizedServingUnit)
+    if not FoodId or ServingBase <= 0:
+        return None
+    Factor = GetLearnedConversionFactor(FoodId, FromUnit, ToUnit)
+    if Factor is None:
+        return None
+    Servings = EntryBase * Factor / ServingBase
+    Detail = (
+        f"Converted {_FormatNumber(EntryQuantity)} {NormalizedEntryUnit} using a saved conversion of "
+        f"{Factor:.4g} {ToUnit} per {FromUnit}. Serving size is "
+        f"{_FormatNumber(ServingQuantity)} {NormalizedServingUnit}. "
+        f"Logged {_FormatNumber(Servings)} servings."
+    )
+    return Servings, Detail, NormalizedEntryUnit
+
+
+def ConvertEntryToServings(
+    FoodName: str,
+    ServingQuantity: float,
+    ServingUnit: str,
+    EntryQuantity: float,
+    EntryUnit: str,
+    FoodId: Optional[str] = None
+) -> tuple[float, Optional[str], str]:
+    """Convert with unit tables and learned factors only; this never calls the AI."""
+    Result = _ConvertWithoutAi(FoodName, ServingQuantity, ServingUnit, EntryQuantity, EntryUnit, FoodId)
+    if Result is None:
+        raise ValueError("Unable to convert units for this food. Use the serving unit instead.")
+    return Result
+
+
+async def ConvertEntryToServingsAsync(
+    FoodName: str,
+    ServingQuantity: float,
+    ServingUnit: str,
+    EntryQuantity: float,
+    EntryUnit: str,
+    FoodId: Optional[str] = None
+) -> tuple[float, Optional[str], str]:
+    Result = await RunDatabaseCall(
+        _ConvertWithoutAi, FoodName, ServingQuantity, ServingUnit, EntryQuantity, EntryUnit, FoodId
+    )
+    if Result is not None:
+        return Result
+
     if not Settings.OpenAiApiKey:
         raise ValueError("Unable to convert units without AI enabled. Use the serving unit instead.")
-
     SystemPrompt = """
 You are a nutrition assistant. Convert a meal entry amount into number of servings.
 
@@ -234,7 +315,7 @@ Rules:
         f"Entry: {EntryQuantity} {EntryUnit}. Convert to servings."
     )
 
-    Content = GetOpenAiContent(
+    Content = await GetOpenAiContentAsync(
         [
             {"role": "system", "content": SystemPrompt},
             {"role": "user", "content": UserPrompt}
@@ -255,4 +336,55 @@ Rules:
     except (TypeError, ValueError) as ErrorValue:
         raise ValueError("Invalid AI conversion servings value.") from ErrorValue
 
-    return ServingsFloat, str(DetailValue).strip(), NormalizeUnit(EntryUnit)
+    NormalizedEntryUnit = NormalizeUnit(EntryUnit)
+    EntryBase, FromUnit = ConvertToBase(EntryQuantity, NormalizedEntryUnit)
+    ServingBase, ToUnit = ConvertToBase(ServingQuantity, NormalizeUnit(ServingUnit))
+    if FoodId and ServingsFloat > 0 and EntryBase > 0 and ServingBase > 0:
+        await RunDatabaseCall(
+            SaveLearnedConversionFactor, FoodId, FromUnit, ToUnit, ServingsFloat * ServingBase / EntryBase
+        )
+
+    return ServingsFloat, str(DetailValue).strip(), NormalizedEntryUnit
+
+
+def _GetFoodServing(FoodId: str) -> Optional[dict]:
+    return FetchOne(
+        """
+        SELECT
+            FoodId AS FoodId,
+            FoodName AS FoodName,
+            ServingQuantity AS ServingQuantity,
+            ServingUnit AS ServingUnit
+        FROM Foods
+        WHERE FoodId = ?;
+        """,
+        [FoodId]
+    )
+
+
+async def LearnUnitConversions(Entries: Iterable[tuple[Optional[str], Optional[float], Optional[str]]]) -> None:
+    """
+    Ask the AI for any cross-kind conversion the (FoodId, EntryQuantity, EntryUnit)
+    entries need and save the factor, so the services that later run on the DB
+    executor convert from the saved factor without a network call.
+    """
+    Seen: set[tuple[str, str]] = set()
+    for FoodId, EntryQuantity, EntryUnit in Entries:
+        if not FoodId or EntryQuantity is None or not EntryUnit:
+            continue
+        Key = (FoodId, NormalizeUnit(EntryUnit))
+        if Key in Seen:
+            continue
+        Seen.add(Key)
+        FoodRow = await RunDatabaseCall(_GetFoodServing, FoodId)
+        if FoodRow is None:
+            # The service reports the missing food.
+            continue
+        await ConvertEntryToServingsAsync(
+            FoodRow["FoodName"],
+            float(FoodRow["ServingQuantity"]) if FoodRow["ServingQuantity"] else 1.0,
+            FoodRow["ServingUnit"] or "serving",
+            EntryQuantity,
+            EntryUnit,
+            FoodId=FoodId
+        )
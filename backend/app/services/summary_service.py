@@ -1,81 +1,109 @@
-from app.models.schemas import DailySummary, MealEntryWithFood, WeeklySummary
-from app.services.calculations_service import BuildDailySummary, CalculateDailyTotals, CalculateWeeklySummary
+from datetime import date, timedelta
+
+from app.models.schemas import DailySummary, RangeSummary, SummaryBucket, SummaryBucketSize, WeeklySummary
+from app.services.calculations_service import BuildDailySummary, BuildDailyTotals, CalculateWeeklySummary
 from app.services.daily_logs_service import GetSettings
+from app.services.daily_totals_service import NutrientColumns
 from app.utils.database import FetchAll
 
+MaxRangeDays = 1096
 
-def GetWeeklySummary(UserId: str, StartDate: str) -> WeeklySummary:
-    Logs = FetchAll(
-        """
-        SELECT
-            DailyLogId AS DailyLogId,
-            LogDate AS LogDate,
-            Steps AS Steps,
-            StepKcalFactorOverride AS StepKcalFactorOverride,
-            Notes AS Notes
-        FROM DailyLogs
-        WHERE LogDate BETWEEN ? AND date(?, '+6 days')
-            AND UserId = ?
-        ORDER BY LogDate ASC;
-        """,
-        [StartDate, StartDate, UserId]
-    )
 
-    Entries = FetchAll(
-        """
+def GetDailySummaries(UserId: str, StartDate: str, EndDate: str) -> list[DailySummary]:
+    NutrientSelect = ",\n            ".join(
+        f"COALESCE(DailyTotals.{Name}, 0) AS {Name}" for Name, _FoodColumn in NutrientColumns
+    )
+    Rows = FetchAll(
+        f"""
         SELECT
-            MealEntries.MealEntryId AS MealEntryId,
-            MealEntries.DailyLogId AS DailyLogId,
-            MealEntries.MealType AS MealType,
-            MealEntries.FoodId AS FoodId,
-            MealEntries.Quantity AS Quantity,
-            MealEntries.EntryNotes AS EntryNotes,
-            MealEntries.SortOrder AS SortOrder,
-            Foods.FoodName AS FoodName,
-            Foods.ServingDescription AS ServingDescription,
-            Foods.CaloriesPerServing AS CaloriesPerServing,
-            Foods.ProteinPerServing AS ProteinPerServing
-        FROM MealEntries
-        INNER JOIN Foods ON Foods.FoodId = MealEntries.FoodId
-        INNER JOIN DailyLogs ON DailyLogs.DailyLogId = MealEntries.DailyLogId
-        WHERE DailyLogs.LogDate BETWEEN ? AND date(?, '+6 days')
+            DailyLogs.LogDate AS LogDate,
+            DailyLogs.Steps AS Steps,
+            DailyLogs.StepKcalFactorOverride AS StepKcalFactorOverride,
+            {NutrientSelect}
+        FROM DailyLogs
+        LEFT JOIN DailyTotals ON DailyTotals.DailyLogId = DailyLogs.DailyLogId
+        WHERE DailyLogs.LogDate BETWEEN ? AND ?
             AND DailyLogs.UserId = ?
-            AND Foods.UserId = DailyLogs.UserId
-        ORDER BY DailyLogs.LogDate ASC, MealEntries.MealType, MealEntries.SortOrder;
+        ORDER BY DailyLogs.LogDate ASC;
         """,
-        [StartDate, StartDate, UserId]
+        [StartDate, EndDate, UserId]
     )
 
-    EntriesByLogId: dict[str, list[MealEntryWithFood]] = {}
-    for Row in Entries:
-        Entry = MealEntryWithFood(
-            MealEntryId=Row["MealEntryId"],
-            DailyLogId=Row["DailyLogId"],
-            MealType=Row["MealType"],
-            FoodId=Row["FoodId"],
-            FoodName=Row["FoodName"],
-            ServingDescription=Row["ServingDescription"],
-            CaloriesPerServing=int(Row["CaloriesPerServing"]),
-            ProteinPerServing=float(Row["ProteinPerServing"]),
-            Quantity=float(Row["Quantity"]),
-            EntryNotes=Row["EntryNotes"],
-            SortOrder=int(Row["SortOrder"])
-        )
-        EntriesByLogId.setdefault(Entry.DailyLogId, []).append(Entry)
-
     Settings = GetSettings(UserId)
     Summaries: list[DailySummary] = []
 
-    for Log in Logs:
-        EntriesForLog = EntriesByLogId.get(Log["DailyLogId"], [])
-        StepFactor = Log["StepKcalFactorOverride"]
+    for Row in Rows:
+        StepFactor = Row["StepKcalFactorOverride"]
         StepFactor = float(StepFactor) if StepFactor is not None else Settings.StepKcalFactor
-        Totals = CalculateDailyTotals(
-            EntriesForLog,
-            int(Log["Steps"]),
-            StepFactor,
-            Settings
+        Nutrients = {Name: float(Row[Name]) for Name, _FoodColumn in NutrientColumns}
+        Totals = BuildDailyTotals(Nutrients, int(Row["Steps"]), StepFactor, Settings)
+        Summaries.append(BuildDailySummary(Row["LogDate"], int(Row["Steps"]), Totals))
+
+    return Summaries
+
+
+def GetWeeklySummary(UserId: str, StartDate: str) -> WeeklySummary:
+    try:
+        Start = date.fromisoformat(StartDate)
+    except ValueError as ErrorValue:
+        raise ValueError("Dates must be in YYYY-MM-DD format.") from ErrorValue
+    EndDate = (Start + timedelta(days=6)).isoformat()
+    return CalculateWeeklySummary(GetDailySummaries(UserId, Start.isoformat(), EndDate))
+
+
+def _GetBucketStart(Day: date, Bucket: SummaryBucketSize) -> date:
+    if Bucket == SummaryBucketSize.Week:
+        return Day - timedelta(days=Day.weekday())
+    if Bucket == SummaryBucketSize.Month:
+        return Day.replace(day=1)
+    return Day
+
+
+def _GetNextBucketStart(BucketStart: date, Bucket: SummaryBucketSize) -> date:
+    if Bucket == SummaryBucketSize.Week:
+        return BucketStart + timedelta(days=7)
+    if Bucket == SummaryBucketSize.Month:
+        return (BucketStart.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return BucketStart + timedelta(days=1)
+
+
+def GetRangeSummary(UserId: str, StartDate: str, EndDate: str, Bucket: SummaryBucketSize) -> RangeSummary:
+    try:
+        Start = date.fromisoformat(StartDate)
+        End = date.fromisoformat(EndDate)
+    except ValueError as ErrorValue:
+        raise ValueError("Dates must be in YYYY-MM-DD format.") from ErrorValue
+
+    if End < Start:
+        raise ValueError("End date must not be before start date.")
+    if (End - Start).days + 1 > MaxRangeDays:
+        raise ValueError(f"Range cannot exceed {MaxRangeDays} days.")
+
+    DaysByBucket: dict[date, list[DailySummary]] = {}
+    for Day in GetDailySummaries(UserId, Start.isoformat(), End.isoformat()):
+        BucketStart = _GetBucketStart(date.fromisoformat(Day.LogDate), Bucket)
+        DaysByBucket.setdefault(BucketStart, []).append(Day)
+
+    Buckets: list[SummaryBucket] = []
+    BucketStart = _GetBucketStart(Start, Bucket)
+    while BucketStart <= End:
+        NextBucketStart = _GetNextBucketStart(BucketStart, Bucket)
+        Days = DaysByBucket.get(BucketStart, [])
+        Summary = CalculateWeeklySummary(Days)
+        Buckets.append(
+            SummaryBucket(
+                BucketStart=max(BucketStart, Start).isoformat(),
+                BucketEnd=min(NextBucketStart - timedelta(days=1), End).isoformat(),
+                DayCount=len(Days),
+                Totals=Summary.Totals,
+                Averages=Summary.Averages
+            )
         )
-        Summaries.append(BuildDailySummary(Log["LogDate"], int(Log["Steps"]), Totals))
+        BucketStart = NextBucketStart
 
-    return CalculateWeeklySummary(Summaries)
+    return RangeSummary(
+        StartDate=Start.isoformat(),
+        EndDate=End.isoformat(),
+        Bucket=Bucket,
+        Buckets=Buckets
+    )
@@ -1,49 +1,340 @@
+import asyncio
+import re
 import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 from pathlib import Path
-from typing import Any, Iterable
+from time import monotonic
+from typing import Any, Callable, ContextManager, Iterable, Iterator, TypeVar
 
 from app.config import Settings
 
-DatabaseConnection: sqlite3.Connection | None = None
+ResultType = TypeVar("ResultType")
+JournalModes = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SynchronousModes = {"OFF", "NORMAL", "FULL", "EXTRA"}
+TempStoreModes = {"DEFAULT", "FILE", "MEMORY"}
+PragmaNames = ["journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store", "busy_timeout", "foreign_keys"]
 
 
-def GetConnection() -> sqlite3.Connection:
-    global DatabaseConnection
-    if DatabaseConnection is None:
-        DatabasePath = Path(Settings.DatabaseFile).expanduser().resolve()
-        DatabasePath.parent.mkdir(parents=True, exist_ok=True)
-        DatabaseConnection = sqlite3.connect(
-            DatabasePath,
+def _ResolveChoice(Value: str, Allowed: set[str], Name: str) -> str:
+    CleanValue = (Value or "").strip().upper()
+    if CleanValue not in Allowed:
+        raise ValueError(f"Unsupported {Name} value: {Value}")
+    return CleanValue
+
+
+def BuildPragmaStatements() -> list[str]:
+    return [
+        f"PRAGMA journal_mode = {_ResolveChoice(Settings.DatabaseJournalMode, JournalModes, 'journal_mode')};",
+        f"PRAGMA synchronous = {_ResolveChoice(Settings.DatabaseSynchronous, SynchronousModes, 'synchronous')};",
+        f"PRAGMA cache_size = {int(Settings.DatabaseCacheSize)};",
+        f"PRAGMA mmap_size = {max(0, int(Settings.DatabaseMmapSize))};",
+        f"PRAGMA temp_store = {_ResolveChoice(Settings.DatabaseTempStore, TempStoreModes, 'temp_store')};",
+        f"PRAGMA busy_timeout = {max(0, int(Settings.DatabaseBusyTimeoutMs))};",
+        "PRAGMA foreign_keys = ON;"
+    ]
+
+
+class ConnectionPool:
+    """Bounded pool of SQLite connections, each leased to one thread at a time."""
+
+    def __init__(
+        self,
+        DatabaseFile: str,
+        MaxConnections: int,
+        AcquireTimeout: float,
+        HealthCheckSeconds: float
+    ):
+        self.DatabasePath = Path(DatabaseFile).expanduser().resolve()
+        self.MaxConnections = max(1, MaxConnections)
+        self.AcquireTimeout = AcquireTimeout
+        self.HealthCheckSeconds = HealthCheckSeconds
+        self._Local = threading.local()
+        self._Condition = threading.Condition()
+        self._Idle: list[sqlite3.Connection] = []
+        self._OpenCount = 0
+        self._LastChecked: dict[int, float] = {}
+        self._Closed = False
+
+    def _Open(self) -> sqlite3.Connection:
+        self.DatabasePath.parent.mkdir(parents=True, exist_ok=True)
+        Connection = sqlite3.connect(
+            self.DatabasePath,
             check_same_thread=False
         )
-        DatabaseConnection.row_factory = sqlite3.Row
-        DatabaseConnection.execute("PRAGMA foreign_keys = ON;")
-    return DatabaseConnection
+        try:
+            Connection.row_factory = sqlite3.Row
+            for Statement in BuildPragmaStatements():
+                Connection.execute(Statement)
+        except Exception:
+            Connection.close()
+            raise
+        self._LastChecked[id(Connection)] = monotonic()
+        return Connection
+
+    def _IsHealthy(self, Connection: sqlite3.Connection) -> bool:
+        Now = monotonic()
+        if Now - self._LastChecked.get(id(Connection), 0.0) < self.HealthCheckSeconds:
+            return True
+        try:
+            Connection.execute("SELECT 1;").fetchone()
+        except sqlite3.Error:
+            return False
+        self._LastChecked[id(Connection)] = Now
+        return True
+
+    def _Discard(self, Connection: sqlite3.Connection) -> None:
+        self._LastChecked.pop(id(Connection), None)
+        try:
+            Connection.close()
+        except sqlite3.Error:
+            pass
+        with self._Condition:
+            self._OpenCount -= 1
+            self._Condition.notify()
+
+    def _Checkout(self) -> sqlite3.Connection:
+        Deadline = monotonic() + self.AcquireTimeout
+        while True:
+            with self._Condition:
+                while True:
+                    if self._Closed:
+                        raise sqlite3.ProgrammingError("Connection pool is closed.")
+                    if self._Idle:
+                        Connection: sqlite3.Connection | None = self._Idle.pop()
+                        break
+                    if self._OpenCount < self.MaxConnections:
+                        self._OpenCount += 1
+                        Connection = None
+                        break
+                    Remaining = Deadline - monotonic()
+                    if Remaining <= 0:
+                        raise sqlite3.OperationalError(
+                            f"Timed out waiting for a database connection ({self.MaxConnections} in use)."
+                        )
+                    self._Condition.wait(Remaining)
+
+            if Connection is None:
+                try:
+                    return self._Open()
+                except Exception:
+                    with self._Condition:
+                        self._OpenCount -= 1
+                        self._Condition.notify()
+                    raise
+
+            if self._IsHealthy(Connection):
+                return Connection
+            self._Discard(Connection)
+
+    def _Checkin(self, Connection: sqlite3.Connection) -> None:
+        try:
+            if Connection.in_transaction:
+                Connection.rollback()
+        except sqlite3.Error:
+            self._Discard(Connection)
+            return
+
+        with self._Condition:
+            if not self._Closed:
+                self._Idle.append(Connection)
+                self._Condition.notify()
+                return
+        self._Discard(Connection)
+
+    @contextmanager
+    def Lease(self) -> Iterator[sqlite3.Connection]:
+        Current: sqlite3.Connection | None = getattr(self._Local, "Connection", None)
+        if Current is not None:
+            yield Current
+            return
+
+        Connection = self._Checkout()
+        self._Local.Connection = Connection
+        try:
+            yield Connection
+        finally:
+            self._Local.Connection = None
+            self._Checkin(Connection)
+
+    def GetStats(self) -> dict[str, Any]:
+        with self._Condition:
+            return {
+                "max_connections": self.MaxConnections,
+                "open_connections": self._OpenCount,
+                "idle_connections": len(self._Idle),
+                "in_use": self._OpenCount - len(self._Idle)
+            }
+
+    def Close(self) -> None:
+        with self._Condition:
+            self._Closed = True
+            IdleConnections = self._Idle
+            self._Idle = []
+            self._Condition.notify_all()
+        for Connection in IdleConnections:
+            self._Discard(Connection)
+
+
+Pool: ConnectionPool | None = None
+PoolLock = threading.Lock()
+TransactionState = threading.local()
+DatabaseExecutor: ThreadPoolExecutor | None = None
+
+
+def GetPool() -> ConnectionPool:
+    global Pool
+    if Pool is None:
+        with PoolLock:
+            if Pool is None:
+                Pool = ConnectionPool(
+                    Settings.DatabaseFile,
+                    Settings.DatabasePoolSize,
+                    Settings.DatabasePoolTimeout,
+                    Settings.DatabaseHealthCheckSeconds
+                )
+    return Pool
+
+
+def GetDatabaseExecutor() -> ThreadPoolExecutor:
+    global DatabaseExecutor
+    if DatabaseExecutor is None:
+        with PoolLock:
+            if DatabaseExecutor is None:
+                DatabaseExecutor = ThreadPoolExecutor(
+                    max_workers=max(1, Settings.DatabasePoolSize),
+                    thread_name_prefix="portionnote-db"
+                )
+    return DatabaseExecutor
+
+
+def ClosePool() -> None:
+    global DatabaseExecutor, Pool
+    with PoolLock:
+        Executor, DatabaseExecutor = DatabaseExecutor, None
+        ClosingPool, Pool = Pool, None
+    if Executor is not None:
+        Executor.shutdown(wait=True)
+    if ClosingPool is not None:
+        ClosingPool.Close()
+
+
+def UseConnection() -> ContextManager[sqlite3.Connection]:
+    return GetPool().Lease()
+
+
+def InTransaction() -> bool:
+    return getattr(TransactionState, "Depth", 0) > 0
+
+
+@contextmanager
+def Transaction() -> Iterator[sqlite3.Connection]:
+    """Group statements into one commit; nested blocks become savepoints."""
+    with UseConnection() as Connection:
+        Depth = getattr(TransactionState, "Depth", 0)
+        SavepointName = f"Savepoint{Depth}"
+        if Depth == 0:
+            Connection.execute("BEGIN IMMEDIATE;")
+        else:
+            Connection.execute(f"SAVEPOINT {SavepointName};")
+        TransactionState.Depth = Depth + 1
+        try:
+            yield Connection
+        except BaseException:
+            if Depth == 0:
+                Connection.rollback()
+            else:
+                Connection.execute(f"ROLLBACK TO SAVEPOINT {SavepointName};")
+                Connection.execute(f"RELEASE SAVEPOINT {SavepointName};")
+            raise
+        else:
+            if Depth == 0:
+                Connection.commit()
+            else:
+                Connection.execute(f"RELEASE SAVEPOINT {SavepointName};")
+        finally:
+            TransactionState.Depth = Depth
+
+
+def BuildFtsPrefixQuery(Query: str) -> str:
+    """Turn free text into an FTS5 prefix query, one quoted term per word."""
+    Terms = re.findall(r"\w+", Query.lower())
+    return " ".join(f'"{Term}"*' for Term in Terms)
+
+
+def GetPragmaProfile() -> dict[str, Any]:
+    Profile: dict[str, Any] = {}
+    with UseConnection() as Connection:
+        for Name in PragmaNames:
+            Row = Connection.execute(f"PRAGMA {Name};").fetchone()
+            Profile[Name] = Row[0] if Row is not None else None
+    return Profile
 
 
 def ExecuteScript(SqlText: str) -> None:
-    Connection = GetConnection()
-    Connection.executescript(SqlText)
-    Connection.commit()
+    if InTransaction():
+        # executescript() commits any pending transaction before it runs.
+        raise sqlite3.ProgrammingError("ExecuteScript cannot run inside a Transaction().")
+    with UseConnection() as Connection:
+        Connection.executescript(SqlText)
+        Connection.commit()
+
+
+def ExecuteQuery(SqlText: str, Parameters: Iterable[Any] | None = None) -> int | None:
+    with UseConnection() as Connection:
+        Cursor = Connection.execute(SqlText, Parameters or [])
+        if not InTransaction():
+            Connection.commit()
+        return Cursor.lastrowid
 
 
-def ExecuteQuery(SqlText: str, Parameters: Iterable[Any] | None = None) -> None:
-    Connection = GetConnection()
-    Connection.execute(SqlText, Parameters or [])
-    Connection.commit()
+def ExecuteMany(SqlText: str, RowIterable: Iterable[Iterable[Any]]) -> int:
+    with UseConnection() as Connection:
+        Cursor = Connection.executemany(SqlText, RowIterable)
+        if not InTransaction():
+            Connection.commit()
+        return Cursor.rowcount
 
 
 def FetchAll(SqlText: str, Parameters: Iterable[Any] | None = None) -> list[dict[str, Any]]:
-    Connection = GetConnection()
-    Cursor = Connection.execute(SqlText, Parameters or [])
-    Rows = Cursor.fetchall()
+    with UseConnection() as Connection:
+        Cursor = Connection.execute(SqlText, Parameters or [])
+        Rows = Cursor.fetchall()
     return [dict(Row) for Row in Rows]
 
 
 def FetchOne(SqlText: str, Parameters: Iterable[Any] | None = None) -> dict[str, Any] | None:
-    Connection = GetConnection()
-    Cursor = Connection.execute(SqlText, Parameters or [])
-    Row = Cursor.fetchone()
+    with UseConnection() as Connection:
+        Cursor = Connection.execute(SqlText, Parameters or [])
+        Row = Cursor.fetchone()
     if Row is None:
         return None
     return dict(Row)
+
+
+async def RunDatabaseCall(Function: Callable[..., ResultType], *Args: Any, **Kwargs: Any) -> ResultType:
+    """Run a blocking database call on the dedicated DB executor instead of the event loop."""
+    Loop = asyncio.get_running_loop()
+    return await Loop.run_in_executor(GetDatabaseExecutor(), partial(Function, *Args, **Kwargs))
+
+
+async def ExecuteScriptAsync(SqlText: str) -> None:
+    await RunDatabaseCall(ExecuteScript, SqlText)
+
+
+async def ExecuteQueryAsync(SqlText: str, Parameters: Iterable[Any] | None = None) -> int | None:
+    return await RunDatabaseCall(ExecuteQuery, SqlText, Parameters)
+
+
+async def ExecuteManyAsync(SqlText: str, RowIterable: Iterable[Iterable[Any]]) -> int:
+    return await RunDatabaseCall(ExecuteMany, SqlText, RowIterable)
+
+
+async def FetchAllAsync(SqlText: str, Parameters: Iterable[Any] | None = None) -> list[dict[str, Any]]:
+    return await RunDatabaseCall(FetchAll, SqlText, Parameters)
+
+
+async def FetchOneAsync(SqlText: str, Parameters: Iterable[Any] | None = None) -> dict[str, Any] | None:
+    return await RunDatabaseCall(FetchOne, SqlText, Parameters)
@@ -0,0 +1,40 @@
+import importlib.util
+from typing import Any
+
+import httpx
+
+from app.utils.logger import GetLogger
+
+Logger = GetLogger("http_client")
+
+
+def IsHttp2Available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def BuildAsyncClient(
+    TimeoutSeconds: float,
+    ConnectTimeoutSeconds: float,
+    MaxConnections: int,
+    MaxKeepaliveConnections: int,
+    KeepaliveExpirySeconds: float,
+    EnableHttp2: bool,
+    Headers: dict[str, str] | None = None,
+    **ClientOptions: Any
+) -> httpx.AsyncClient:
+    """Build a long-lived AsyncClient with keep-alive pooling; HTTP/2 only when h2 is installed."""
+    UseHttp2 = EnableHttp2 and IsHttp2Available()
+    if EnableHttp2 and not UseHttp2:
+        Logger.info("HTTP/2 requested but the h2 package is not installed; using HTTP/1.1.")
+
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(TimeoutSeconds, connect=ConnectTimeoutSeconds),
+        limits=httpx.Limits(
+            max_connections=max(1, MaxConnections),
+            max_keepalive_connections=max(0, MaxKeepaliveConnections),
+            keepalive_expiry=KeepaliveExpirySeconds
+        ),
+        http2=UseHttp2,
+        headers=Headers,
+        **ClientOptions
+    )
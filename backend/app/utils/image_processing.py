@@ -0,0 +1,126 @@
+"""
+CPU-bound image helpers for the food image lookup.
+
+These run inside the image process pool, so this module only imports the
+standard library and, lazily, the optional Pillow package.
+"""
+
+import hashlib
+import importlib.util
+import io
+from typing import Any, BinaryIO, Optional
+
+# Upload formats the vision API accepts as-is, by leading bytes
+_HashChunkBytes = 64 * 1024
+_VisionMimeTypes = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF8", "image/gif")
+)
+
+
+def IsPillowAvailable() -> bool:
+    return importlib.util.find_spec("PIL") is not None
+
+
+def GetVisionMimeType(ImageBytes: bytes) -> Optional[str]:
+    """Return the MIME type of a JPEG, PNG, GIF or WebP image, else None."""
+    for Signature, MimeType in _VisionMimeTypes:
+        if ImageBytes.startswith(Signature):
+            return MimeType
+    if ImageBytes[:4] == b"RIFF" and ImageBytes[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def _DifferenceHash(Picture: Any) -> str:
+    """64-bit difference hash: compare neighbouring pixels of a 9x8 greyscale thumbnail."""
+    from PIL import Image
+
+    Pixels = list(Picture.convert("L").resize((9, 8), Image.Resampling.BILINEAR).getdata())
+    Bits = 0
+    for RowStart in range(0, 72, 9):
+        for Column in range(8):
+            Bits = (Bits << 1) | (1 if Pixels[RowStart + Column] > Pixels[RowStart + Column + 1] else 0)
+    return f"{Bits:016x}"
+
+
+def ComputePerceptualHash(ImageBytes: bytes | BinaryIO) -> Optional[str]:
+    """Return a 64-bit difference hash as hex, or None without Pillow or for undecodable bytes."""
+    if not IsPillowAvailable():
+        return None
+    from PIL import Image
+
+    Stream = io.BytesIO(ImageBytes) if isinstance(ImageBytes, bytes) else ImageBytes
+    try:
+        Stream.seek(0)
+        with Image.open(Stream) as Picture:
+            # Lets the JPEG decoder skip straight to a small scale.
+            Picture.draft("L", (64, 64))
+            return _DifferenceHash(Picture)
+    except Exception:
+        return None
+
+
+def _HashStream(Stream: BinaryIO) -> tuple[str, int, bytes]:
+    """Return (Sha256, ByteSize, LeadingBytes) of a stream, read in chunks from the start."""
+    Digest = hashlib.sha256()
+    Stream.seek(0)
+    Leading = Stream.read(_HashChunkBytes)
+    Size = 0
+    Chunk = Leading
+    while Chunk:
+        Digest.update(Chunk)
+        Size += len(Chunk)
+        Chunk = Stream.read(_HashChunkBytes)
+    return Digest.hexdigest(), Size, Leading
+
+
+def PrepareImageBytes(ImageBytes: bytes, MaxEdge: int, Quality: int) -> tuple[str, Optional[bytes], Optional[str]]:
+    return PrepareImageStream(io.BytesIO(ImageBytes), MaxEdge, Quality)
+
+
+def PrepareImageStream(Stream: BinaryIO, MaxEdge: int, Quality: int) -> tuple[str, Optional[bytes], Optional[str]]:
+    """
+    Fingerprint an uploaded image and shrink it for the vision call.
+
+    Stream is read in chunks and decoded in place, so a spooled upload is never
+    copied into memory whole.
+
+    Returns (ContentHash, PreparedJpeg, PerceptualHash). PreparedJpeg is the image
+    rotated upright, scaled to fit MaxEdge and re-encoded without metadata; it is
+    None when MaxEdge is 0, Pillow is missing or the bytes are not an image, and
+    when the upload has no EXIF data, fits MaxEdge, is in a format the vision API
+    reads and is no larger than the re-encoded copy.
+    """
+    ContentHash, ByteSize, Leading = _HashStream(Stream)
+    if MaxEdge <= 0:
+        return ContentHash, None, ComputePerceptualHash(Stream)
+    if not IsPillowAvailable():
+        return ContentHash, None, None
+    from PIL import Image, ImageOps
+
+    try:
+        Stream.seek(0)
+        with Image.open(Stream) as Picture:
+            OriginalSize = Picture.size
+            HasExif = len(Picture.getexif()) > 0
+            Picture.draft("RGB", (MaxEdge, MaxEdge))
+            # Apply the EXIF orientation before the metadata is dropped.
+            Upright = ImageOps.exif_transpose(Picture).convert("RGB")
+    except Exception:
+        return ContentHash, None, None
+
+    PerceptualHash = _DifferenceHash(Upright)
+    Upright.thumbnail((MaxEdge, MaxEdge), Image.Resampling.LANCZOS)
+    Buffer = io.BytesIO()
+    Upright.save(Buffer, format="JPEG", quality=max(1, min(95, Quality)), optimize=True)
+    Prepared = Buffer.getvalue()
+    if (
+        ByteSize <= len(Prepared)
+        and max(OriginalSize) <= MaxEdge
+        and not HasExif
+        and GetVisionMimeType(Leading) is not None
+    ):
+        return ContentHash, None, PerceptualHash
+    return ContentHash, Prepared, PerceptualHash
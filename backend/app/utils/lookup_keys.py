@@ -0,0 +1,3 @@
+def NormalizeLookupKey(Value: str) -> str:
+    """Collapse case and whitespace so equivalent lookups share cache and in-flight keys."""
+    return " ".join(Value.split()).lower()
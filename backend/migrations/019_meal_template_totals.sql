@@ -0,0 +1,32 @@
+-- Materialized nutrient totals per meal template, kept in sync by the template and food services
+CREATE TABLE IF NOT EXISTS MealTemplateTotals (
+  MealTemplateId text PRIMARY KEY,
+  Calories real NOT NULL DEFAULT 0,
+  Protein real NOT NULL DEFAULT 0,
+  Fibre real NOT NULL DEFAULT 0,
+  Carbs real NOT NULL DEFAULT 0,
+  Fat real NOT NULL DEFAULT 0,
+  SaturatedFat real NOT NULL DEFAULT 0,
+  Sugar real NOT NULL DEFAULT 0,
+  Sodium real NOT NULL DEFAULT 0,
+  UpdatedAt text NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  FOREIGN KEY (MealTemplateId) REFERENCES MealTemplates(MealTemplateId) ON DELETE CASCADE
+);
+
+INSERT OR REPLACE INTO MealTemplateTotals (
+  MealTemplateId, Calories, Protein, Fibre, Carbs, Fat, SaturatedFat, Sugar, Sodium
+)
+SELECT
+  MealTemplates.MealTemplateId,
+  COALESCE(SUM(Foods.CaloriesPerServing * MealTemplateItems.Quantity), 0),
+  COALESCE(SUM(Foods.ProteinPerServing * MealTemplateItems.Quantity), 0),
+  COALESCE(SUM(COALESCE(Foods.FibrePerServing, 0) * MealTemplateItems.Quantity), 0),
+  COALESCE(SUM(COALESCE(Foods.CarbsPerServing, 0) * MealTemplateItems.Quantity), 0),
+  COALESCE(SUM(COALESCE(Foods.FatPerServing, 0) * MealTemplateItems.Quantity), 0),
+  COALESCE(SUM(COALESCE(Foods.SaturatedFatPerServing, 0) * MealTemplateItems.Quantity), 0),
+  COALESCE(SUM(COALESCE(Foods.SugarPerServing, 0) * MealTemplateItems.Quantity), 0),
+  COALESCE(SUM(COALESCE(Foods.SodiumPerServing, 0) * MealTemplateItems.Quantity), 0)
+FROM MealTemplates
+LEFT JOIN MealTemplateItems ON MealTemplateItems.MealTemplateId = MealTemplates.MealTemplateId
+LEFT JOIN Foods ON Foods.FoodId = MealTemplateItems.FoodId
+GROUP BY MealTemplates.MealTemplateId;
@@ -0,0 +1,46 @@
+-- Per-day nutrient rollup, refreshed whenever entries, logs, foods or templates change
+CREATE TABLE IF NOT EXISTS DailyTotals (
+  UserId text NOT NULL,
+  LogDate text NOT NULL,
+  DailyLogId text NOT NULL,
+  Calories real NOT NULL DEFAULT 0,
+  Protein real NOT NULL DEFAULT 0,
+  Fibre real NOT NULL DEFAULT 0,
+  Carbs real NOT NULL DEFAULT 0,
+  Fat real NOT NULL DEFAULT 0,
+  SaturatedFat real NOT NULL DEFAULT 0,
+  Sugar real NOT NULL DEFAULT 0,
+  Sodium real NOT NULL DEFAULT 0,
+  EntryCount integer NOT NULL DEFAULT 0,
+  UpdatedAt text NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (UserId, LogDate),
+  FOREIGN KEY (DailyLogId) REFERENCES DailyLogs(DailyLogId) ON DELETE CASCADE
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS DailyTotals_DailyLogId_Ux ON DailyTotals (DailyLogId);
+
+-- Food edits refresh every day and template that uses the food
+CREATE INDEX IF NOT EXISTS MealEntries_FoodId_Idx ON MealEntries (FoodId);
+CREATE INDEX IF NOT EXISTS MealTemplateItems_FoodId_Idx ON MealTemplateItems (FoodId);
+
+INSERT OR REPLACE INTO DailyTotals (
+  UserId, LogDate, DailyLogId, Calories, Protein, Fibre, Carbs, Fat, SaturatedFat, Sugar, Sodium, EntryCount
+)
+SELECT
+  DailyLogs.UserId,
+  DailyLogs.LogDate,
+  DailyLogs.DailyLogId,
+  COALESCE(SUM(CASE WHEN MealEntries.MealTemplateId IS NOT NULL THEN COALESCE(MealTemplateTotals.Calories, 0) ELSE COALESCE(Foods.CaloriesPerServing, 0) * MealEntries.Quantity END), 0),
+  COALESCE(SUM(CASE WHEN MealEntries.MealTemplateId IS NOT NULL THEN COALESCE(MealTemplateTotals.Protein, 0) ELSE COALESCE(Foods.ProteinPerServing, 0) * MealEntries.Quantity END), 0),
+  COALESCE(SUM(CASE WHEN MealEntries.MealTemplateId IS NOT NULL THEN COALESCE(MealTemplateTotals.Fibre, 0) ELSE COALESCE(Foods.FibrePerServing, 0) * MealEntries.Quantity END), 0),
+  COALESCE(SUM(CASE WHEN MealEntries.MealTemplateId IS NOT NULL THEN COALESCE(MealTemplateTotals.Carbs, 0) ELSE COALESCE(Foods.CarbsPerServing, 0) * MealEntries.Quantity END), 0),
+  COALESCE(SUM(CASE WHEN MealEntries.MealTemplateId IS NOT NULL THEN COALESCE(MealTemplateTotals.Fat, 0) ELSE COALESCE(Foods.FatPerServing, 0) * MealEntries.Quantity END), 0),
+  COALESCE(SUM(CASE WHEN MealEntries.MealTemplateId IS NOT NULL THEN COALESCE(MealTemplateTotals.SaturatedFat, 0) ELSE COALESCE(Foods.SaturatedFatPerServing, 0) * MealEntries.Quantity END), 0),
+  COALESCE(SUM(CASE WHEN MealEntries.MealTemplateId IS NOT NULL THEN COALESCE(MealTemplateTotals.Sugar, 0) ELSE COALESCE(Foods.SugarPerServing, 0) * MealEntries.Quantity END), 0),
+  COALESCE(SUM(CASE WHEN MealEntries.MealTemplateId IS NOT NULL THEN COALESCE(MealTemplateTotals.Sodium, 0) ELSE COALESCE(Foods.SodiumPerServing, 0) * MealEntries.Quantity END), 0),
+  COUNT(MealEntries.MealEntryId)
+FROM DailyLogs
+LEFT JOIN MealEntries ON MealEntries.DailyLogId = DailyLogs.DailyLogId
+LEFT JOIN Foods ON Foods.FoodId = MealEntries.FoodId
+LEFT JOIN MealTemplateTotals ON MealTemplateTotals.MealTemplateId = MealEntries.MealTemplateId
+GROUP BY DailyLogs.DailyLogId;
@@ -0,0 +1,11 @@
+-- Shared food lookup cache, used when FOOD_LOOKUP_CACHE_BACKEND=sqlite
+CREATE TABLE IF NOT EXISTS LookupCache (
+  CacheKey text PRIMARY KEY,
+  Payload text NOT NULL,
+  ByteSize integer NOT NULL,
+  ExpiresAt real NOT NULL,
+  CreatedAt real NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS LookupCache_ExpiresAt_Idx ON LookupCache (ExpiresAt);
+CREATE INDEX IF NOT EXISTS LookupCache_CreatedAt_Idx ON LookupCache (CreatedAt);
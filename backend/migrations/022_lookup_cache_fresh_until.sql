@@ -0,0 +1,4 @@
+-- Separate freshness from expiry so stale lookup entries can be served while refreshing
+ALTER TABLE LookupCache ADD COLUMN FreshUntil real;
+
+UPDATE LookupCache SET FreshUntil = ExpiresAt WHERE FreshUntil IS NULL;
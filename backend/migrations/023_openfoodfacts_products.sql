@@ -0,0 +1,10 @@
+-- Local OpenFoodFacts product index, loaded from an offline export
+CREATE TABLE IF NOT EXISTS OpenFoodFactsProducts (
+  Barcode text PRIMARY KEY,
+  FoodName text NOT NULL,
+  SearchName text NOT NULL,
+  Payload text NOT NULL,
+  ImportedAt text NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS OpenFoodFactsProducts_SearchName_Idx ON OpenFoodFactsProducts (SearchName);
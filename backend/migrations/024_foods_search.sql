@@ -0,0 +1,24 @@
+-- Full-text index over food names, kept in sync with Foods by triggers
+CREATE VIRTUAL TABLE IF NOT EXISTS FoodsSearch USING fts5(
+  FoodId UNINDEXED,
+  FoodName,
+  tokenize = 'unicode61 remove_diacritics 2',
+  prefix = '2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS Foods_Search_AfterInsert AFTER INSERT ON Foods BEGIN
+  INSERT INTO FoodsSearch (FoodId, FoodName) VALUES (new.FoodId, new.FoodName);
+END;
+
+CREATE TRIGGER IF NOT EXISTS Foods_Search_AfterDelete AFTER DELETE ON Foods BEGIN
+  DELETE FROM FoodsSearch WHERE FoodId = old.FoodId;
+END;
+
+CREATE TRIGGER IF NOT EXISTS Foods_Search_AfterUpdate AFTER UPDATE OF FoodName ON Foods
+WHEN old.FoodName IS NOT new.FoodName BEGIN
+  DELETE FROM FoodsSearch WHERE FoodId = old.FoodId;
+  INSERT INTO FoodsSearch (FoodId, FoodName) VALUES (new.FoodId, new.FoodName);
+END;
+
+INSERT INTO FoodsSearch (FoodId, FoodName)
+SELECT FoodId, FoodName FROM Foods;
@@ -0,0 +1,2 @@
+-- Supports keyset pagination over the shared food list ordered by (FoodName, FoodId)
+CREATE INDEX IF NOT EXISTS Foods_FoodName_FoodId_Idx ON Foods (FoodName, FoodId);
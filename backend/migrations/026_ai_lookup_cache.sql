@@ -0,0 +1,13 @@
+-- Persistent cache of AI text lookup responses, keyed by a hash of query, prompt and model
+CREATE TABLE IF NOT EXISTS AiLookupCache (
+  CacheKey text PRIMARY KEY,
+  Payload text NOT NULL,
+  ByteSize integer NOT NULL,
+  FreshUntil real,
+  ExpiresAt real NOT NULL,
+  CreatedAt real NOT NULL,
+  LastUsedAt real,
+  HitCount integer NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS AiLookupCache_ExpiresAt_Idx ON AiLookupCache (ExpiresAt);
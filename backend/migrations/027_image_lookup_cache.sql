@@ -0,0 +1,16 @@
+-- AI image lookup responses keyed by exact content hash, with a perceptual hash for near-duplicate photos
+CREATE TABLE IF NOT EXISTS ImageLookupCache (
+  CacheKey text PRIMARY KEY,
+  Payload text NOT NULL,
+  ByteSize integer NOT NULL,
+  FreshUntil real,
+  ExpiresAt real NOT NULL,
+  CreatedAt real NOT NULL,
+  LastUsedAt real,
+  HitCount integer NOT NULL DEFAULT 0,
+  PerceptualHash text,
+  Variant text
+);
+
+CREATE INDEX IF NOT EXISTS ImageLookupCache_ExpiresAt_Idx ON ImageLookupCache (ExpiresAt);
+CREATE INDEX IF NOT EXISTS ImageLookupCache_Variant_Idx ON ImageLookupCache (Variant);
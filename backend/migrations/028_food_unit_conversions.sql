@@ -0,0 +1,11 @@
+-- Conversion factors learned from AI unit conversions, reused for later entries of the same food.
+-- Factor is how many ToUnit equal one FromUnit; mass and volume are stored in g and mL.
+CREATE TABLE IF NOT EXISTS FoodUnitConversions (
+  FoodId text NOT NULL,
+  FromUnit text NOT NULL,
+  ToUnit text NOT NULL,
+  Factor real NOT NULL,
+  CreatedAt text NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (FoodId, FromUnit, ToUnit),
+  FOREIGN KEY (FoodId) REFERENCES Foods(FoodId) ON DELETE CASCADE
+);
@@ -0,0 +1,27 @@
+-- Word-prefix search over the local OpenFoodFacts index, kept in sync with OpenFoodFactsProducts by triggers
+CREATE VIRTUAL TABLE IF NOT EXISTS OpenFoodFactsProductsSearch USING fts5(
+  FoodName,
+  content = 'OpenFoodFactsProducts',
+  content_rowid = 'rowid',
+  tokenize = 'unicode61 remove_diacritics 2',
+  prefix = '2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS OpenFoodFactsProducts_Search_AfterInsert AFTER INSERT ON OpenFoodFactsProducts BEGIN
+  INSERT INTO OpenFoodFactsProductsSearch (rowid, FoodName) VALUES (new.rowid, new.FoodName);
+END;
+
+CREATE TRIGGER IF NOT EXISTS OpenFoodFactsProducts_Search_AfterDelete AFTER DELETE ON OpenFoodFactsProducts BEGIN
+  INSERT INTO OpenFoodFactsProductsSearch (OpenFoodFactsProductsSearch, rowid, FoodName) VALUES ('delete', old.rowid, old.FoodName);
+END;
+
+CREATE TRIGGER IF NOT EXISTS OpenFoodFactsProducts_Search_AfterUpdate AFTER UPDATE OF FoodName ON OpenFoodFactsProducts
+WHEN old.FoodName IS NOT new.FoodName BEGIN
+  INSERT INTO OpenFoodFactsProductsSearch (OpenFoodFactsProductsSearch, rowid, FoodName) VALUES ('delete', old.rowid, old.FoodName);
+  INSERT INTO OpenFoodFactsProductsSearch (rowid, FoodName) VALUES (new.rowid, new.FoodName);
+END;
+
+INSERT INTO OpenFoodFactsProductsSearch (OpenFoodFactsProductsSearch) VALUES ('rebuild');
+
+-- Substring LIKE searches could not use this index; FTS replaces it
+DROP INDEX IF EXISTS OpenFoodFactsProducts_SearchName_Idx;
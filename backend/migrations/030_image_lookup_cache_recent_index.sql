@@ -0,0 +1,3 @@
+-- Near-duplicate photo matching scans the newest rows of one variant
+DROP INDEX IF EXISTS ImageLookupCache_Variant_Idx;
+CREATE INDEX IF NOT EXISTS ImageLookupCache_Variant_CreatedAt_Idx ON ImageLookupCache (Variant, CreatedAt);
@@ -0,0 +1,35 @@
+-- Map each food to its FoodsSearch rowid so deletes and renames hit one FTS row by rowid
+CREATE TABLE IF NOT EXISTS FoodsSearchRowIds (
+  SearchRowId integer PRIMARY KEY,
+  FoodId text NOT NULL UNIQUE
+);
+
+DROP TRIGGER IF EXISTS Foods_Search_AfterInsert;
+DROP TRIGGER IF EXISTS Foods_Search_AfterDelete;
+DROP TRIGGER IF EXISTS Foods_Search_AfterUpdate;
+
+CREATE TRIGGER IF NOT EXISTS Foods_Search_AfterInsert AFTER INSERT ON Foods BEGIN
+  INSERT INTO FoodsSearchRowIds (FoodId) VALUES (new.FoodId);
+  INSERT INTO FoodsSearch (rowid, FoodId, FoodName)
+  SELECT SearchRowId, new.FoodId, new.FoodName FROM FoodsSearchRowIds WHERE FoodId = new.FoodId;
+END;
+
+CREATE TRIGGER IF NOT EXISTS Foods_Search_AfterDelete AFTER DELETE ON Foods BEGIN
+  DELETE FROM FoodsSearch
+  WHERE rowid = (SELECT SearchRowId FROM FoodsSearchRowIds WHERE FoodId = old.FoodId);
+  DELETE FROM FoodsSearchRowIds WHERE FoodId = old.FoodId;
+END;
+
+CREATE TRIGGER IF NOT EXISTS Foods_Search_AfterUpdate AFTER UPDATE OF FoodName ON Foods
+WHEN old.FoodName IS NOT new.FoodName BEGIN
+  UPDATE FoodsSearch SET FoodName = new.FoodName
+  WHERE rowid = (SELECT SearchRowId FROM FoodsSearchRowIds WHERE FoodId = new.FoodId);
+END;
+
+DELETE FROM FoodsSearch;
+DELETE FROM FoodsSearchRowIds;
+INSERT INTO FoodsSearchRowIds (FoodId) SELECT FoodId FROM Foods;
+INSERT INTO FoodsSearch (rowid, FoodId, FoodName)
+SELECT FoodsSearchRowIds.SearchRowId, Foods.FoodId, Foods.FoodName
+FROM Foods
+INNER JOIN FoodsSearchRowIds ON FoodsSearchRowIds.FoodId = Foods.FoodId;
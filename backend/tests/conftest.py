@@ -37,6 +37,11 @@ def CreateTestUser(Email: str, IsAdmin: bool = False) -> str:
     return UserId
 
 
+@pytest.fixture()
+def anyio_backend():
+    return "asyncio"
+
+
 @pytest.fixture(autouse=True)
 def SetTestOpenAiKey():
     OriginalKey = Settings.OpenAiApiKey
@@ -47,9 +52,7 @@ def SetTestOpenAiKey():
 
 @pytest.fixture()
 def temp_db(tmp_path):
-    if database.DatabaseConnection is not None:
-        database.DatabaseConnection.close()
-        database.DatabaseConnection = None
+    database.ClosePool()
 
     Settings.DatabaseFile = str(tmp_path / "portionnote-test.sqlite")
     Settings.AdminEmail = "admin@example.com"
@@ -59,9 +62,7 @@ def temp_db(tmp_path):
 
     yield
 
-    if database.DatabaseConnection is not None:
-        database.DatabaseConnection.close()
-        database.DatabaseConnection = None
+    database.ClosePool()
 
 
 @pytest.fixture()
@@ -9,13 +9,14 @@ from app.services.daily_logs_service import CreateMealEntry, UpsertDailyLog
 from app.services.foods_service import UpsertFood
 
 
-def test_ai_suggestions_requires_api_key(test_user_id):
+@pytest.mark.anyio
+async def test_ai_suggestions_requires_api_key(test_user_id):
     OriginalKey = Settings.OpenAiApiKey
     Settings.OpenAiApiKey = None
 
     try:
         with pytest.raises(ValueError):
-            GetAiSuggestions(test_user_id, "2024-01-01")
+            await GetAiSuggestions(test_user_id, "2024-01-01")
     finally:
         Settings.OpenAiApiKey = OriginalKey
 
@@ -33,7 +34,8 @@ def test_ai_prompt_and_parse():
         ParseAiSuggestions("{bad json")
 
 
-def test_get_ai_suggestions_success(monkeypatch, test_user_id):
+@pytest.mark.anyio
+async def test_get_ai_suggestions_success(monkeypatch, test_user_id):
     OriginalKey = Settings.OpenAiApiKey
     OriginalModel = Settings.OpenAiModel
     OriginalUrl = Settings.OpenAiBaseUrl
@@ -71,16 +73,19 @@ def test_get_ai_suggestions_success(monkeypatch, test_user_id):
         )
     )
 
-    monkeypatch.setattr(
-        "app.services.ai_suggestions_service.GetOpenAiContentWithModel",
-        lambda *_args, **_kwargs: (
+    async def FakeGetOpenAiContent(*_args, **_kwargs):
+        return (
             json.dumps([{"Title": "Add protein", "Detail": "Aim for 20g at breakfast."}]),
             "gpt-4.1"
         )
+
+    monkeypatch.setattr(
+        "app.services.ai_suggestions_service.GetOpenAiContentWithModelAsync",
+        FakeGetOpenAiContent
     )
 
     try:
-        Suggestions, ModelUsed = GetAiSuggestions(test_user_id, "2024-01-02")
+        Suggestions, ModelUsed = await GetAiSuggestions(test_user_id, "2024-01-02")
         assert Suggestions[0].SuggestionType == "AiSuggestion"
         assert ModelUsed == "gpt-4.1"
     finally:
@@ -0,0 +1,210 @@
+import threading
+
+import pytest
+
+from app.config import Settings
+from app.utils import database
+from app.utils.database import (
+    ConnectionPool,
+    ExecuteMany,
+    ExecuteQueryAsync,
+    FetchAllAsync,
+    FetchOne,
+    FetchOneAsync,
+    GetPragmaProfile,
+    RunDatabaseCall,
+    Transaction,
+    UseConnection
+)
+
+
+def test_lease_is_reused_within_a_thread(temp_db):
+    with UseConnection() as Outer:
+        with UseConnection() as Inner:
+            assert Outer is Inner
+        assert FetchOne("SELECT 1 AS Value;")["Value"] == 1
+
+    Stats = database.GetPool().GetStats()
+    assert Stats["in_use"] == 0
+    assert Stats["idle_connections"] == Stats["open_connections"]
+
+
+def test_connections_return_to_pool_between_calls(tmp_path):
+    Pool = ConnectionPool(str(tmp_path / "pool.sqlite"), 1, 0.1, 60)
+
+    with Pool.Lease() as First:
+        pass
+    Seen: list[object] = []
+
+    def Worker() -> None:
+        with Pool.Lease() as Connection:
+            Seen.append(Connection)
+
+    ThreadItem = threading.Thread(target=Worker)
+    ThreadItem.start()
+    ThreadItem.join()
+
+    assert Seen == [First]
+    assert Pool.GetStats()["open_connections"] == 1
+    Pool.Close()
+
+
+def test_pool_times_out_when_exhausted(tmp_path):
+    Pool = ConnectionPool(str(tmp_path / "pool.sqlite"), 1, 0.05, 60)
+    Errors: list[Exception] = []
+
+    def Worker() -> None:
+        try:
+            with Pool.Lease():
+                pass
+        except Exception as ErrorValue:
+            Errors.append(ErrorValue)
+
+    with Pool.Lease():
+        ThreadItem = threading.Thread(target=Worker)
+        ThreadItem.start()
+        ThreadItem.join()
+
+    assert len(Errors) == 1
+    assert "Timed out" in str(Errors[0])
+    Pool.Close()
+
+
+def test_more_threads_than_connections_share_the_pool(tmp_path):
+    Pool = ConnectionPool(str(tmp_path / "pool.sqlite"), 2, 5, 60)
+    Results: list[int] = []
+
+    def Worker() -> None:
+        with Pool.Lease() as Connection:
+            Results.append(Connection.execute("SELECT 1;").fetchone()[0])
+
+    Threads = [threading.Thread(target=Worker) for _Index in range(20)]
+    for ThreadItem in Threads:
+        ThreadItem.start()
+    for ThreadItem in Threads:
+        ThreadItem.join()
+
+    assert Results == [1] * 20
+    assert Pool.GetStats()["open_connections"] <= 2
+    Pool.Close()
+
+
+def test_pool_replaces_unhealthy_connection(tmp_path):
+    Pool = ConnectionPool(str(tmp_path / "pool.sqlite"), 2, 0.1, 0)
+    with Pool.Lease() as First:
+        First.close()
+
+    with Pool.Lease() as Second:
+        assert Second is not First
+        assert Second.execute("SELECT 1;").fetchone()[0] == 1
+    assert Pool.GetStats()["open_connections"] == 1
+    Pool.Close()
+
+
+def test_closed_pool_rejects_connections(tmp_path):
+    Pool = ConnectionPool(str(tmp_path / "pool.sqlite"), 2, 0.1, 60)
+    with Pool.Lease():
+        pass
+    Pool.Close()
+
+    assert Pool.GetStats()["open_connections"] == 0
+    with pytest.raises(Exception, match="closed"):
+        with Pool.Lease():
+            pass
+
+
+def test_connections_apply_pragma_profile(temp_db):
+    Profile = GetPragmaProfile()
+
+    assert Profile["journal_mode"] == "wal"
+    assert Profile["synchronous"] == 1
+    assert Profile["temp_store"] == 2
+    assert Profile["busy_timeout"] == Settings.DatabaseBusyTimeoutMs
+    assert Profile["foreign_keys"] == 1
+
+
+def test_invalid_pragma_value_is_rejected(tmp_path, monkeypatch):
+    monkeypatch.setattr(Settings, "DatabaseJournalMode", "WAL; DROP TABLE Users")
+    Pool = ConnectionPool(str(tmp_path / "pool.sqlite"), 1, 0.1, 0)
+
+    with pytest.raises(ValueError, match="journal_mode"):
+        with Pool.Lease():
+            pass
+    assert Pool.GetStats()["open_connections"] == 0
+
+
+def _InsertUser(UserId: str) -> None:
+    database.ExecuteQuery(
+        "INSERT INTO Users (UserId, Email, AuthProvider, IsAdmin) VALUES (?, ?, ?, ?);",
+        [UserId, f"{UserId}@example.com", "Local", 0]
+    )
+
+
+def _UserExists(UserId: str) -> bool:
+    return FetchOne("SELECT UserId FROM Users WHERE UserId = ?;", [UserId]) is not None
+
+
+def test_transaction_commits_once_on_success(temp_db):
+    with Transaction() as Connection:
+        _InsertUser("User-Tx-1")
+        _InsertUser("User-Tx-2")
+        assert Connection.in_transaction
+
+    assert _UserExists("User-Tx-1")
+    assert _UserExists("User-Tx-2")
+    assert not database.InTransaction()
+
+
+def test_transaction_rolls_back_on_error(temp_db):
+    with pytest.raises(ValueError):
+        with Transaction():
+            _InsertUser("User-Tx-Rollback")
+            raise ValueError("boom")
+
+    assert not _UserExists("User-Tx-Rollback")
+    assert not database.InTransaction()
+
+
+def test_nested_transaction_uses_savepoint(temp_db):
+    with Transaction():
+        _InsertUser("User-Tx-Outer")
+        with pytest.raises(ValueError):
+            with Transaction():
+                _InsertUser("User-Tx-Inner")
+                raise ValueError("inner failure")
+        assert database.InTransaction()
+
+    assert _UserExists("User-Tx-Outer")
+    assert not _UserExists("User-Tx-Inner")
+
+
+def test_execute_many_inserts_batch(temp_db):
+    Count = ExecuteMany(
+        "INSERT INTO Users (UserId, Email, AuthProvider, IsAdmin) VALUES (?, ?, ?, ?);",
+        ([f"User-Bulk-{Index}", f"bulk{Index}@example.com", "Local", 0] for Index in range(5))
+    )
+
+    assert Count == 5
+    assert FetchOne("SELECT COUNT(*) AS Total FROM Users WHERE UserId LIKE 'User-Bulk-%';")["Total"] == 5
+
+
+def test_execute_script_refused_inside_transaction(temp_db):
+    with pytest.raises(Exception, match="inside a Transaction"):
+        with Transaction():
+            database.ExecuteScript("SELECT 1;")
+
+
+@pytest.mark.anyio
+async def test_async_helpers_run_off_the_event_loop(temp_db):
+    await ExecuteQueryAsync(
+        "INSERT INTO Users (UserId, Email, AuthProvider, IsAdmin) VALUES (?, ?, ?, ?);",
+        ["User-Async", "async@example.com", "Local", 0]
+    )
+
+    Row = await FetchOneAsync("SELECT Email FROM Users WHERE UserId = ?;", ["User-Async"])
+    Rows = await FetchAllAsync("SELECT UserId FROM Users;")
+    ThreadName = await RunDatabaseCall(lambda: threading.current_thread().name)
+
+    assert Row == {"Email": "async@example.com"}
+    assert any(Item["UserId"] == "User-Async" for Item in Rows)
+    assert ThreadName.startswith("portionnote-db")
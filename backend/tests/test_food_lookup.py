@@ -1,11 +1,20 @@
 """Tests for food lookup service (AI text, image, barcode)."""
+import asyncio
+import base64
+import io
 import json
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
 from app.config import Settings
+from app.models.schemas import FoodInfo
+from app.services import ai_lookup_cache_service
+from app.services.ai_lookup_cache_service import GetAiLookupCacheStats, PurgeAiLookupCache, StoreAiLookup
+from app.services.lookup_cache import MemoryLookupCache
+from app.services.multi_source_lookup_service import MultiSourceFoodLookupService
 from app.services.food_lookup_service import (
+    FoodInfoToLookupResult,
     FoodLookupResult,
     LookupFoodByBarcode,
     LookupFoodByImage,
@@ -37,22 +46,24 @@ def test_food_lookup_result_to_dict():
     assert Dict["Confidence"] == "High"
 
 
-def test_lookup_food_by_text_no_api_key():
+@pytest.mark.anyio
+async def test_lookup_food_by_text_no_api_key():
     """Test that LookupFoodByText raises error when API key not configured."""
     OriginalKey = Settings.OpenAiApiKey
     Settings.OpenAiApiKey = None
     
     try:
         with pytest.raises(ValueError, match="OpenAI API key not configured"):
-            LookupFoodByText("banana")
+            await LookupFoodByText("banana")
     finally:
         Settings.OpenAiApiKey = OriginalKey
 
 
-@patch("app.services.food_lookup_service.GetOpenAiContent")
-def test_lookup_food_by_text_success(MockGetOpenAiContent):
+@pytest.mark.anyio
+@patch("app.services.food_lookup_service.GetOpenAiContentWithModelAsync")
+async def test_lookup_food_by_text_success(MockGetOpenAiContent, temp_db):
     """Test successful text-based food lookup."""
-    MockGetOpenAiContent.return_value = json.dumps({
+    MockGetOpenAiContent.return_value = (json.dumps({
         "FoodName": "Weet-Bix",
         "ServingQuantity": 2.0,
         "ServingUnit": "biscuits",
@@ -65,9 +76,9 @@ def test_lookup_food_by_text_success(MockGetOpenAiContent):
         "SugarPerServing": 3.8,
         "SodiumPerServing": 75.0,
         "Confidence": "High"
-    })
+    }), Settings.OpenAiModel)
     
-    Result = LookupFoodByText("weet-bix")
+    Result = await LookupFoodByText("weet-bix")
     
     assert Result.FoodName == "Weet-Bix"
     assert Result.CaloriesPerServing == 136
@@ -77,28 +88,30 @@ def test_lookup_food_by_text_success(MockGetOpenAiContent):
     assert Result.Confidence == "High"
 
 
-@patch("app.services.food_lookup_service.GetOpenAiContent")
-def test_lookup_food_by_text_with_markdown_response(MockGetOpenAiContent):
+@pytest.mark.anyio
+@patch("app.services.food_lookup_service.GetOpenAiContentWithModelAsync")
+async def test_lookup_food_by_text_with_markdown_response(MockGetOpenAiContent, temp_db):
     """Test text lookup handles markdown code blocks in AI response."""
-    MockGetOpenAiContent.return_value = "```json\n" + json.dumps({
+    MockGetOpenAiContent.return_value = ("```json\n" + json.dumps({
         "FoodName": "Banana",
         "ServingQuantity": 1.0,
         "ServingUnit": "medium",
         "CaloriesPerServing": 105,
         "ProteinPerServing": 1.3,
         "Confidence": "High"
-    }) + "\n```"
+    }) + "\n```", Settings.OpenAiModel)
     
-    Result = LookupFoodByText("banana")
+    Result = await LookupFoodByText("banana")
     
     assert Result.FoodName == "Banana"
     assert Result.CaloriesPerServing == 105
 
 
-@patch("app.services.food_lookup_service.GetOpenAiContent")
-def test_lookup_food_by_text_options_success(MockGetOpenAiContent):
+@pytest.mark.anyio
+@patch("app.services.food_lookup_service.GetOpenAiContentWithModelAsync")
+async def test_lookup_food_by_text_options_success(MockGetOpenAiContent, temp_db):
     """Test multiple AI options for text lookup."""
-    MockGetOpenAiContent.return_value = json.dumps([
+    MockGetOpenAiContent.return_value = (json.dumps([
         {
             "FoodName": "Mocha Coffee Small",
             "ServingQuantity": 1.0,
@@ -123,9 +136,9 @@ def test_lookup_food_by_text_options_success(MockGetOpenAiContent):
             "ProteinPerServing": 10.0,
             "Confidence": "Medium"
         }
-    ])
+    ]), Settings.OpenAiModel)
 
-    Results = LookupFoodByTextOptions("mocha coffee")
+    Results = await LookupFoodByTextOptions("mocha coffee")
 
     assert len(Results) == 3
     assert Results[0].ServingUnit == "small"
@@ -133,20 +146,109 @@ def test_lookup_food_by_text_options_success(MockGetOpenAiContent):
     assert Results[2].ServingUnit == "large"
 
 
-def test_lookup_food_by_image_no_api_key():
+@pytest.mark.anyio
+@patch("app.services.food_lookup_service.GetOpenAiContentWithModelAsync")
+async def test_lookup_food_by_text_reuses_cached_response(MockGetOpenAiContent, temp_db):
+    """Repeat text lookups are answered from the AI lookup cache."""
+    Content = json.dumps({
+        "FoodName": "Banana",
+        "ServingQuantity": 120.0,
+        "ServingUnit": "g",
+        "CaloriesPerServing": 107,
+        "ProteinPerServing": 1.3,
+        "Confidence": "High"
+    })
+    MockGetOpenAiContent.side_effect = lambda *_args, **_kwargs: (Content, f"{Settings.OpenAiModel}-2024-07-18")
+
+    First = await LookupFoodByText("Banana")
+    Second = await LookupFoodByText("  banana ")
+    assert Second.ToDict() == First.ToDict()
+    assert MockGetOpenAiContent.call_count == 1
+
+    await LookupFoodByTextOptions("banana")
+    assert MockGetOpenAiContent.call_count == 2
+
+    OriginalModel = Settings.OpenAiModel
+    Settings.OpenAiModel = "other-model"
+    try:
+        await LookupFoodByText("banana")
+    finally:
+        Settings.OpenAiModel = OriginalModel
+    assert MockGetOpenAiContent.call_count == 3
+
+    Stats = GetAiLookupCacheStats()
+    assert Stats["total_entries"] == 3
+    assert PurgeAiLookupCache(All=True) == 3
+
+
+@pytest.mark.anyio
+@patch("app.services.food_lookup_service.GetOpenAiContentWithModelAsync")
+async def test_lookup_food_by_text_skips_cache_for_fallback_model(MockGetOpenAiContent, temp_db):
+    """Answers from a fallback model are not stored under the configured model's key."""
+    MockGetOpenAiContent.return_value = (json.dumps({
+        "FoodName": "Banana",
+        "ServingQuantity": 120.0,
+        "ServingUnit": "g",
+        "CaloriesPerServing": 107,
+        "ProteinPerServing": 1.3,
+        "Confidence": "High"
+    }), "fallback-model")
+
+    await LookupFoodByText("banana")
+    await LookupFoodByText("banana")
+
+    assert MockGetOpenAiContent.call_count == 2
+    assert GetAiLookupCacheStats()["total_entries"] == 0
+
+
+@pytest.mark.anyio
+async def test_cache_sweeper_trims_ai_lookup_cache(monkeypatch, temp_db):
+    """AI cache writes do not trim; the background sweeper does."""
+    monkeypatch.setattr(Settings, "AiLookupCacheMaxEntries", 2)
+    monkeypatch.setattr(ai_lookup_cache_service, "_Cache", None)
+    for Index in range(4):
+        await StoreAiLookup(f"key-{Index}", [{"FoodName": f"Food {Index}"}])
+    assert GetAiLookupCacheStats()["total_entries"] == 4
+
+    Sweeper = asyncio.get_running_loop().create_task(MultiSourceFoodLookupService._RunSweeper(0.01))
+    try:
+        for _Attempt in range(100):
+            await asyncio.sleep(0.01)
+            if GetAiLookupCacheStats()["total_entries"] == 2:
+                break
+    finally:
+        Sweeper.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await Sweeper
+
+    assert GetAiLookupCacheStats()["total_entries"] == 2
+
+
+@pytest.mark.anyio
+async def test_lookup_food_by_image_no_api_key():
     """Test that LookupFoodByImage raises error when API key not configured."""
     OriginalKey = Settings.OpenAiApiKey
     Settings.OpenAiApiKey = None
     
     try:
         with pytest.raises(ValueError, match="OpenAI API key not configured"):
-            LookupFoodByImage("base64imagedata")
+            await LookupFoodByImage("base64imagedata")
     finally:
         Settings.OpenAiApiKey = OriginalKey
 
 
-@patch("app.services.food_lookup_service.httpx.post")
-def test_lookup_food_by_image_success(MockPost):
+@pytest.mark.anyio
+async def test_lookup_food_by_image_rejects_invalid_base64():
+    """Image data that is not base64 fails before any AI call."""
+    with pytest.raises(ValueError, match="Invalid image data"):
+        await LookupFoodByImage("not base64!")
+    with pytest.raises(ValueError, match="Invalid image data"):
+        await LookupFoodByImage("aGVsbG8=$$")
+
+
+@pytest.mark.anyio
+@patch("app.services.food_lookup_service.OpenOpenAiClient")
+async def test_lookup_food_by_image_success(MockOpenClient, temp_db):
     """Test successful image-based food lookup."""
     MockResponse = Mock()
     MockResponse.status_code = 200
@@ -176,9 +278,9 @@ def test_lookup_food_by_image_success(MockPost):
             }
         }]
     }
-    MockPost.return_value = MockResponse
+    MockOpenClient.return_value.post = AsyncMock(return_value=MockResponse)
     
-    Results = LookupFoodByImage("fake_base64_image_data")
+    Results = await LookupFoodByImage(base64.b64encode(b"fake image data").decode("ascii"))
     
     assert len(Results) == 2
     assert Results[0].FoodName == "Grilled Chicken Breast"
@@ -189,61 +291,130 @@ def test_lookup_food_by_image_success(MockPost):
     assert Results[1].CaloriesPerServing == 205
 
 
-@patch("app.services.food_lookup_service.httpx.get")
-def test_lookup_food_by_barcode_success(MockGet):
-    """Test successful barcode lookup via Open Food Facts."""
+def BuildVisionResponse(FoodName: str) -> Mock:
     MockResponse = Mock()
-    MockResponse.status_code = 200
     MockResponse.json.return_value = {
-        "status": 1,
-        "product": {
-            "product_name": "Weet-Bix Breakfast Cereal",
-            "serving_size": "30g",
-            "nutriments": {
-                "energy-kcal_100g": 365,
-                "proteins_100g": 12.5,
-                "fiber_100g": 11.4,
-                "carbohydrates_100g": 66.7,
-                "fat_100g": 2.7,
-                "saturated-fat_100g": 0.6,
-                "sugars_100g": 3.3,
-                "sodium_100g": 0.125
+        "choices": [{
+            "message": {
+                "content": json.dumps([{
+                    "FoodName": FoodName,
+                    "ServingQuantity": 100.0,
+                    "ServingUnit": "g",
+                    "CaloriesPerServing": 200,
+                    "ProteinPerServing": 10.0,
+                    "Confidence": "Medium"
+                }])
             }
-        }
+        }]
     }
-    MockGet.return_value = MockResponse
+    return MockResponse
+
+
+def BuildJpegBase64(Quality: int, Rotate: int = 0) -> str:
+    Image = pytest.importorskip("PIL.Image")
+    Picture = Image.effect_mandelbrot((320, 240), (-2.0, -1.2, 1.0, 1.2), 64).rotate(Rotate).convert("RGB")
+    Buffer = io.BytesIO()
+    Picture.save(Buffer, format="JPEG", quality=Quality)
+    return base64.b64encode(Buffer.getvalue()).decode("ascii")
+
+
+@pytest.mark.anyio
+@patch("app.services.food_lookup_service.OpenOpenAiClient")
+async def test_lookup_food_by_image_reuses_cached_result_for_retries(MockOpenClient, temp_db):
+    """Resubmitting the same image skips the vision call."""
+    MockOpenClient.return_value.post = AsyncMock(return_value=BuildVisionResponse("Pasta"))
+    ImageBase64 = base64.b64encode(b"not really a jpeg").decode("ascii")
+
+    First = await LookupFoodByImage(ImageBase64)
+    Second = await LookupFoodByImage(ImageBase64)
+
+    assert [Result.ToDict() for Result in Second] == [Result.ToDict() for Result in First]
+    assert MockOpenClient.return_value.post.await_count == 1
+
+
+@pytest.mark.anyio
+@patch("app.services.food_lookup_service.OpenOpenAiClient")
+async def test_lookup_food_by_image_matches_near_duplicate_photos(MockOpenClient, temp_db):
+    """A re-encoded copy of a photo matches by perceptual hash."""
+    Original = BuildJpegBase64(90)
+    Recompressed = BuildJpegBase64(40)
+    assert Original != Recompressed
+    MockOpenClient.return_value.post = AsyncMock(return_value=BuildVisionResponse("Salad"))
+
+    await LookupFoodByImage(Original)
+    Results = await LookupFoodByImage(Recompressed)
+
+    assert Results[0].FoodName == "Salad"
+    assert MockOpenClient.return_value.post.await_count == 1
+    assert GetAiLookupCacheStats()["image"]["near_duplicate_hits"] >= 1
+
+    MockOpenClient.return_value.post = AsyncMock(return_value=BuildVisionResponse("Soup"))
+    Results = await LookupFoodByImage(BuildJpegBase64(90, Rotate=180))
+    assert Results[0].FoodName == "Soup"
+
+
+@pytest.mark.anyio
+@patch("app.services.food_lookup_service.MultiSourceFoodLookupService.GetByBarcode", new_callable=AsyncMock)
+async def test_lookup_food_by_barcode_success(MockGetByBarcode):
+    """Test barcode lookup maps the cached OpenFoodFacts result."""
+    MockGetByBarcode.return_value = FoodInfo(
+        FoodName="Sanitarium Weet-Bix",
+        ServingDescription="30g",
+        CaloriesPerServing=110,
+        ProteinPerServing=3.8,
+        FiberPerServing=3.4,
+        CarbohydratesPerServing=20.0,
+        SodiumPerServing=37.5,
+        Metadata={"source": "openfoodfacts", "barcode": "9310015241054"}
+    )
     
-    Result = LookupFoodByBarcode("9310015241054")
+    Result = await LookupFoodByBarcode("9310015241054")
     
     assert Result is not None
-    assert Result.FoodName == "Weet-Bix Breakfast Cereal"
+    assert Result.FoodName == "Sanitarium Weet-Bix"
     assert Result.ServingQuantity == 30.0
     assert Result.ServingUnit == "g"
-    # Values adjusted for 30g serving
-    assert Result.CaloriesPerServing == int(365 * 0.3)  # 109
-    assert Result.ProteinPerServing == round(12.5 * 0.3, 1)  # 3.8
+    assert Result.CaloriesPerServing == 110
+    assert Result.ProteinPerServing == 3.8
+    assert Result.FibrePerServing == 3.4
+    assert Result.CarbsPerServing == 20.0
     assert Result.Source == "OpenFoodFacts"
     assert Result.Confidence == "High"
+    MockGetByBarcode.assert_awaited_once_with("9310015241054")
 
 
-@patch("app.services.food_lookup_service.httpx.get")
-def test_lookup_food_by_barcode_not_found(MockGet):
+def test_food_info_uses_scaled_serving_quantity():
+    Result = FoodInfoToLookupResult(FoodInfo(
+        FoodName="Toast Bread",
+        ServingDescription="2 slices (56 g)",
+        CaloriesPerServing=140,
+        ProteinPerServing=5.6,
+        Metadata={"source": "openfoodfacts", "serving_quantity": 56.0, "serving_unit": "g"}
+    ))
+    
+    assert Result.ServingQuantity == 56.0
+    assert Result.ServingUnit == "g"
+    assert Result.CaloriesPerServing == 140
+
+
+@pytest.mark.anyio
+@patch("app.services.food_lookup_service.MultiSourceFoodLookupService.GetByBarcode", new_callable=AsyncMock)
+async def test_lookup_food_by_barcode_not_found(MockGetByBarcode):
     """Test barcode lookup when product not found."""
-    MockResponse = Mock()
-    MockResponse.status_code = 200
-    MockResponse.json.return_value = {"status": 0}
-    MockGet.return_value = MockResponse
+    MockGetByBarcode.return_value = None
     
-    Result = LookupFoodByBarcode("0000000000000")
+    Result = await LookupFoodByBarcode("0000000000000")
     
     assert Result is None
 
 
-@patch("app.services.food_lookup_service.httpx.get")
-def test_lookup_food_by_barcode_http_error(MockGet):
+@pytest.mark.anyio
+@patch("app.services.multi_source_lookup_service.OpenFoodFactsService.GetProductByBarcode", new_callable=AsyncMock)
+async def test_lookup_food_by_barcode_http_error(MockGetProduct, monkeypatch, temp_db):
     """Test barcode lookup handles HTTP errors gracefully."""
-    MockGet.side_effect = Exception("Network error")
+    monkeypatch.setattr(MultiSourceFoodLookupService, "_Cache", MemoryLookupCache(100, 100_000))
+    MockGetProduct.side_effect = Exception("Network error")
     
-    Result = LookupFoodByBarcode("1234567890")
+    Result = await LookupFoodByBarcode("1234567890")
     
     assert Result is None
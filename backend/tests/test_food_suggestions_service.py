@@ -0,0 +1,153 @@
+import pytest
+
+from app.models.schemas import CreateFoodInput, CreateMealTemplateInput, MealTemplateItemInput, MealType, User
+from app.routes.foods import CreateFood as CreateFoodRoute
+from app.services import food_suggestions_service
+from app.services.food_suggestions_service import (
+    ClearFoodSuggestions,
+    GetLocalFoodSuggestions,
+    RecordLookupNames,
+    SearchRecentLookups,
+    SuggestFoodNames,
+    SuggestionIndex
+)
+from app.services.foods_service import UpsertFood
+from app.services.meal_templates_service import CreateMealTemplate
+
+
+@pytest.fixture(autouse=True)
+def ResetSuggestions():
+    ClearFoodSuggestions()
+    yield
+    ClearFoodSuggestions()
+
+
+def CreateFood(UserId: str, FoodName: str):
+    return UpsertFood(
+        UserId,
+        CreateFoodInput(
+            FoodName=FoodName,
+            ServingDescription="1 serve",
+            CaloriesPerServing=100,
+            ProteinPerServing=5,
+            IsFavourite=False
+        )
+    )
+
+
+def test_suggestion_index_ranks_prefix_word_and_typo_matches():
+    Index = SuggestionIndex([
+        "Chicken Breast",
+        "Roast chicken wrap",
+        "Cheese",
+        "chicken breast",
+        "Apple"
+    ])
+
+    assert len(Index) == 4
+    assert [Name for _Score, Name in Index.Search("chick", 10)] == ["Chicken Breast", "Roast chicken wrap"]
+    assert [Name for _Score, Name in Index.Search("bre chi", 10)] == ["Chicken Breast"]
+    assert [Name for _Score, Name in Index.Search("chiken", 10)][0] == "Chicken Breast"
+    assert Index.Search("zz", 10) == []
+
+
+def test_local_suggestions_cover_foods_templates_and_lookups(test_user_id):
+    Food = CreateFood(test_user_id, "Weet-Bix")
+    CreateMealTemplate(
+        test_user_id,
+        CreateMealTemplateInput(
+            TemplateName="Weekday breakfast",
+            Items=[
+                MealTemplateItemInput(
+                    FoodId=Food.FoodId,
+                    MealType=MealType.Breakfast,
+                    Quantity=2,
+                    EntryNotes=None,
+                    SortOrder=0
+                )
+            ]
+        )
+    )
+    RecordLookupNames(["Weetbix Bites Honey", "Banana"])
+
+    Suggestions = GetLocalFoodSuggestions(test_user_id, "wee", 10)
+    assert Suggestions[:2] == ["Weet-Bix", "Weekday breakfast"]
+    assert "Weetbix Bites Honey" in Suggestions
+    assert "Banana" not in Suggestions
+
+
+@pytest.mark.anyio
+async def test_food_writes_refresh_the_user_index(test_user_id):
+    CurrentUser = User(UserId=test_user_id, Email="test@example.com", IsAdmin=False)
+
+    async def CreateThroughRoute(FoodName: str):
+        await CreateFoodRoute(
+            CreateFoodInput(
+                FoodName=FoodName,
+                ServingDescription="1 serve",
+                CaloriesPerServing=100,
+                ProteinPerServing=5,
+                IsFavourite=False
+            ),
+            CurrentUser=CurrentUser
+        )
+
+    await CreateThroughRoute("Greek yoghurt")
+    assert GetLocalFoodSuggestions(test_user_id, "gre", 10) == ["Greek yoghurt"]
+
+    await CreateThroughRoute("Green apple")
+    assert GetLocalFoodSuggestions(test_user_id, "gre", 10) == ["Green apple", "Greek yoghurt"]
+
+
+def test_recent_lookups_update_in_place_and_evict_oldest(monkeypatch):
+    monkeypatch.setattr(food_suggestions_service.Settings, "FoodSuggestionsRecentLookupMax", 2)
+    RecentIndex = food_suggestions_service._RecentIndex
+
+    RecordLookupNames(["Banana bread", "Banana smoothie"])
+    RecordLookupNames(["Bandito wrap"])
+
+    assert food_suggestions_service._RecentIndex is RecentIndex
+    assert len(RecentIndex) == 2
+    assert [Name for _Score, Name in SearchRecentLookups("ban", 10)] == ["Bandito wrap", "Banana smoothie"]
+
+
+def test_suggestion_index_compacts_removed_names():
+    Index = SuggestionIndex(["Apple", "Apricot", "Avocado"])
+    Index.Remove("apple")
+    Index.Remove("Apricot")
+
+    assert len(Index) == 1
+    assert Index.Names == ["Avocado"]
+    assert [Name for _Score, Name in Index.Search("a", 10)] == ["Avocado"]
+
+
+def test_suggestion_index_matches_short_mid_word_substrings():
+    Index = SuggestionIndex(["Apple", "Banana", "Pear"])
+    Index.Remove("Pear")
+
+    # "pp" and "n" share no trigram with the names they appear in
+    assert Index.Search("pp", 10) == [(1.5, "Apple")]
+    assert [Name for _Score, Name in Index.Search("n", 10)] == ["Banana"]
+    assert Index.Search("e", 10) == [(1.5, "Apple")]
+
+
+@pytest.mark.anyio
+async def test_suggest_food_names_only_calls_ai_when_local_results_are_short(test_user_id, monkeypatch):
+    for Name in ["Oat milk", "Oats", "Oat bar"]:
+        CreateFood(test_user_id, Name)
+
+    Calls: list[str] = []
+
+    async def FakeAiSuggestions(Query: str, Limit: int):
+        Calls.append(Query)
+        return ["Oat milk", "Uncle Tobys Oats Quick Sachets"]
+
+    monkeypatch.setattr(food_suggestions_service, "SearchAustralianFoodSuggestions", FakeAiSuggestions)
+
+    Suggestions = await SuggestFoodNames(test_user_id, "oat", 10)
+    assert Suggestions == ["Oats", "Oat bar", "Oat milk"]
+    assert Calls == []
+
+    Suggestions = await SuggestFoodNames(test_user_id, "oat mi", 10)
+    assert Suggestions == ["Oat milk", "Uncle Tobys Oats Quick Sachets"]
+    assert Calls == ["oat mi"]
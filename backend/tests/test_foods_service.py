@@ -7,13 +7,16 @@ import pytest
 import uuid
 from app.models.schemas import CreateFoodInput, UpdateFoodInput
 from app.services.foods_service import (
+    EncodeFoodCursor,
     GetFoods,
+    GetFoodsPage,
+    SearchFoods,
     UpsertFood,
     UpdateFood,
     GetFoodById,
     DeleteFood
 )
-from app.utils.database import ExecuteQuery
+from app.utils.database import ExecuteQuery, FetchAll, FetchOne
 from app.utils.auth import HashPassword
 
 
@@ -396,3 +399,90 @@ def test_UpdateFood_ServingDescriptionSync(test_user_id):
     Updated = UpdateFood(test_user_id, Created.FoodId, UpdateInput)
     
     assert Updated.ServingDescription == "1.0 oz"
+
+
+def test_SearchFoods_RankedPrefixMatchesFollowEdits(test_user_id):
+    """Search index tracks inserts, renames and deletes on Foods"""
+    for Name in ["Bega Crunchy Peanut Butter", "Peanuts Salted", "Crème Brûlée"]:
+        UpsertFood(
+            test_user_id,
+            CreateFoodInput(FoodName=Name, ServingDescription="100g", CaloriesPerServing=100, ProteinPerServing=5)
+        )
+
+    Names = [Item.FoodName for Item in SearchFoods("pea")]
+    assert set(Names) == {"Bega Crunchy Peanut Butter", "Peanuts Salted"}
+    assert [Item.FoodName for Item in SearchFoods("peanut bega")] == ["Bega Crunchy Peanut Butter"]
+    assert [Item.FoodName for Item in SearchFoods("creme")] == ["Crème Brûlée"]
+    assert SearchFoods("  \"*") == []
+
+    Salted = SearchFoods("salted")[0]
+    UpdateFood(test_user_id, Salted.FoodId, UpdateFoodInput(FoodName="Cashews Salted"))
+    assert [Item.FoodName for Item in SearchFoods("pea")] == ["Bega Crunchy Peanut Butter"]
+    assert [Item.FoodName for Item in SearchFoods("cash")] == ["Cashews Salted"]
+
+    DeleteFood(test_user_id, Salted.FoodId)
+    assert SearchFoods("cash") == []
+
+
+def test_FoodsSearch_RenameThenDeleteLeavesNoStaleRows(test_user_id):
+    """Renames and deletes touch the mapped FTS row, leaving no orphans behind"""
+    Food = UpsertFood(
+        test_user_id,
+        CreateFoodInput(FoodName="Peanuts Salted", ServingDescription="100g", CaloriesPerServing=100, ProteinPerServing=5)
+    )
+    UpdateFood(test_user_id, Food.FoodId, UpdateFoodInput(FoodName="Cashews Salted"))
+    assert FetchAll("SELECT FoodName FROM FoodsSearch WHERE FoodId = ?;", [Food.FoodId]) == [
+        {"FoodName": "Cashews Salted"}
+    ]
+    assert FetchAll("SELECT FoodId FROM FoodsSearch WHERE FoodsSearch MATCH 'peanuts';") == []
+
+    DeleteFood(test_user_id, Food.FoodId)
+    assert FetchAll("SELECT FoodId FROM FoodsSearch WHERE FoodId = ?;", [Food.FoodId]) == []
+    assert FetchAll("SELECT FoodId FROM FoodsSearchRowIds WHERE FoodId = ?;", [Food.FoodId]) == []
+    assert FetchOne("SELECT COUNT(*) AS Count FROM FoodsSearch;")["Count"] == FetchOne(
+        "SELECT COUNT(*) AS Count FROM Foods;"
+    )["Count"]
+
+
+def test_GetFoodsPage_KeysetPagesAndFilters(test_user_id):
+    """Keyset pages cover every food once and filters apply to the total"""
+    OtherUserId = CreateSecondUser(test_user_id)
+    for Name, Owner, Favourite in [
+        ("Apple", test_user_id, True),
+        ("Bread, wholemeal", test_user_id, False),
+        ("Bread, white", OtherUserId, False),
+        ("Cheese", test_user_id, True),
+        ("Dates", OtherUserId, True)
+    ]:
+        UpsertFood(
+            Owner,
+            CreateFoodInput(
+                FoodName=Name,
+                ServingDescription="100g",
+                CaloriesPerServing=100,
+                ProteinPerServing=5,
+                IsFavourite=Favourite
+            )
+        )
+
+    Seen: list[str] = []
+    After = None
+    while True:
+        Page, Total = GetFoodsPage(test_user_id, Limit=2, After=After)
+        # Only the first page pays for the count
+        assert Total == (5 if After is None else None)
+        Seen.extend(Item.FoodName for Item in Page)
+        if len(Page) < 2:
+            break
+        After = EncodeFoodCursor(Page[-1])
+    assert Seen == ["Apple", "Bread, white", "Bread, wholemeal", "Cheese", "Dates"]
+
+    Mine, MineTotal = GetFoodsPage(test_user_id, Limit=10, MineOnly=True, FavouritesOnly=True)
+    assert [Item.FoodName for Item in Mine] == ["Apple", "Cheese"]
+    assert MineTotal == 2
+
+    _Manual, ManualTotal = GetFoodsPage(test_user_id, DataSource="manual")
+    assert ManualTotal == 5
+
+    with pytest.raises(ValueError):
+        GetFoodsPage(test_user_id, Limit=0)
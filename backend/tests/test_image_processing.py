@@ -0,0 +1,123 @@
+import base64
+import io
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from app.config import Settings
+from app.services import image_processing_service
+from app.services.food_lookup_service import LookupFoodByImage
+from app.services.image_processing_service import CloseImageProcessPool, PrepareImageForVision
+from app.utils.image_processing import PrepareImageBytes
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def BuildPhoto(Width: int, Height: int, Orientation: int | None = None) -> bytes:
+    Picture = Image.effect_mandelbrot((Width, Height), (-2.0, -1.2, 1.0, 1.2), 64).convert("RGB")
+    Exif = Image.Exif()
+    Exif[0x010F] = "PhoneMaker"
+    if Orientation is not None:
+        Exif[0x0112] = Orientation
+    Buffer = io.BytesIO()
+    Picture.save(Buffer, format="JPEG", quality=95, exif=Exif)
+    return Buffer.getvalue()
+
+
+def test_prepare_image_downscales_rotates_and_strips_metadata():
+    Original = BuildPhoto(3000, 2000, Orientation=6)
+
+    ContentHash, Prepared, PerceptualHash = PrepareImageBytes(Original, 1024, 80)
+
+    assert len(ContentHash) == 64
+    assert len(PerceptualHash) == 16
+    assert len(Prepared) < len(Original)
+    with Image.open(io.BytesIO(Prepared)) as Picture:
+        # Orientation 6 is a 90 degree turn, so the upright image is portrait.
+        assert Picture.size == (683, 1024)
+        assert len(Picture.getexif()) == 0
+
+
+def test_prepare_image_passes_through_when_disabled_or_undecodable():
+    Original = BuildPhoto(200, 100)
+
+    _Hash, Prepared, PerceptualHash = PrepareImageBytes(Original, 0, 80)
+    assert Prepared is None
+    assert PerceptualHash is not None
+
+    _Hash, Prepared, PerceptualHash = PrepareImageBytes(b"not an image", 1024, 80)
+    assert Prepared is None
+    assert PerceptualHash is None
+
+
+def test_prepare_image_keeps_smaller_clean_upload():
+    Picture = Image.new("RGB", (16, 16), (200, 40, 40))
+    Buffer = io.BytesIO()
+    Picture.save(Buffer, format="PNG")
+    Original = Buffer.getvalue()
+
+    _Hash, Prepared, PerceptualHash = PrepareImageBytes(Original, 1024, 80)
+    assert Prepared is None
+    assert PerceptualHash is not None
+
+    # Uploads carrying EXIF are always re-encoded so the metadata is dropped
+    _Hash, Prepared, _PerceptualHash = PrepareImageBytes(BuildPhoto(64, 48), 1024, 95)
+    assert Prepared is not None
+
+
+@pytest.mark.anyio
+async def test_prepare_image_for_vision_reads_upload_file_in_place(monkeypatch):
+    monkeypatch.setattr(Settings, "ImageProcessWorkers", 0)
+    Original = BuildPhoto(1600, 1200)
+
+    class TrackingFile(io.BytesIO):
+        LargestRead = 0
+
+        def read(self, Size=-1):
+            Chunk = super().read(Size)
+            TrackingFile.LargestRead = max(TrackingFile.LargestRead, len(Chunk))
+            return Chunk
+
+    FromFile = await PrepareImageForVision(TrackingFile(Original))
+    FromBytes = await PrepareImageForVision(Original)
+
+    assert FromFile == FromBytes
+    assert TrackingFile.LargestRead < len(Original)
+
+
+@pytest.mark.anyio
+async def test_prepare_image_for_vision_runs_in_process_pool(monkeypatch):
+    monkeypatch.setattr(Settings, "ImageProcessWorkers", 1)
+    Original = BuildPhoto(2000, 1500)
+    try:
+        VisionBytes, _ContentHash, _PerceptualHash = await PrepareImageForVision(Original)
+        assert image_processing_service._Pool is not None
+    finally:
+        CloseImageProcessPool()
+
+    assert image_processing_service._Pool is None
+    with Image.open(io.BytesIO(VisionBytes)) as Picture:
+        assert max(Picture.size) == Settings.ImageLookupMaxEdge
+
+
+@pytest.mark.anyio
+@patch("app.services.food_lookup_service.OpenOpenAiClient")
+async def test_image_lookup_sends_downscaled_image(MockOpenClient, temp_db, monkeypatch):
+    monkeypatch.setattr(Settings, "ImageProcessWorkers", 0)
+    MockResponse = Mock()
+    MockResponse.json.return_value = {
+        "choices": [{"message": {"content": json.dumps([{"FoodName": "Toast", "CaloriesPerServing": 80}])}}]
+    }
+    MockOpenClient.return_value.post = AsyncMock(return_value=MockResponse)
+    Original = BuildPhoto(2400, 1800)
+
+    await LookupFoodByImage(base64.b64encode(Original).decode("ascii"))
+
+    Payload = MockOpenClient.return_value.post.await_args.kwargs["json"]
+    Url = Payload["messages"][0]["content"][1]["image_url"]["url"]
+    Sent = base64.b64decode(Url.split(",", 1)[1])
+    assert len(Sent) < len(Original)
+    with Image.open(io.BytesIO(Sent)) as Picture:
+        assert Picture.size == (1024, 768)
+
@@ -0,0 +1,146 @@
+"""Tests for food lookup cache backends."""
+from time import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.models.schemas import FoodInfo
+from app.services.lookup_cache import (
+    LookupCacheBackend,
+    MemoryLookupCache,
+    SqliteAiLookupCache,
+    SqliteImageLookupCache,
+    SqliteLookupCache
+)
+from app.services.multi_source_lookup_service import MultiSourceFoodLookupService
+from app.utils.database import ExecuteQuery, FetchOne
+
+
+def test_memory_cache_evicts_least_recently_used():
+    Cache = MemoryLookupCache(MaxEntries=2, MaxBytes=10_000)
+    Cache.Set("a", {"Value": 1}, 60)
+    Cache.Set("b", {"Value": 2}, 60)
+    assert Cache.Get("a") == {"Value": 1}
+
+    Cache.Set("c", {"Value": 3}, 60)
+
+    assert Cache.Get("b") is None
+    assert Cache.Get("a") == {"Value": 1}
+    assert Cache.Get("c") == {"Value": 3}
+    assert Cache.GetStats()["evictions"] == 1
+
+
+def test_memory_cache_bounds_bytes_and_expires():
+    Cache = MemoryLookupCache(MaxEntries=100, MaxBytes=40)
+    Cache.Set("big", "x" * 100, 60)
+    assert Cache.Get("big") is None
+
+    Cache.Set("first", "x" * 20, 60)
+    Cache.Set("second", "y" * 20, 60)
+    Stats = Cache.GetStats()
+    assert Stats["total_entries"] == 1
+    assert Stats["total_bytes"] <= 40
+
+    Cache.Set("stale", 1, -1)
+    assert Cache.PurgeExpired() == 1
+    assert Cache.Get("second") == "y" * 20
+
+
+def test_sqlite_cache_round_trip_and_sweep(temp_db):
+    Cache = SqliteLookupCache(MaxEntries=2, MaxBytes=10_000)
+    Cache.Set("barcode:1", {"FoodName": "Milk"}, 60)
+    assert Cache.Get("barcode:1") == {"FoodName": "Milk"}
+
+    Cache.Set("barcode:2", {"FoodName": "Bread"}, -1)
+    assert Cache.Get("barcode:2") is None
+
+    Cache.Set("barcode:5", {"FoodName": "Jam"}, -1, 60)
+    assert Cache.Get("barcode:5") is None
+    assert Cache.GetEntry("barcode:5") == ({"FoodName": "Jam"}, True)
+    assert Cache.GetStats()["stale_entries"] == 1
+    Cache.Delete("barcode:5")
+
+    Cache.Set("barcode:3", {"FoodName": "Eggs"}, 60)
+    Cache.Set("barcode:4", {"FoodName": "Oats"}, 60)
+    ExecuteQuery("UPDATE LookupCache SET CreatedAt = ? WHERE CacheKey = 'barcode:1';", [time() - 100])
+
+    assert Cache.PurgeExpired() == 2
+    Stats = Cache.GetStats()
+    assert Stats["total_entries"] == 2
+    assert Stats["expired_entries"] == 0
+    assert FetchOne("SELECT 1 FROM LookupCache WHERE CacheKey = 'barcode:1';") is None
+
+
+def test_ai_cache_trims_least_recently_used(temp_db):
+    Cache = SqliteAiLookupCache(MaxEntries=2, MaxBytes=10_000)
+    Cache.Set("old", [{"FoodName": "Banana"}], 60)
+    Cache.Set("newer", [{"FoodName": "Apple"}], 60)
+    ExecuteQuery("UPDATE AiLookupCache SET CreatedAt = CreatedAt - 100 WHERE CacheKey = 'old';")
+
+    assert Cache.Get("old") == [{"FoodName": "Banana"}]
+    Cache.Set("newest", [{"FoodName": "Pear"}], 60)
+    assert Cache.PurgeExpired() == 1
+
+    assert Cache.Get("newer") is None
+    assert Cache.Get("old") == [{"FoodName": "Banana"}]
+    assert Cache.FlushHits() == 1
+    assert FetchOne("SELECT HitCount FROM AiLookupCache WHERE CacheKey = 'old';")["HitCount"] == 2
+    assert Cache.Clear() == 2
+
+
+def test_ai_cache_batches_hit_bookkeeping(temp_db):
+    Cache = SqliteAiLookupCache(MaxEntries=10, MaxBytes=10_000)
+    Cache.HitFlushSize = 2
+    Cache.Set("first", ["Banana"], 60)
+    Cache.Set("second", ["Apple"], 60)
+
+    assert Cache.Get("first") == ["Banana"]
+    assert Cache.Get("first") == ["Banana"]
+    assert FetchOne("SELECT HitCount FROM AiLookupCache WHERE CacheKey = 'first';")["HitCount"] == 0
+
+    assert Cache.Get("second") == ["Apple"]
+    Row = FetchOne("SELECT HitCount, LastUsedAt FROM AiLookupCache WHERE CacheKey = 'first';")
+    assert Row["HitCount"] == 2
+    assert Row["LastUsedAt"] is not None
+    assert Cache.FlushHits() == 0
+
+
+def test_cache_backend_is_abstract():
+    with pytest.raises(TypeError):
+        LookupCacheBackend(10, 1000)
+
+
+@pytest.mark.anyio
+async def test_search_results_persist_in_sqlite_cache(monkeypatch, temp_db):
+    monkeypatch.setattr(MultiSourceFoodLookupService, "_Cache", SqliteLookupCache(100, 100_000))
+    Product = FoodInfo(
+        FoodName="Bega Peanut Butter",
+        ServingDescription="100g",
+        CaloriesPerServing=624,
+        ProteinPerServing=23.9,
+        Metadata={"source": "openfoodfacts"}
+    )
+
+    with patch(
+        "app.services.multi_source_lookup_service.OpenFoodFactsService.SearchProducts",
+        new_callable=AsyncMock
+    ) as MockSearch:
+        MockSearch.return_value = [Product]
+        First = await MultiSourceFoodLookupService.Search("bega")
+        Second = await MultiSourceFoodLookupService.Search("bega")
+
+    assert MockSearch.await_count == 1
+    assert Second["openfoodfacts"][0] == First["openfoodfacts"][0]
+    assert MultiSourceFoodLookupService.GetCacheStats()["valid_entries"] == 1
+
+
+def test_image_cache_near_match_scans_only_recent_rows(temp_db):
+    Cache = SqliteImageLookupCache(MaxEntries=10, MaxBytes=100_000)
+    Cache.SetImage("old", "ffffffffffffffff", "v1", ["Soup"], 60)
+    Cache.SetImage("mid", "0000000000000000", "v1", ["Salad"], 60)
+    Cache.SetImage("new", "00000000ffffffff", "v1", ["Toast"], 60)
+    ExecuteQuery("UPDATE ImageLookupCache SET CreatedAt = CreatedAt - 100 WHERE CacheKey = 'old';")
+
+    assert Cache.GetImage("miss", "fffffffffffffffe", "v1", 6, 2) is None
+    assert Cache.GetImage("miss", "fffffffffffffffe", "v1", 6, 3) == ["Soup"]
+    assert Cache.GetImage("miss", "fffffffffffffffe", "v2", 6, 3) is None
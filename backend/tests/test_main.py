@@ -12,6 +12,7 @@ def test_app_imports():
 
 def test_lifespan_runs(monkeypatch):
     import app.main as main
+    from app.services import image_processing_service, openai_client
 
     called = {"migrations": 0, "seed": 0, "close": 0}
 
@@ -21,16 +22,15 @@ def test_lifespan_runs(monkeypatch):
     def FakeSeedDatabase() -> None:
         called["seed"] += 1
 
-    class DummyConnection:
-        def close(self) -> None:
-            called["close"] += 1
-
-    def FakeGetConnection() -> DummyConnection:
-        return DummyConnection()
+    def FakeClosePool() -> None:
+        called["close"] += 1
 
     monkeypatch.setattr(main, "RunMigrations", FakeRunMigrations)
     monkeypatch.setattr(main, "SeedDatabase", FakeSeedDatabase)
-    monkeypatch.setattr(main, "GetConnection", FakeGetConnection)
+    monkeypatch.setattr(main, "ClosePool", FakeClosePool)
+    monkeypatch.setattr(main, "GetPragmaProfile", lambda: {"journal_mode": "wal"})
+    monkeypatch.setattr(main.OpenFoodFactsService, "_Client", None)
+    monkeypatch.setattr(openai_client, "_AsyncClient", None)
 
     async def RunLifespan() -> None:
         async with main.Lifespan(main.App):
@@ -41,3 +41,7 @@ def test_lifespan_runs(monkeypatch):
     asyncio.run(RunLifespan())
 
     assert called == {"migrations": 1, "seed": 1, "close": 1}
+    assert main.OpenFoodFactsService._Client is None
+    assert openai_client._AsyncClient is None
+    assert main.MultiSourceFoodLookupService._SweepTask is None
+    assert image_processing_service._Pool is None
@@ -1,7 +1,9 @@
-from app.models.schemas import CreateFoodInput, CreateMealTemplateInput, UpdateMealTemplateInput, MealTemplateItemInput, MealType
-from app.services.daily_logs_service import GetDailyLogByDate, GetEntriesForLog
-from app.services.foods_service import UpsertFood
+from app.models.schemas import CreateFoodInput, CreateMealEntryInput, CreateMealTemplateInput, UpdateFoodInput, UpdateMealTemplateInput, MealTemplateItemInput, MealType
+from app.services import daily_logs_service
+from app.services.daily_logs_service import CreateMealEntry, EnsureDailyLogForDate, GetDailyLogByDate, GetEntriesForLog
+from app.services.foods_service import UpdateFood, UpsertFood
 from app.services.meal_templates_service import ApplyMealTemplate, CreateMealTemplate, UpdateMealTemplate, DeleteMealTemplate, GetMealTemplates
+from app.utils.database import FetchOne
 
 
 def test_create_apply_delete_template(test_user_id):
@@ -195,3 +197,163 @@ def test_update_meal_template(test_user_id):
     assert UpdatedTemplate3.Template.TemplateName == "Complete breakfast"
     assert len(UpdatedTemplate3.Items) == 3
 
+
+
+def test_template_entries_use_constant_query_count(test_user_id, monkeypatch):
+    Food = UpsertFood(
+        test_user_id,
+        CreateFoodInput(
+            FoodName="Toast",
+            ServingDescription="1 slice",
+            CaloriesPerServing=80,
+            ProteinPerServing=3,
+            FatPerServing=1.5,
+            IsFavourite=False
+        )
+    )
+    DailyLogItem = EnsureDailyLogForDate(test_user_id, "2024-01-06")
+    for Index in range(3):
+        Template = CreateMealTemplate(
+            test_user_id,
+            CreateMealTemplateInput(
+                TemplateName=f"Toast x{Index + 1}",
+                Items=[
+                    MealTemplateItemInput(
+                        FoodId=Food.FoodId,
+                        MealType=MealType.Breakfast,
+                        Quantity=Index + 1,
+                        EntryNotes=None,
+                        SortOrder=0
+                    )
+                ]
+            )
+        )
+        CreateMealEntry(
+            test_user_id,
+            CreateMealEntryInput(
+                DailyLogId=DailyLogItem.DailyLogId,
+                MealType=MealType.Breakfast,
+                MealTemplateId=Template.Template.MealTemplateId,
+                Quantity=1,
+                SortOrder=Index
+            )
+        )
+
+    QueryCount = 0
+    OriginalFetchAll = daily_logs_service.FetchAll
+
+    def CountingFetchAll(*Args, **Kwargs):
+        nonlocal QueryCount
+        QueryCount += 1
+        return OriginalFetchAll(*Args, **Kwargs)
+
+    monkeypatch.setattr(daily_logs_service, "FetchAll", CountingFetchAll)
+    Entries = GetEntriesForLog(test_user_id, DailyLogItem.DailyLogId)
+
+    assert QueryCount <= 2
+    assert [Entry.CaloriesPerServing for Entry in Entries] == [80, 160, 240]
+    assert [Entry.FatPerServing for Entry in Entries] == [1.5, 3.0, 4.5]
+
+
+def test_template_totals_follow_template_and_food_edits(test_user_id):
+    Food = UpsertFood(
+        test_user_id,
+        CreateFoodInput(
+            FoodName="Rice",
+            ServingDescription="1 cup",
+            CaloriesPerServing=200,
+            ProteinPerServing=4,
+            IsFavourite=False
+        )
+    )
+    Template = CreateMealTemplate(
+        test_user_id,
+        CreateMealTemplateInput(
+            TemplateName="Rice bowl",
+            Items=[
+                MealTemplateItemInput(
+                    FoodId=Food.FoodId,
+                    MealType=MealType.Dinner,
+                    Quantity=2,
+                    EntryNotes=None,
+                    SortOrder=0
+                )
+            ]
+        )
+    )
+    MealTemplateId = Template.Template.MealTemplateId
+
+    def LoadTotals():
+        return FetchOne(
+            "SELECT Calories, Protein FROM MealTemplateTotals WHERE MealTemplateId = ?;",
+            [MealTemplateId]
+        )
+
+    assert LoadTotals() == {"Calories": 400, "Protein": 8}
+
+    UpdateFood(test_user_id, Food.FoodId, UpdateFoodInput(CaloriesPerServing=250))
+    assert LoadTotals()["Calories"] == 500
+
+    UpdateMealTemplate(
+        test_user_id,
+        MealTemplateId,
+        UpdateMealTemplateInput(
+            Items=[
+                MealTemplateItemInput(
+                    FoodId=Food.FoodId,
+                    MealType=MealType.Dinner,
+                    Quantity=1,
+                    EntryNotes=None,
+                    SortOrder=0
+                )
+            ]
+        )
+    )
+    assert LoadTotals()["Calories"] == 250
+
+    DeleteMealTemplate(test_user_id, MealTemplateId)
+    assert LoadTotals() is None
+
+
+def test_apply_template_reuses_stored_servings(test_user_id, monkeypatch):
+    Food = UpsertFood(
+        test_user_id,
+        CreateFoodInput(
+            FoodName="Oat Milk",
+            ServingQuantity=250.0,
+            ServingUnit="mL",
+            CaloriesPerServing=120,
+            ProteinPerServing=3.0,
+            IsFavourite=False
+        )
+    )
+    Template = CreateMealTemplate(
+        test_user_id,
+        CreateMealTemplateInput(
+            TemplateName="Oat milk splash",
+            Items=[
+                MealTemplateItemInput(
+                    FoodId=Food.FoodId,
+                    MealType=MealType.Breakfast,
+                    Quantity=1,
+                    EntryQuantity=125,
+                    EntryUnit="mL",
+                    EntryNotes=None,
+                    SortOrder=0
+                )
+            ]
+        )
+    )
+
+    def FailingConvert(*_args, **_kwargs):
+        raise AssertionError("Applying a template should not convert units again.")
+
+    monkeypatch.setattr(daily_logs_service, "ConvertEntryToServings", FailingConvert)
+    ApplyResult = ApplyMealTemplate(test_user_id, Template.Template.MealTemplateId, "2024-01-07")
+    assert ApplyResult.CreatedCount == 1
+
+    LogItem = GetDailyLogByDate(test_user_id, "2024-01-07")
+    Entries = GetEntriesForLog(test_user_id, LogItem.DailyLogId)
+    assert Entries[0].Quantity == 0.5
+    assert Entries[0].EntryQuantity == 125
+    assert Entries[0].EntryUnit == "mL"
@@ -2,10 +2,13 @@
 Tests for multi-source food lookup service.
 """
 
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, patch
 from app.services.multi_source_lookup_service import MultiSourceFoodLookupService
 from app.models.schemas import FoodInfo
+from app.services.lookup_cache import MemoryLookupCache
 
 
 @pytest.mark.asyncio
@@ -97,3 +100,112 @@ def TestClearCache():
     
     Stats = MultiSourceFoodLookupService.GetCacheStats()
     assert Stats["total_entries"] == 0
+
+
+@pytest.mark.anyio
+async def test_concurrent_identical_searches_share_one_request(monkeypatch, temp_db):
+    """Identical in-flight searches await a single OpenFoodFacts call."""
+    monkeypatch.setattr(MultiSourceFoodLookupService, "_Cache", MemoryLookupCache(100, 100_000))
+    Release = asyncio.Event()
+    CoalescedBefore = MultiSourceFoodLookupService._CoalescedCount
+
+    async def WaitForCoalescedCallers():
+        while MultiSourceFoodLookupService._CoalescedCount - CoalescedBefore < 2:
+            await asyncio.sleep(0.01)
+
+    async def SlowSearch(Query, PageSize=10):
+        await Release.wait()
+        return [FoodInfo(FoodName="Vegemite", ServingDescription="5g", CaloriesPerServing=9)]
+
+    with patch(
+        "app.services.multi_source_lookup_service.OpenFoodFactsService.SearchProducts",
+        new_callable=AsyncMock,
+        side_effect=SlowSearch
+    ) as MockSearch:
+        Pending = [
+            asyncio.ensure_future(MultiSourceFoodLookupService.Search(Query))
+            for Query in ["vegemite", "Vegemite ", "VEGEMITE"]
+        ]
+        await asyncio.wait_for(WaitForCoalescedCallers(), timeout=5)
+        assert MultiSourceFoodLookupService.GetCacheStats()["in_flight"] == 1
+        Release.set()
+        Results = await asyncio.gather(*Pending)
+
+    assert MockSearch.await_count == 1
+    assert all(Result["openfoodfacts"][0].FoodName == "Vegemite" for Result in Results)
+    assert MultiSourceFoodLookupService._InFlight == {}
+
+
+@pytest.mark.anyio
+async def test_concurrent_barcode_lookups_share_one_request(monkeypatch, temp_db):
+    """A failed shared fetch resolves every waiter and is not cached."""
+    monkeypatch.setattr(MultiSourceFoodLookupService, "_Cache", MemoryLookupCache(100, 100_000))
+
+    Release = asyncio.Event()
+    CoalescedBefore = MultiSourceFoodLookupService._CoalescedCount
+
+    async def FailingLookup(Barcode):
+        await Release.wait()
+        raise Exception("Network error")
+
+    async def ReleaseWhenCoalesced():
+        while MultiSourceFoodLookupService._CoalescedCount - CoalescedBefore < 2:
+            await asyncio.sleep(0.01)
+        Release.set()
+
+    with patch(
+        "app.services.multi_source_lookup_service.OpenFoodFactsService.GetProductByBarcode",
+        new_callable=AsyncMock,
+        side_effect=FailingLookup
+    ) as MockBarcode:
+        Results, _Released = await asyncio.gather(
+            asyncio.gather(*[
+                MultiSourceFoodLookupService.GetByBarcode("9300633000000") for _ in range(3)
+            ]),
+            asyncio.wait_for(ReleaseWhenCoalesced(), timeout=5)
+        )
+
+    assert Results == [None, None, None]
+    assert MockBarcode.await_count == 1
+
+
+@pytest.mark.anyio
+async def test_unknown_barcode_is_cached_as_not_found(monkeypatch, temp_db):
+    """Repeat scans of an unknown barcode stay local until the negative TTL lapses."""
+    monkeypatch.setattr(MultiSourceFoodLookupService, "_Cache", MemoryLookupCache(100, 100_000))
+
+    with patch(
+        "app.services.multi_source_lookup_service.OpenFoodFactsService.GetProductByBarcode",
+        new_callable=AsyncMock
+    ) as MockBarcode:
+        MockBarcode.return_value = None
+        First = await MultiSourceFoodLookupService.GetByBarcode("0000000000")
+        Second = await MultiSourceFoodLookupService.GetByBarcode("0000000000")
+
+    assert First is None and Second is None
+    assert MockBarcode.await_count == 1
+
+
+@pytest.mark.anyio
+async def test_stale_barcode_is_served_while_refreshing(monkeypatch, temp_db):
+    """An expired entry is returned at once and refreshed in the background."""
+    Cache = MemoryLookupCache(100, 100_000)
+    monkeypatch.setattr(MultiSourceFoodLookupService, "_Cache", Cache)
+    OldProduct = FoodInfo(FoodName="Old Label", ServingDescription="100g", CaloriesPerServing=100)
+    NewProduct = FoodInfo(FoodName="New Label", ServingDescription="100g", CaloriesPerServing=110)
+    Cache.Set("barcode:9300000000001", OldProduct.model_dump(mode="json"), -1, 60)
+
+    with patch(
+        "app.services.multi_source_lookup_service.OpenFoodFactsService.GetProductByBarcode",
+        new_callable=AsyncMock
+    ) as MockBarcode:
+        MockBarcode.return_value = NewProduct
+        Result = await MultiSourceFoodLookupService.GetByBarcode("9300000000001")
+        assert Result is not None and Result.FoodName == "Old Label"
+
+        await asyncio.gather(*MultiSourceFoodLookupService._InFlight.values())
+        Refreshed = await MultiSourceFoodLookupService.GetByBarcode("9300000000001")
+
+    assert Refreshed is not None and Refreshed.FoodName == "New Label"
+    assert MockBarcode.await_count == 1
+    assert Cache.GetStats()["stale_hits"] == 1
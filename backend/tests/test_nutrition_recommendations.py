@@ -28,7 +28,8 @@ def test_calculate_age():
     assert Age2 >= ExpectedAge2 - 1 and Age2 <= ExpectedAge2
 
 
-def test_get_ai_nutrition_recommendations_success(monkeypatch):
+@pytest.mark.anyio
+async def test_get_ai_nutrition_recommendations_success(monkeypatch):
     """Test successful AI nutrition recommendations."""
     Age = 34
     HeightCm = 175
@@ -51,10 +52,10 @@ def test_get_ai_nutrition_recommendations_success(monkeypatch):
 ```"""
 
     with patch(
-        "app.services.nutrition_recommendations_service.GetOpenAiContentWithModel",
+        "app.services.nutrition_recommendations_service.GetOpenAiContentWithModelAsync",
         return_value=(Content, "gpt-4.1")
     ):
-        Result, ModelUsed = GetAiNutritionRecommendations(Age, HeightCm, WeightKg, ActivityLevel)
+        Result, ModelUsed = await GetAiNutritionRecommendations(Age, HeightCm, WeightKg, ActivityLevel)
 
         assert isinstance(Result, NutritionRecommendation)
         assert Result.DailyCalorieTarget == 2500
@@ -70,7 +71,8 @@ def test_get_ai_nutrition_recommendations_success(monkeypatch):
         assert ModelUsed == "gpt-4.1"
 
 
-def test_get_ai_nutrition_recommendations_minimal(monkeypatch):
+@pytest.mark.anyio
+async def test_get_ai_nutrition_recommendations_minimal(monkeypatch):
     """Test AI recommendations with only required fields."""
     Age = 29
     HeightCm = 160
@@ -85,10 +87,10 @@ def test_get_ai_nutrition_recommendations_minimal(monkeypatch):
 }"""
 
     with patch(
-        "app.services.nutrition_recommendations_service.GetOpenAiContentWithModel",
+        "app.services.nutrition_recommendations_service.GetOpenAiContentWithModelAsync",
         return_value=(Content, "gpt-4o-mini")
     ):
-        Result, ModelUsed = GetAiNutritionRecommendations(Age, HeightCm, WeightKg, ActivityLevel)
+        Result, ModelUsed = await GetAiNutritionRecommendations(Age, HeightCm, WeightKg, ActivityLevel)
 
         assert isinstance(Result, NutritionRecommendation)
         assert Result.DailyCalorieTarget == 1600
@@ -100,7 +102,8 @@ def test_get_ai_nutrition_recommendations_minimal(monkeypatch):
         assert ModelUsed == "gpt-4o-mini"
 
 
-def test_get_ai_nutrition_recommendations_api_error(monkeypatch):
+@pytest.mark.anyio
+async def test_get_ai_nutrition_recommendations_api_error(monkeypatch):
     """Test handling of OpenAI API errors."""
     Age = 34
     HeightCm = 175
@@ -108,16 +111,17 @@ def test_get_ai_nutrition_recommendations_api_error(monkeypatch):
     ActivityLevel = "moderately_active"
 
     with patch(
-        "app.services.nutrition_recommendations_service.GetOpenAiContentWithModel",
+        "app.services.nutrition_recommendations_service.GetOpenAiContentWithModelAsync",
         side_effect=Exception("OpenAI API error: 500")
     ):
         with pytest.raises(Exception) as ExcInfo:
-            GetAiNutritionRecommendations(Age, HeightCm, WeightKg, ActivityLevel)
+            await GetAiNutritionRecommendations(Age, HeightCm, WeightKg, ActivityLevel)
 
         assert "OpenAI API error" in str(ExcInfo.value)
 
 
-def test_get_ai_nutrition_recommendations_invalid_response(monkeypatch):
+@pytest.mark.anyio
+async def test_get_ai_nutrition_recommendations_invalid_response(monkeypatch):
     """Test handling of invalid AI response format."""
     Age = 34
     HeightCm = 175
@@ -127,16 +131,17 @@ def test_get_ai_nutrition_recommendations_invalid_response(monkeypatch):
     Content = "This is an invalid response without proper JSON."
 
     with patch(
-        "app.services.nutrition_recommendations_service.GetOpenAiContentWithModel",
+        "app.services.nutrition_recommendations_service.GetOpenAiContentWithModelAsync",
         return_value=(Content, "gpt-4.1")
     ):
         with pytest.raises(ValueError) as ExcInfo:
-            GetAiNutritionRecommendations(Age, HeightCm, WeightKg, ActivityLevel)
+            await GetAiNutritionRecommendations(Age, HeightCm, WeightKg, ActivityLevel)
 
         assert "Invalid AI response format" in str(ExcInfo.value)
 
 
-def test_get_ai_nutrition_recommendations_extra_active(monkeypatch):
+@pytest.mark.anyio
+async def test_get_ai_nutrition_recommendations_extra_active(monkeypatch):
     """Test recommendations for extra active user."""
     Age = 39
     HeightCm = 180
@@ -156,10 +161,10 @@ def test_get_ai_nutrition_recommendations_extra_active(monkeypatch):
 ```"""
 
     with patch(
-        "app.services.nutrition_recommendations_service.GetOpenAiContentWithModel",
+        "app.services.nutrition_recommendations_service.GetOpenAiContentWithModelAsync",
         return_value=(Content, "gpt-4.1")
     ):
-        Result, ModelUsed = GetAiNutritionRecommendations(Age, HeightCm, WeightKg, ActivityLevel)
+        Result, ModelUsed = await GetAiNutritionRecommendations(Age, HeightCm, WeightKg, ActivityLevel)
 
         assert Result.DailyCalorieTarget >= 3000
         assert Result.ProteinTargetMin >= 130
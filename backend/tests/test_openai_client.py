@@ -0,0 +1,47 @@
+"""Tests for the shared async OpenAI client."""
+import json
+
+import httpx
+import pytest
+
+from app.config import Settings
+from app.services import openai_client
+from app.services.openai_client import CloseOpenAiClient, GetOpenAiContentWithModelAsync, OpenOpenAiClient
+
+
+@pytest.mark.anyio
+async def test_async_content_falls_back_on_shared_client(monkeypatch):
+    """Model fallbacks reuse the pooled client instead of opening new connections."""
+    Requests: list[httpx.Request] = []
+
+    def Handler(Request: httpx.Request) -> httpx.Response:
+        Requests.append(Request)
+        Model = json.loads(Request.content)["model"]
+        if Model == "missing-model":
+            return httpx.Response(404, json={"error": {"code": "model_not_found"}})
+        return httpx.Response(200, json={
+            "model": Model,
+            "choices": [{"message": {"content": "ok"}}]
+        })
+
+    monkeypatch.setattr(Settings, "OpenAiApiKey", "test-key")
+    monkeypatch.setattr(Settings, "OpenAiModel", "missing-model")
+    monkeypatch.setattr(Settings, "OpenAiFallbackModels", "gpt-4o-mini")
+    monkeypatch.setattr(Settings, "OpenAiBaseUrl", "http://test/v1/chat/completions")
+    monkeypatch.setattr(openai_client, "_AsyncClient", httpx.AsyncClient(transport=httpx.MockTransport(Handler)))
+    SharedClient = OpenOpenAiClient()
+
+    Content, ModelUsed = await GetOpenAiContentWithModelAsync(
+        [{"role": "user", "content": "hi"}],
+        Temperature=0.2
+    )
+
+    assert Content == "ok"
+    assert ModelUsed == "gpt-4o-mini"
+    assert len(Requests) == 2
+    assert Requests[0].headers["Authorization"] == "Bearer test-key"
+    assert OpenOpenAiClient() is SharedClient
+
+    await CloseOpenAiClient()
+    assert SharedClient.is_closed
+    assert openai_client._AsyncClient is None
@@ -0,0 +1,132 @@
+"""Tests for the local OpenFoodFacts product index."""
+import gzip
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.models.schemas import FoodInfo
+from app.services.lookup_cache import MemoryLookupCache
+from app.services.multi_source_lookup_service import MultiSourceFoodLookupService
+from app.services.openfoodfacts_index_service import (
+    GetLocalProductByBarcode,
+    ImportOpenFoodFactsDump,
+    SearchLocalProducts
+)
+
+
+def WriteJsonlDump(FilePath, Products):
+    with gzip.open(FilePath, "wt", encoding="utf-8") as Handle:
+        for Product in Products:
+            Handle.write(json.dumps(Product) + "\n")
+
+
+def test_import_jsonl_keeps_australian_products(temp_db, tmp_path):
+    DumpPath = tmp_path / "products.jsonl.gz"
+    WriteJsonlDump(DumpPath, [
+        {
+            "code": "9300650000011",
+            "product_name": "Crunchy Peanut Butter",
+            "brands": "Bega",
+            "serving_quantity": 20,
+            "countries_tags": ["en:australia"],
+            "nutriments": {"energy-kcal_100g": 620, "proteins_100g": 25}
+        },
+        {
+            "code": "3017620422003",
+            "product_name": "Nutella",
+            "countries_tags": ["en:france"],
+            "nutriments": {"energy-kcal_100g": 539}
+        },
+        {"code": "9300650000028", "product_name": "", "countries_tags": ["en:australia"]}
+    ])
+
+    Counts = ImportOpenFoodFactsDump(DumpPath, BatchSize=1)
+
+    assert Counts == {"read": 3, "imported": 1, "skipped": 2}
+    Product = GetLocalProductByBarcode("9300650000011")
+    assert Product is not None
+    assert Product.FoodName == "Bega Crunchy Peanut Butter"
+    assert Product.CaloriesPerServing == 124
+    assert GetLocalProductByBarcode("3017620422003") is None
+    assert [Item.FoodName for Item in SearchLocalProducts("peanut BEGA")] == ["Bega Crunchy Peanut Butter"]
+    assert SearchLocalProducts("100%") == []
+
+
+def test_import_csv_export(temp_db, tmp_path):
+    DumpPath = tmp_path / "products.csv"
+    Header = ["code", "product_name", "brands", "countries_tags", "energy-kcal_100g", "proteins_100g"]
+    Rows = [
+        ["9300617000014", "Vegemite", "Bega", "en:australia,en:new-zealand", "180", "25.1"],
+        ["0000000000017", "Marmite", "Unilever", "en:united-kingdom", "250", "34"]
+    ]
+    DumpPath.write_text("\n".join("\t".join(Row) for Row in [Header] + Rows) + "\n", encoding="utf-8")
+
+    Counts = ImportOpenFoodFactsDump(DumpPath)
+
+    assert Counts["imported"] == 1
+    Product = GetLocalProductByBarcode("9300617000014")
+    assert Product is not None and Product.ProteinPerServing == 25.1
+
+
+@pytest.mark.anyio
+async def test_barcode_lookup_uses_local_index_first(monkeypatch, temp_db, tmp_path):
+    monkeypatch.setattr(MultiSourceFoodLookupService, "_Cache", MemoryLookupCache(100, 100_000))
+    DumpPath = tmp_path / "products.jsonl.gz"
+    WriteJsonlDump(DumpPath, [{
+        "code": "9310072000015",
+        "product_name": "Tim Tam Original",
+        "brands": "Arnott's",
+        "countries_tags": ["en:australia"],
+        "nutriments": {"energy-kcal_100g": 510}
+    }])
+    ImportOpenFoodFactsDump(DumpPath)
+
+    with patch(
+        "app.services.multi_source_lookup_service.OpenFoodFactsService.GetProductByBarcode",
+        new_callable=AsyncMock
+    ) as MockBarcode:
+        Result = await MultiSourceFoodLookupService.GetByBarcode("9310072000015")
+
+    assert Result is not None and Result.FoodName == "Arnott's Tim Tam Original"
+    MockBarcode.assert_not_awaited()
+
+
+@pytest.mark.anyio
+async def test_search_merges_weak_local_matches_with_live_results(monkeypatch, temp_db, tmp_path):
+    monkeypatch.setattr(MultiSourceFoodLookupService, "_Cache", MemoryLookupCache(100, 100_000))
+    DumpPath = tmp_path / "products.jsonl.gz"
+    WriteJsonlDump(DumpPath, [{
+        "code": "9300650000011",
+        "product_name": "Crunchy Peanut Butter",
+        "brands": "Bega",
+        "countries_tags": ["en:australia"],
+        "nutriments": {"energy-kcal_100g": 620}
+    }])
+    ImportOpenFoodFactsDump(DumpPath)
+    LiveProduct = FoodInfo(FoodName="Bega Crunch Bar", ServingDescription="1 bar")
+
+    with patch(
+        "app.services.multi_source_lookup_service.OpenFoodFactsService.SearchProducts",
+        new_callable=AsyncMock,
+        return_value=[LiveProduct]
+    ) as MockSearch:
+        Confident = await MultiSourceFoodLookupService.Search("bega peanut")
+        MockSearch.assert_not_awaited()
+        Merged = await MultiSourceFoodLookupService.Search("bega crunch")
+
+    assert [Item.FoodName for Item in Confident["openfoodfacts"]] == ["Bega Crunchy Peanut Butter"]
+    assert [Item.FoodName for Item in Merged["openfoodfacts"]] == ["Bega Crunchy Peanut Butter", "Bega Crunch Bar"]
+    MockSearch.assert_awaited_once()
+
+
+def test_reimport_keeps_search_index_in_sync(temp_db, tmp_path):
+    DumpPath = tmp_path / "products.jsonl.gz"
+    Product = {"code": "9300617000014", "product_name": "Vegemite", "countries_tags": ["en:australia"]}
+    WriteJsonlDump(DumpPath, [Product])
+    ImportOpenFoodFactsDump(DumpPath)
+    WriteJsonlDump(DumpPath, [{**Product, "product_name": "Vegemite Squeezy"}])
+    ImportOpenFoodFactsDump(DumpPath)
+
+    assert [Item.FoodName for Item in SearchLocalProducts("squeez")] == ["Vegemite Squeezy"]
+    assert len(SearchLocalProducts("vegemite")) == 1
@@ -2,7 +2,9 @@
 Tests for OpenFoodFacts service integration.
 """
 
+import httpx
 import pytest
+from app.config import Settings
 from app.services.openfoodfacts_service import OpenFoodFactsService
 
 
@@ -123,3 +125,83 @@ async def TestParseProductWithoutName():
     Result = OpenFoodFactsService._ParseProduct(ProductData)
     
     assert Result is None
+
+
+def test_parse_product_reads_quantity_from_serving_size():
+    ProductData = {
+        "code": "1234567890123",
+        "product_name": "Toast Bread",
+        "serving_size": "2 slices (56 g)",
+        "nutriments": {"energy-kcal_100g": 250, "proteins_100g": 10}
+    }
+    
+    Result = OpenFoodFactsService._ParseProduct(ProductData)
+    
+    assert Result.ServingDescription == "2 slices (56 g)"
+    assert Result.CaloriesPerServing == 140
+    assert Result.ProteinPerServing == 5.6
+    assert Result.Metadata["serving_quantity"] == 56
+    assert Result.Metadata["serving_unit"] == "g"
+
+
+def test_parse_product_keeps_per_100g_units_for_unparsed_serving_size():
+    ProductData = {
+        "code": "1234567890123",
+        "product_name": "Orange Juice",
+        "serving_size": "1 cup",
+        "nutriments": {"energy-kcal_100g": 45}
+    }
+    
+    Result = OpenFoodFactsService._ParseProduct(ProductData)
+    
+    assert Result.ServingDescription == "100g"
+    assert Result.CaloriesPerServing == 45
+    assert Result.Metadata["serving_size"] == "1 cup"
+    assert Result.Metadata["serving_quantity"] is None
+
+
+@pytest.mark.anyio
+async def test_shared_client_reuses_connection_pool(monkeypatch):
+    """Barcode lookups reuse one application-scoped client."""
+    Requests = []
+
+    def Handler(Request: httpx.Request) -> httpx.Response:
+        Requests.append(Request)
+        return httpx.Response(
+            200,
+            json={"status": 1, "product": {"code": "123", "product_name": "Oats", "nutriments": {}}}
+        )
+
+    monkeypatch.setattr(
+        OpenFoodFactsService,
+        "_Client",
+        httpx.AsyncClient(transport=httpx.MockTransport(Handler), headers={"User-Agent": OpenFoodFactsService.USER_AGENT})
+    )
+    SharedClient = OpenFoodFactsService.OpenClient()
+
+    First = await OpenFoodFactsService.GetProductByBarcode("123")
+    Second = await OpenFoodFactsService.GetProductByBarcode("123")
+
+    assert First is not None and Second is not None
+    assert OpenFoodFactsService.OpenClient() is SharedClient
+    assert len(Requests) == 2
+    assert Requests[0].headers["User-Agent"] == OpenFoodFactsService.USER_AGENT
+
+    await OpenFoodFactsService.CloseClient()
+    assert SharedClient.is_closed
+    assert OpenFoodFactsService._Client is None
+
+
+@pytest.mark.anyio
+async def test_open_client_applies_configured_limits(monkeypatch):
+    """The lazily created client picks up timeout settings."""
+    monkeypatch.setattr(OpenFoodFactsService, "_Client", None)
+    monkeypatch.setattr(Settings, "OpenFoodFactsTimeoutSeconds", 7.5)
+    monkeypatch.setattr(Settings, "OpenFoodFactsConnectTimeoutSeconds", 2.0)
+
+    Client = OpenFoodFactsService.OpenClient()
+    try:
+        assert Client.timeout.read == 7.5
+        assert Client.timeout.connect == 2.0
+    finally:
+        await OpenFoodFactsService.CloseClient()
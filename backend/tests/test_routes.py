@@ -1,6 +1,8 @@
 import uuid
 
+import httpx
 import pytest
+from fastapi import HTTPException, Response
 from starlette.requests import Request
 
 from app.config import Settings
@@ -19,9 +21,12 @@ from app.models.schemas import (
     ScheduleSlotInput,
     StepUpdateInput,
     Suggestion,
+    SummaryBucketSize,
+    UpdateMealTemplateInput,
     UpdateSettingsInput,
     User
 )
+from app.routes.admin_users import GetAiLookupCacheStatsRoute, PurgeAiLookupCacheRoute
 from app.routes.ai_suggestions import GetAiSuggestionsRoute
 from app.routes.auth import (
     CreateInvite,
@@ -41,20 +46,25 @@ from app.routes.daily_logs import (
     GetDailyLog,
     UpdateStepsRoute
 )
-from app.routes.foods import CreateFood, ListFoods
+from app.routes.food_lookup import LookupByImageUpload
+from app.routes.foods import CreateFood, ListFoods, SearchFoodsRoute
 from app.routes.health import GetHealth
 from app.routes.meal_templates import (
     ApplyMealTemplateRoute,
     CreateMealTemplateRoute,
     DeleteMealTemplateRoute,
-    ListMealTemplates
+    ListMealTemplates,
+    UpdateMealTemplateRoute
 )
 from app.routes.schedule import ListScheduleSlots, UpdateScheduleSlotsRoute
 from app.routes.settings import GetSettingsRoute, UpdateSettingsRoute
-from app.routes.summary import GetWeeklySummaryRoute
+from app.routes.summary import GetRangeSummaryRoute, GetWeeklySummaryRoute
+from app.services import serving_conversion_service
+from app.services.ai_lookup_cache_service import GetAiLookupCache
+from app.services.food_lookup_service import FoodLookupResult
 from app.services.auth_service import CreateInviteForEmail
 from app.services.daily_logs_service import UpsertDailyLog
-from app.services.foods_service import UpsertFood
+from app.services.foods_service import DefaultFoodPageSize, UpsertFood
 from app.utils.auth import HashPassword
 from app.utils.database import ExecuteQuery, FetchOne
 
@@ -99,6 +109,27 @@ def BuildRequest(UserId: str | None = None) -> Request:
     return Request(scope)
 
 
+def BuildUploadRequest(Files: dict, ChunkSize: int = 4096) -> Request:
+    Upload = httpx.Request("POST", "http://testserver/api/food-lookup/image/upload", files=Files)
+    Body = Upload.read()
+    Chunks = [Body[Start:Start + ChunkSize] for Start in range(0, len(Body), ChunkSize)]
+
+    async def Receive():
+        Chunk = Chunks.pop(0)
+        return {"type": "http.request", "body": Chunk, "more_body": bool(Chunks)}
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/api/food-lookup/image/upload",
+        "scheme": "http",
+        "server": ("testserver", 80),
+        # Leave out Content-Length so the streaming cap is what rejects large bodies.
+        "headers": [(b"content-type", Upload.headers["content-type"].encode("latin-1"))]
+    }
+    return Request(scope, Receive)
+
+
 @pytest.mark.anyio
 async def test_health_and_food_routes(temp_db):
     user = User(UserId="User-1", Email="user@example.com", FirstName=None, LastName=None, IsAdmin=False)
@@ -117,8 +148,46 @@ async def test_health_and_food_routes(temp_db):
     )
     assert Food.Food.FoodName == "Oats"
 
-    Foods = await ListFoods(CurrentUser=user)
+    ListResponse = Response()
+    Foods = await ListFoods(Response=ListResponse, CurrentUser=user)
     assert len(Foods.Foods) == 1
+    assert ListResponse.headers["X-Total-Count"] == "1"
+    assert Foods.NextCursor is None
+
+    with pytest.raises(HTTPException) as ErrorInfo:
+        await ListFoods(Response=Response(), After="no-separator", Limit=10, CurrentUser=user)
+    assert ErrorInfo.value.status_code == 400
+
+    Matches = await SearchFoodsRoute(Q="oa", Limit=5, CurrentUser=user)
+    assert [Item.FoodName for Item in Matches.Foods] == ["Oats"]
+
+
+@pytest.mark.anyio
+async def test_food_list_defaults_to_a_bounded_page(temp_db):
+    user = User(UserId="User-1", Email="user@example.com", FirstName=None, LastName=None, IsAdmin=False)
+    for Index in range(DefaultFoodPageSize + 1):
+        UpsertFood(
+            user.UserId,
+            CreateFoodInput(
+                FoodName=f"Food {Index:03d}",
+                ServingDescription="1 serve",
+                CaloriesPerServing=100,
+                ProteinPerServing=5,
+                IsFavourite=False
+            )
+        )
+
+    FirstResponse = Response()
+    FirstPage = await ListFoods(Response=FirstResponse, CurrentUser=user)
+    assert len(FirstPage.Foods) == DefaultFoodPageSize
+    assert FirstPage.NextCursor is not None
+    assert FirstResponse.headers["X-Total-Count"] == str(DefaultFoodPageSize + 1)
+
+    NextResponse = Response()
+    NextPage = await ListFoods(Response=NextResponse, After=FirstPage.NextCursor, CurrentUser=user)
+    assert [Item.FoodName for Item in NextPage.Foods] == [f"Food {DefaultFoodPageSize:03d}"]
+    assert NextPage.NextCursor is None
+    assert "X-Total-Count" not in NextResponse.headers
 
 
 @pytest.mark.anyio
@@ -297,6 +366,26 @@ async def test_summary_route(temp_db):
     Summary = await GetWeeklySummaryRoute(StartDate="2024-02-03", CurrentUser=user)
     assert Summary.WeeklySummary.Totals["TotalCalories"] == 1200
 
+    RangeResult = await GetRangeSummaryRoute(
+        Start="2024-01-29",
+        End="2024-02-11",
+        Bucket=SummaryBucketSize.Week,
+        CurrentUser=user
+    )
+    Buckets = RangeResult.RangeSummary.Buckets
+    assert [Bucket.BucketStart for Bucket in Buckets] == ["2024-01-29", "2024-02-05"]
+    assert Buckets[0].DayCount == 2
+    assert Buckets[0].Totals["TotalCalories"] == 1200
+    assert Buckets[1].DayCount == 0
+
+    with pytest.raises(HTTPException) as ErrorInfo:
+        await GetRangeSummaryRoute(Start="2024-02-11", End="2024-02-01", Bucket=SummaryBucketSize.Day, CurrentUser=user)
+    assert ErrorInfo.value.status_code == 400
+
+    with pytest.raises(HTTPException) as ErrorInfo:
+        await GetWeeklySummaryRoute(StartDate="2024-02-3x", CurrentUser=user)
+    assert ErrorInfo.value.status_code == 400
+
 
 @pytest.mark.anyio
 async def test_auth_routes_basic(temp_db):
@@ -411,10 +500,144 @@ async def test_google_flow_routes(temp_db, monkeypatch):
 async def test_ai_suggestions_route(monkeypatch, temp_db):
     user = User(UserId="User-2", Email="ai@example.com", FirstName=None, LastName=None, IsAdmin=False)
 
-    def DummySuggestions(_user_id, _log_date):
+    async def DummySuggestions(_user_id, _log_date):
         return [Suggestion(SuggestionType="AiSuggestion", Title="Test", Detail="Detail")], "gpt-5-mini"
 
     monkeypatch.setattr("app.routes.ai_suggestions.GetAiSuggestions", DummySuggestions)
 
     Response = await GetAiSuggestionsRoute(LogDate="2024-02-01", CurrentUser=user)
     assert Response.Suggestions[0].Title == "Test"
+
+
+@pytest.mark.anyio
+async def test_ai_lookup_cache_admin_routes(temp_db):
+    AdminId = CreateUser("admin@example.com", "AdminPassword123", True)
+    admin = User(UserId=AdminId, Email="admin@example.com", FirstName=None, LastName=None, IsAdmin=True)
+    GetAiLookupCache().Set("text-key", [{"FoodName": "Banana"}], 60)
+    GetAiLookupCache().Set("expired-key", [{"FoodName": "Apple"}], -1)
+
+    Stats = await GetAiLookupCacheStatsRoute(AdminUser=admin)
+    assert Stats["total_entries"] == 2
+    assert Stats["expired_entries"] == 1
+
+    Purged = await PurgeAiLookupCacheRoute(All=False, AdminUser=admin)
+    assert Purged.RemovedCount == 1
+    Purged = await PurgeAiLookupCacheRoute(All=True, AdminUser=admin)
+    assert Purged.RemovedCount == 1
+
+
+@pytest.mark.anyio
+async def test_image_upload_route_streams_multipart_file(monkeypatch):
+    user = User(UserId="User-1", Email="user@example.com", FirstName=None, LastName=None, IsAdmin=False)
+    Received: list[bytes] = []
+
+    async def FakeLookup(File, Size: int):
+        Received.append(File.read())
+        assert Size == len(Received[-1])
+        return [FoodLookupResult(FoodName="Toast", ServingQuantity=1, ServingUnit="slice", CaloriesPerServing=80, ProteinPerServing=3)]
+
+    monkeypatch.setattr("app.routes.food_lookup.LookupFoodByImageFile", FakeLookup)
+    monkeypatch.setattr(Settings, "ImageUploadMaxBytes", 100_000)
+    Photo = b"\xff\xd8" + b"x" * 20_000
+
+    Response = await LookupByImageUpload(
+        RequestValue=BuildUploadRequest({"Image": ("meal.jpg", Photo, "image/jpeg")}),
+        CurrentUser=user
+    )
+    assert Response.Results[0].FoodName == "Toast"
+    assert Received == [Photo]
+
+    with pytest.raises(HTTPException) as ErrorInfo:
+        await LookupByImageUpload(
+            RequestValue=BuildUploadRequest({"Image": ("meal.jpg", b"x" * 200_000, "image/jpeg")}),
+            CurrentUser=user
+        )
+    assert ErrorInfo.value.status_code == 413
+
+    with pytest.raises(HTTPException) as ErrorInfo:
+        await LookupByImageUpload(
+            RequestValue=BuildUploadRequest({"Other": ("notes.txt", b"hello", "text/plain")}),
+            CurrentUser=user
+        )
+    assert ErrorInfo.value.status_code == 400
+    assert len(Received) == 1
+
+
+@pytest.mark.anyio
+async def test_rejected_entries_and_templates_make_no_ai_conversion_call(temp_db, monkeypatch):
+    Calls: list[str] = []
+
+    async def FakeGetOpenAiContentAsync(Messages, **_kwargs):
+        Calls.append(Messages[-1]["content"])
+        return '{"Servings": 0.5, "ConversionDetail": "1 cup of oats weighs about 90 g."}'
+
+    monkeypatch.setattr(serving_conversion_service, "GetOpenAiContentAsync", FakeGetOpenAiContentAsync)
+    OwnerId = CreateUser("owner@example.com", "Password123", False)
+    OtherId = CreateUser("other@example.com", "Password123", False)
+    Owner = User(UserId=OwnerId, Email="owner@example.com", FirstName=None, LastName=None, IsAdmin=False)
+    Other = User(UserId=OtherId, Email="other@example.com", FirstName=None, LastName=None, IsAdmin=False)
+    Food = UpsertFood(
+        OwnerId,
+        CreateFoodInput(
+            FoodName="Rolled Oats",
+            ServingQuantity=1.0,
+            ServingUnit="cup",
+            CaloriesPerServing=300,
+            ProteinPerServing=10.0,
+            IsFavourite=False
+        )
+    )
+    OwnerLog = UpsertDailyLog(
+        OwnerId,
+        CreateDailyLogInput(LogDate="2024-02-05", Steps=0, StepKcalFactorOverride=None)
+    )
+    # Grams need an AI-learned factor for a cup-based food
+    Item = MealTemplateItemInput(
+        FoodId=Food.FoodId,
+        MealType=MealType.Breakfast,
+        Quantity=1,
+        EntryQuantity=45,
+        EntryUnit="g",
+        SortOrder=0
+    )
+    Template = await CreateMealTemplateRoute(
+        Input=CreateMealTemplateInput(TemplateName="Oats", Items=[Item]),
+        CurrentUser=Owner
+    )
+    assert len(Calls) == 1
+    Calls.clear()
+
+    with pytest.raises(HTTPException) as ErrorInfo:
+        await CreateMealEntryRoute(
+            CreateMealEntryInput(
+                DailyLogId=OwnerLog.DailyLogId,
+                MealType=MealType.Breakfast,
+                FoodId=Food.FoodId,
+                Quantity=1,
+                EntryQuantity=100,
+                EntryUnit="g",
+                SortOrder=0
+            ),
+            CurrentUser=Other
+        )
+    assert ErrorInfo.value.status_code == 400
+
+    with pytest.raises(HTTPException) as ErrorInfo:
+        await CreateMealTemplateRoute(
+            Input=CreateMealTemplateInput(
+                TemplateName="Oats",
+                Items=[Item.model_copy(update={"EntryQuantity": 100})]
+            ),
+            CurrentUser=Owner
+        )
+    assert ErrorInfo.value.detail == "Template name already exists."
+
+    with pytest.raises(HTTPException) as ErrorInfo:
+        await UpdateMealTemplateRoute(
+            Template.Template.Template.MealTemplateId,
+            Input=UpdateMealTemplateInput(Items=[Item.model_copy(update={"EntryQuantity": 100})]),
+            CurrentUser=Other
+        )
+    assert ErrorInfo.value.detail == "Template not found."
+
+    assert Calls == []
@@ -1,6 +1,9 @@
+import sqlite3
+
 import pytest
 
 from app.models.schemas import CreateDailyLogInput, CreateFoodInput, CreateMealEntryInput, MealType, ScheduleSlotInput
+from app.services import schedule_service
 from app.services.daily_logs_service import CreateMealEntry, GetEntriesForLog, UpsertDailyLog
 from app.services.foods_service import UpsertFood
 from app.services.schedule_service import GetScheduleSlots, UpdateScheduleSlots
@@ -96,3 +99,56 @@ def test_schedule_rejects_invalid_time(test_user_id):
                 )
             ]
         )
+
+
+def test_schedule_update_is_atomic(test_user_id, monkeypatch):
+    Existing = UpdateScheduleSlots(
+        test_user_id,
+        [
+            ScheduleSlotInput(
+                SlotName="Breakfast",
+                SlotTime="07:30",
+                MealType=MealType.Breakfast,
+                SortOrder=0
+            ),
+            ScheduleSlotInput(
+                SlotName="Snack",
+                SlotTime="15:00",
+                MealType=MealType.Snack1,
+                SortOrder=1
+            )
+        ]
+    )
+    Breakfast = next(Slot for Slot in Existing if Slot.SlotName == "Breakfast")
+
+    Calls: list[str] = []
+
+    def FailingExecuteQuery(Query, Params=None):
+        # The rename and insert have already run inside the transaction by now.
+        Calls.append(Query)
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(schedule_service, "ExecuteQuery", FailingExecuteQuery)
+    with pytest.raises(sqlite3.OperationalError):
+        UpdateScheduleSlots(
+            test_user_id,
+            [
+                ScheduleSlotInput(
+                    ScheduleSlotId=Breakfast.ScheduleSlotId,
+                    SlotName="Early breakfast",
+                    SlotTime="06:30",
+                    MealType=MealType.Breakfast,
+                    SortOrder=0
+                ),
+                ScheduleSlotInput(
+                    SlotName="Lunch",
+                    SlotTime="12:00",
+                    MealType=MealType.Lunch,
+                    SortOrder=1
+                )
+            ]
+        )
+    assert len(Calls) == 1
+
+    Slots = GetScheduleSlots(test_user_id)
+    assert [(Slot.SlotName, Slot.SlotTime) for Slot in Slots] == [("Breakfast", "07:30"), ("Snack", "15:00")]
@@ -4,8 +4,13 @@ from app.models.schemas import (
     CreateDailyLogInput,
     CreateFoodInput,
     CreateMealEntryInput,
-    MealType
+    CreateMealTemplateInput,
+    MealTemplateItemInput,
+    MealType,
+    SummaryBucketSize,
+    UpdateFoodInput
 )
+from app.services import serving_conversion_service
 from app.services.daily_logs_service import (
     CreateMealEntry,
     DeleteMealEntry,
@@ -15,9 +20,11 @@ from app.services.daily_logs_service import (
     UpdateSteps,
     UpsertDailyLog
 )
-from app.services.foods_service import GetFoods, UpsertFood
-from app.services.summary_service import GetWeeklySummary
-from app.utils.database import FetchOne
+from app.services.daily_totals_service import GetDailyNutrientTotals, RebuildDailyTotals
+from app.services.foods_service import GetFoods, UpdateFood, UpsertFood
+from app.services.meal_templates_service import CreateMealTemplate
+from app.services.summary_service import GetRangeSummary, GetWeeklySummary
+from app.utils.database import ExecuteQuery, FetchAll, FetchOne
 
 
 def test_get_settings_defaults_when_empty(test_user_id):
@@ -144,6 +151,71 @@ def test_create_meal_entry_with_unit_conversion(test_user_id):
     assert MealEntry.Quantity == pytest.approx(0.5, rel=1e-3)
     assert MealEntry.ConversionDetail is not None
 
+
+@pytest.mark.anyio
+async def test_cross_kind_conversion_reuses_learned_factor(test_user_id, monkeypatch):
+    Calls: list[str] = []
+
+    async def FakeGetOpenAiContentAsync(Messages, **_kwargs):
+        Calls.append(Messages[-1]["content"])
+        return '{"Servings": 0.5, "ConversionDetail": "1 cup of oats weighs about 90 g."}'
+
+    monkeypatch.setattr(serving_conversion_service, "GetOpenAiContentAsync", FakeGetOpenAiContentAsync)
+    Food = UpsertFood(
+        test_user_id,
+        CreateFoodInput(
+            FoodName="Rolled Oats",
+            ServingQuantity=1.0,
+            ServingUnit="cup",
+            CaloriesPerServing=300,
+            ProteinPerServing=10.0,
+            IsFavourite=False
+        )
+    )
+    DailyLog = UpsertDailyLog(
+        test_user_id,
+        CreateDailyLogInput(
+            LogDate="2024-01-06",
+            Steps=0,
+            StepKcalFactorOverride=None
+        )
+    )
+
+    # Without a learned factor the DB-side service refuses instead of calling the AI.
+    with pytest.raises(ValueError, match="Unable to convert units"):
+        serving_conversion_service.ConvertEntryToServings("Rolled Oats", 1.0, "cup", 45.0, "g", FoodId=Food.FoodId)
+    assert Calls == []
+
+    Entries = []
+    for SortOrder, (EntryQuantity, EntryUnit) in enumerate([(45, "g"), (0.18, "kg")]):
+        await serving_conversion_service.LearnUnitConversions([(Food.FoodId, EntryQuantity, EntryUnit)])
+        Entries.append(CreateMealEntry(
+            test_user_id,
+            CreateMealEntryInput(
+                DailyLogId=DailyLog.DailyLogId,
+                MealType=MealType.Breakfast,
+                FoodId=Food.FoodId,
+                Quantity=1,
+                EntryQuantity=EntryQuantity,
+                EntryUnit=EntryUnit,
+                EntryNotes=None,
+                SortOrder=SortOrder
+            )
+        ))
+
+    assert len(Calls) == 1
+    assert Entries[0].Quantity == pytest.approx(0.5)
+    assert Entries[1].Quantity == pytest.approx(2.0)
+    assert "saved conversion" in Entries[1].ConversionDetail
+
+    # The stored g -> mL factor also answers the reverse direction.
+    Servings, _Detail, _Unit = serving_conversion_service.ConvertEntryToServings(
+        "Rolled Oats", 45.0, "g", 1.0, "cup", FoodId=Food.FoodId
+    )
+    assert len(Calls) == 1
+    assert Servings == pytest.approx(2.0)
+
+
 def test_weekly_summary_calculation(seeded_db):
     AdminUserId = seeded_db
     Food = UpsertFood(
@@ -208,6 +280,82 @@ def test_weekly_summary_calculation(seeded_db):
     assert Summary.Averages["AverageSteps"] == 1500
 
 
+def test_weekly_summary_includes_template_entries(test_user_id):
+    Food = UpsertFood(
+        test_user_id,
+        CreateFoodInput(
+            FoodName="Wrap",
+            ServingDescription="1 wrap",
+            CaloriesPerServing=300,
+            ProteinPerServing=20,
+            IsFavourite=False
+        )
+    )
+    Template = CreateMealTemplate(
+        test_user_id,
+        CreateMealTemplateInput(
+            TemplateName="Double wrap",
+            Items=[
+                MealTemplateItemInput(
+                    FoodId=Food.FoodId,
+                    MealType=MealType.Lunch,
+                    Quantity=2,
+                    EntryNotes=None,
+                    SortOrder=0
+                )
+            ]
+        )
+    )
+    DailyLog = UpsertDailyLog(
+        test_user_id,
+        CreateDailyLogInput(LogDate="2024-03-04", Steps=0)
+    )
+    CreateMealEntry(
+        test_user_id,
+        CreateMealEntryInput(
+            DailyLogId=DailyLog.DailyLogId,
+            MealType=MealType.Lunch,
+            MealTemplateId=Template.Template.MealTemplateId,
+            Quantity=1,
+            SortOrder=0
+        )
+    )
+    CreateMealEntry(
+        test_user_id,
+        CreateMealEntryInput(
+            DailyLogId=DailyLog.DailyLogId,
+            MealType=MealType.Dinner,
+            FoodId=Food.FoodId,
+            Quantity=1,
+            SortOrder=0
+        )
+    )
+
+    Summary = GetWeeklySummary(test_user_id, "2024-03-04")
+
+    assert len(Summary.Days) == 1
+    assert Summary.Days[0].TotalCalories == 900
+    assert Summary.Days[0].TotalProtein == 60
+
+
+def test_range_summary_month_buckets(test_user_id):
+    for LogDate, Steps in [("2024-01-20", 1000), ("2024-02-10", 2000), ("2024-02-11", 4000)]:
+        UpsertDailyLog(test_user_id, CreateDailyLogInput(LogDate=LogDate, Steps=Steps))
+
+    Summary = GetRangeSummary(test_user_id, "2024-01-15", "2024-03-05", SummaryBucketSize.Month)
+
+    assert [(Bucket.BucketStart, Bucket.BucketEnd) for Bucket in Summary.Buckets] == [
+        ("2024-01-15", "2024-01-31"),
+        ("2024-02-01", "2024-02-29"),
+        ("2024-03-01", "2024-03-05")
+    ]
+    assert [Bucket.DayCount for Bucket in Summary.Buckets] == [1, 2, 0]
+    assert Summary.Buckets[1].Averages["AverageSteps"] == 3000
+
+    with pytest.raises(ValueError):
+        GetRangeSummary(test_user_id, "2020-01-01", "2024-01-01", SummaryBucketSize.Day)
+
+
 def test_weight_log_updates_user_weight_latest_date(test_user_id):
     UpsertDailyLog(
         test_user_id,
@@ -242,3 +390,64 @@ def test_weight_log_updates_user_weight_latest_date(test_user_id):
     )
     assert Row is not None
     assert Row["WeightKg"] == pytest.approx(100.0)
+
+
+def test_daily_totals_rollup_tracks_entries_and_food_edits(test_user_id):
+    Food = UpsertFood(
+        test_user_id,
+        CreateFoodInput(
+            FoodName="Greek Yoghurt",
+            ServingDescription="1 tub",
+            CaloriesPerServing=120,
+            ProteinPerServing=15,
+            SugarPerServing=4,
+            IsFavourite=False
+        )
+    )
+    DailyLog = UpsertDailyLog(
+        test_user_id,
+        CreateDailyLogInput(LogDate="2024-02-01", Steps=0)
+    )
+    assert GetDailyNutrientTotals(DailyLog.DailyLogId)["Calories"] == 0
+
+    Entry = CreateMealEntry(
+        test_user_id,
+        CreateMealEntryInput(
+            DailyLogId=DailyLog.DailyLogId,
+            MealType=MealType.Snack1,
+            FoodId=Food.FoodId,
+            Quantity=2,
+            SortOrder=0
+        )
+    )
+    Totals = GetDailyNutrientTotals(DailyLog.DailyLogId)
+    assert Totals["Calories"] == 240
+    assert Totals["Protein"] == 30
+    assert Totals["Sugar"] == 8
+
+    UpdateFood(test_user_id, Food.FoodId, UpdateFoodInput(CaloriesPerServing=100))
+    assert GetDailyNutrientTotals(DailyLog.DailyLogId)["Calories"] == 200
+
+    ExecuteQuery("DELETE FROM DailyTotals;")
+    assert RebuildDailyTotals(test_user_id) == 1
+    assert GetDailyNutrientTotals(DailyLog.DailyLogId)["Calories"] == 200
+
+    DeleteMealEntry(test_user_id, Entry.MealEntryId)
+    assert GetDailyNutrientTotals(DailyLog.DailyLogId)["Calories"] == 0
+
+
+def test_food_refresh_uses_food_id_indexes(temp_db):
+    Plan = FetchAll(
+        """
+        EXPLAIN QUERY PLAN
+        SELECT DailyLogId FROM MealEntries
+        WHERE FoodId = ?
+            OR MealTemplateId IN (SELECT MealTemplateId FROM MealTemplateItems WHERE FoodId = ?);
+        """,
+        ["Food-1", "Food-1"]
+    )
+    Details = " ".join(Row["detail"] for Row in Plan)
+
+    assert "MealEntries_FoodId_Idx" in Details
+    assert "MealTemplateItems_FoodId_Idx" in Details
+    assert "SCAN MealEntries" not in Details
@@ -192,10 +192,23 @@ export const CompleteGoogleInvite = async (InviteCode: string): Promise<User> =>
   return Response.data.User as User;
 };
 
+const FoodPageSize = 500;
+
 export const GetFoods = async (): Promise<Food[]> => {
-  const Response = await ApiClient.get("/api/foods/");
-  const Foods = Response.data?.Foods;
-  return Array.isArray(Foods) ? (Foods as Food[]) : [];
+  const AllFoods: Food[] = [];
+  let After: string | null = null;
+  do {
+    const Response = await ApiClient.get("/api/foods/", {
+      params: After ? { Limit: FoodPageSize, After } : { Limit: FoodPageSize }
+    });
+    const Foods = Response.data?.Foods;
+    if (!Array.isArray(Foods)) {
+      break;
+    }
+    AllFoods.push(...(Foods as Food[]));
+    After = typeof Response.data?.NextCursor === "string" ? Response.data.NextCursor : null;
+  } while (After);
+  return AllFoods;
 };
 
 export const CreateFood = async (Input: {